@@ -0,0 +1,314 @@
+"""Benchmarks for the data, model and assistant hot paths.
+
+Each case runs against synthetic datasets scaled up from the bundled files at every
+requested scale, and timings are written as JSON so versions can be compared:
+
+    python benchmarks/run_benchmarks.py                               # 290, 10k, 100k rows
+    python benchmarks/run_benchmarks.py --scales 290,1M,10M --only load,eda
+    python benchmarks/run_benchmarks.py --save baseline               # benchmarks/baselines/baseline.json
+    python benchmarks/run_benchmarks.py --compare baseline --tolerance 0.25
+
+``--compare`` exits non-zero when any case is slower than the baseline by more
+than the tolerance. ``benchmarks/baselines/reference.json`` is the committed
+reference at the default scales; timings only compare on the machine that
+produced them (its ``environment`` block records which), so a CI runner first
+saves a baseline from the target branch and then compares the change against it:
+
+    git checkout main && python benchmarks/run_benchmarks.py --save main
+    git checkout - && python benchmarks/run_benchmarks.py --compare main
+
+Re-save ``reference`` with ``--save reference`` when a change is meant to move
+timings. Cases that are too slow for very large inputs (training, batch prediction,
+the retrieval index) are capped and skipped above their cap unless ``--no-caps``
+is given. The assistant cases use an in-process mock LLM.
+"""
+import argparse
+import io
+import json
+import logging
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, APP_DIR)
+logging.disable(logging.WARNING)
+
+import numpy as np  # noqa: E402
+import pandas as pd  # noqa: E402
+import sklearn  # noqa: E402
+
+from benchmarks.datasets import cleanup, format_scale, parse_scale, scaled_csv, scaled_frame  # noqa: E402
+from core.aggregate_cube import AggregateCube  # noqa: E402
+from core.data_cache import frame_cache  # noqa: E402
+from core.eda_features import derive_features  # noqa: E402
+from core.fast_path import CompiledSeverityModel  # noqa: E402
+from core.geo_index import GeoIndex  # noqa: E402
+from core.incremental import AppendOnlyDataset  # noqa: E402
+from core.retrieval import AccidentIndex  # noqa: E402
+from core.scoring import score_frame  # noqa: E402
+from core.timeseries_store import TimeSeriesStore  # noqa: E402
+from pages import Insights_and_Analysis as insights  # noqa: E402
+from pages import Predictive_Model as predictive  # noqa: E402
+from pages import llama_Assitant as assistant  # noqa: E402
+
+BASELINE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines")
+DEFAULT_SCALES = "290,10k,100k"
+DEFAULT_REPEATS = 5
+MIN_SAMPLE_SECONDS = 0.05  # Calls faster than this are looped within one sample
+MAX_CASE_SECONDS = 30  # Stop repeating once a case has run this long in total
+TRAIN_ROWS_CAP = 200_000  # Models used by prediction cases train on at most this many rows
+CACHE_MB = 8192  # Scaled frames must fit the shared cache for the page helpers to see them
+REFRESH_FRACTION = 0.01  # New incidents in the refreshed export of the incremental refresh case
+
+MOCK_REPLY = ("Derailments remain the most common accident type; track renewal and "
+              "automatic signalling have reduced fatalities since the 1990s. ") * 4
+ASSISTANT_QUESTIONS = {
+    "lookup": "Bihar",
+    "lookup_cause": "Human Error",
+    "lookup_year": 1998,
+    "structured": "total deaths by state since 2000",
+    "chat": "What safety reforms followed derailments in Bihar?",
+}
+
+
+class MockChatClient:
+    """Stands in for ``ChatClient``: streams a canned reply word by word."""
+
+    def stream(self, prompt, context=""):
+        for word in MOCK_REPLY.split(" "):
+            yield word + " "
+
+
+class Case:
+    """A named benchmark: ``setup(rows)`` builds untimed state, ``run(state)`` is timed."""
+
+    def __init__(self, name, group, setup, run, max_rows=None):
+        self.name = name
+        self.group = group
+        self.setup = setup
+        self.run = run
+        self.max_rows = max_rows
+
+
+# --- Setup helpers ---
+_models = {}
+
+
+def trained_model(rows):
+    """(preprocessor, feature_names, model) trained on up to TRAIN_ROWS_CAP scaled rows."""
+    rows = min(rows, TRAIN_ROWS_CAP)
+    if rows not in _models:
+        X, y = predictive.preprocess_data(scaled_frame("preprocessed", rows))
+        predictive.train_severity_model(X, y)
+        state = predictive.st.session_state
+        _models[rows] = (state.preprocessor, state.feature_names, state.severity_model)
+    return _models[rows]
+
+
+def compiled_model(rows):
+    """``trained_model`` with the forest compiled, as shared-snapshot workers serve it."""
+    preprocessor, feature_names, model = trained_model(rows)
+    return preprocessor, feature_names, CompiledSeverityModel(preprocessor, model)
+
+
+def single_incident():
+    return {"accident_type": "Derailment", "deaths": 12, "injuries": 40, "rescue_time": 6}
+
+
+def eda_refresh_state(rows):
+    """A dataset with its derived features and aggregates, and a full re-export with 1% new incidents."""
+    df = scaled_frame("train_accident_analysis", rows)[insights.EDA_COLUMNS]
+    features = derive_features(df)
+    dataset = AppendOnlyDataset(df, "benchmark", key=insights.EDA_KEY_COLUMNS)
+    dataset.aggregates.update(features=features, cube=AggregateCube.from_frame(features),
+                              zones=GeoIndex.by_zone_code(features),
+                              trends=TimeSeriesStore.from_train_accident_analysis(features[insights.EDA_TREND_COLUMNS]))
+    new = df.sample(frac=REFRESH_FRACTION, random_state=0)
+    new = new.assign(train_name=new['train_name'].astype(str) + " (new)")
+    return dataset, pd.concat([df, new], ignore_index=True)
+
+
+def install_assistant_data(rows):
+    """Make the assistant page's helpers see the scaled dataset instead of the bundled one."""
+    frame_cache.clear()
+    frame_cache.put((assistant.DATASET_KEY, "assistant"), scaled_frame("accidents_1902_2024", rows))
+    assistant.get_index()
+    assistant.get_group_index()
+    assistant.get_trend_store()
+
+
+# --- Timed bodies ---
+def run_load_csv(data):
+    frame_cache.clear()  # Measure the parse, not a cache hit
+    return predictive.load_data(io.BytesIO(data))
+
+
+def run_predict_single_sklearn(state):
+    preprocessor, feature_names, model = state
+    incident = single_incident()
+    input_df = pd.DataFrame({
+        "Standard Accident Type": [incident["accident_type"]],
+        "Deaths": [incident["deaths"]],
+        "Injuries": [incident["injuries"]],
+        "Rescue Time (hrs)": [incident["rescue_time"]],
+    })
+    return model.predict(pd.DataFrame(preprocessor.transform(input_df), columns=feature_names))[0]
+
+
+def run_assistant_chat(question):
+    context = assistant.retrieve_context(question)
+    prompt = assistant.build_prompt(question, context)
+    return "".join(assistant.chat_with_ai(prompt, context, MockChatClient()))
+
+
+CASES = [
+    Case("load_csv", "load",
+         lambda n: open(scaled_csv("preprocessed", n), "rb").read(), run_load_csv),
+    Case("preprocess_data", "model",
+         lambda n: scaled_frame("preprocessed", n), predictive.preprocess_data),
+    Case("train_severity_model", "model",
+         lambda n: predictive.preprocess_data(scaled_frame("preprocessed", n)),
+         lambda Xy: predictive.train_severity_model(*Xy), max_rows=TRAIN_ROWS_CAP),
+    Case("predict_single_sklearn", "predict", trained_model, run_predict_single_sklearn),
+    Case("predict_single_fast_path", "predict",
+         lambda n: CompiledSeverityModel(*[trained_model(n)[i] for i in (0, 2)]),
+         lambda compiled: compiled.predict_one(**single_incident())),
+    Case("predict_batch", "predict",
+         lambda n: (scaled_frame("preprocessed", n),) + trained_model(n),
+         lambda state: score_frame(*state), max_rows=1_000_000),
+    Case("predict_batch_compiled", "predict",
+         lambda n: (scaled_frame("preprocessed", n),) + compiled_model(n),
+         lambda state: score_frame(*state), max_rows=1_000_000),
+    Case("eda_derive_features", "eda",
+         lambda n: scaled_frame("train_accident_analysis", n), derive_features),
+    Case("eda_aggregate_cube", "eda",
+         lambda n: derive_features(scaled_frame("train_accident_analysis", n)), AggregateCube.from_frame),
+    Case("eda_incremental_refresh", "eda", eda_refresh_state, lambda state: insights.refresh_eda_data(*state)),
+    Case("assistant_build_index", "assistant",
+         lambda n: scaled_frame("accidents_1902_2024", n), AccidentIndex, max_rows=1_000_000),
+    Case("assistant_lookup_by_state", "assistant",
+         install_assistant_data,
+         lambda _: assistant.get_accidents_by_state(ASSISTANT_QUESTIONS["lookup"]), max_rows=1_000_000),
+    Case("assistant_lookup_by_cause", "assistant",
+         install_assistant_data,
+         lambda _: assistant.get_accidents_by_cause(ASSISTANT_QUESTIONS["lookup_cause"]), max_rows=1_000_000),
+    Case("assistant_lookup_by_year", "assistant",
+         install_assistant_data,
+         lambda _: assistant.get_accidents_by_year(ASSISTANT_QUESTIONS["lookup_year"]), max_rows=1_000_000),
+    Case("assistant_structured_answer", "assistant",
+         install_assistant_data,
+         lambda _: assistant.route_query(ASSISTANT_QUESTIONS["structured"]), max_rows=1_000_000),
+    Case("assistant_chat_mock_llm", "assistant",
+         install_assistant_data,
+         lambda _: run_assistant_chat(ASSISTANT_QUESTIONS["chat"]), max_rows=1_000_000),
+]
+
+
+def measure(run, state, repeats):
+    """Per-call time of ``run(state)`` over up to ``repeats`` samples, stopping early for slow cases.
+
+    Fast calls are looped within each sample (as ``timeit`` does) so timer noise stays small.
+    """
+    start = time.perf_counter()
+    run(state)
+    first = time.perf_counter() - start
+    loops = max(1, int(MIN_SAMPLE_SECONDS / max(first, 1e-9)))
+    timings = [first] if loops == 1 else []
+    while len(timings) < repeats and sum(timings) * loops < MAX_CASE_SECONDS:
+        start = time.perf_counter()
+        for _ in range(loops):
+            run(state)
+        timings.append((time.perf_counter() - start) / loops)
+    return {"median_s": statistics.median(timings), "min_s": min(timings), "repeats": len(timings), "loops": loops}
+
+
+def environment():
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=APP_DIR,
+                                capture_output=True, text=True).stdout.strip() or None
+    except OSError:
+        commit = None
+    return {"commit": commit, "python": platform.python_version(), "machine": platform.machine(),
+            "processor": platform.processor(), "cpu_count": os.cpu_count(), "numpy": np.__version__,
+            "pandas": pd.__version__, "sklearn": sklearn.__version__}
+
+
+def run_suite(scales, groups=None, repeats=DEFAULT_REPEATS, caps=True):
+    results = {}
+    for case in CASES:
+        if groups and case.group not in groups and case.name not in groups:
+            continue
+        results[case.name] = {}
+        for rows in scales:
+            label = format_scale(rows)
+            if caps and case.max_rows is not None and rows > case.max_rows:
+                results[case.name][label] = {"skipped": f"above cap of {format_scale(case.max_rows)} rows"}
+                continue
+            state = case.setup(rows)
+            results[case.name][label] = dict(measure(case.run, state, repeats), rows=rows)
+            print(f"{case.name:<30}{label:>8}{results[case.name][label]['median_s'] * 1000:>14.3f} ms", flush=True)
+    return {"environment": environment(), "results": results}
+
+
+def compare(report, baseline, tolerance):
+    """Rows of (case, scale, baseline_s, current_s, ratio) and whether any regressed."""
+    rows, regressed = [], False
+    for name, scales in report["results"].items():
+        for label, current in scales.items():
+            previous = baseline["results"].get(name, {}).get(label)
+            if not previous or "median_s" not in previous or "median_s" not in current:
+                continue
+            ratio = current["median_s"] / previous["median_s"]
+            rows.append((name, label, previous["median_s"], current["median_s"], ratio))
+            regressed |= ratio > 1 + tolerance
+    return rows, regressed
+
+
+def baseline_path(name):
+    return name if name.endswith(".json") else os.path.join(BASELINE_DIR, f"{name}.json")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scales", default=DEFAULT_SCALES, help="comma-separated row counts, e.g. 290,10k,1M")
+    parser.add_argument("--only", help="comma-separated case names or groups (load, model, predict, eda, assistant)")
+    parser.add_argument("--repeats", type=int, default=DEFAULT_REPEATS)
+    parser.add_argument("--no-caps", action="store_true", help="run every case at every scale")
+    parser.add_argument("--save", help="baseline name (or .json path) to write results to")
+    parser.add_argument("--compare", help="baseline name (or .json path) to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed slowdown before failing")
+    args = parser.parse_args()
+
+    frame_cache.resize(CACHE_MB * 1024 * 1024)
+    scales = [parse_scale(s) for s in args.scales.split(",")]
+    groups = set(args.only.split(",")) if args.only else None
+    try:
+        report = run_suite(scales, groups, args.repeats, caps=not args.no_caps)
+    finally:
+        cleanup()
+
+    if args.save:
+        path = baseline_path(args.save)
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nSaved results to {path}")
+
+    if args.compare:
+        with open(baseline_path(args.compare)) as f:
+            baseline = json.load(f)
+        rows, regressed = compare(report, baseline, args.tolerance)
+        print(f"\nAgainst {baseline['environment'].get('commit') or args.compare}:")
+        for name, label, before, after, ratio in rows:
+            flag = "  REGRESSION" if ratio > 1 + args.tolerance else ""
+            print(f"{name:<30}{label:>8}{before * 1000:>12.3f} ms ->{after * 1000:>12.3f} ms  x{ratio:.2f}{flag}")
+        if regressed:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
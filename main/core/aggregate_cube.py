@@ -0,0 +1,117 @@
+"""Precomputed accident aggregate cube for the EDA questions.
+
+Accident counts and casualty sums are grouped once per dataset across every EDA
+dimension. Charts, findings and drill-down filters are then answered from the
+(small) cube instead of rescanning the incident rows on every rerun. Query results
+are memoized in a least recently used memo bounded relative to the size of the cells.
+"""
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from core.data_cache import frame_cache, sizeof
+
+QUERY_MEMO_SHARE = 1.0  # Memoized query results take at most this share of the cells' size ...
+QUERY_MEMO_MIN_BYTES = 1 << 20  # ... or this much, for small cubes
+CUBE_DIMENSIONS = ['daytime', 'season', 'region', 'env', 'train_type', 'cause']
+CUBE_MEASURES = ['injured', 'killed']
+
+
+class AggregateCube:
+    """Counts and casualty sums for every observed combination of ``CUBE_DIMENSIONS``."""
+
+    def __init__(self, cells):
+        self.cells = cells
+        self._cells_bytes = int(cells.memory_usage(deep=True).sum())
+        self._memo_budget = max(int(QUERY_MEMO_SHARE * self._cells_bytes), QUERY_MEMO_MIN_BYTES)
+        self._queries = OrderedDict()
+        self._memo_bytes = 0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_frame(cls, df, dimensions=CUBE_DIMENSIONS, measures=CUBE_MEASURES):
+        grouped = df.groupby(dimensions, observed=True, dropna=False, sort=False)
+        cells = grouped[measures].sum()
+        cells.insert(0, 'count', grouped.size())
+        return cls(cells.reset_index())
+
+    @classmethod
+    def merge(cls, cubes, dimensions=CUBE_DIMENSIONS):
+        """Combine cubes built over disjoint row sets, e.g. the chunks of a streamed upload."""
+        cubes = list(cubes)
+        cells = pd.concat([cube.cells for cube in cubes], ignore_index=True)
+        for dim in dimensions:
+            # Chunks observe different category subsets; keep a categorical over their union
+            parts = [cube.cells[dim] for cube in cubes if isinstance(cube.cells[dim].dtype, pd.CategoricalDtype)]
+            if parts:
+                categories = list(dict.fromkeys(c for part in parts for c in part.cat.categories))
+                cells[dim] = pd.Categorical(cells[dim], categories=categories)
+        merged = cells.groupby(dimensions, observed=True, dropna=False, sort=False).sum()
+        return cls(merged.reset_index())
+
+    def without(self, cube, dimensions=CUBE_DIMENSIONS):
+        """This cube less one built over some of its rows, e.g. rows superseded by a refresh."""
+        measures = [c for c in cube.cells.columns if c not in dimensions]
+        negated = AggregateCube(cube.cells.assign(**{c: -cube.cells[c] for c in measures}))
+        cells = AggregateCube.merge([self, negated], dimensions).cells
+        return AggregateCube(cells[cells['count'] > 0].reset_index(drop=True))
+
+    @property
+    def nbytes(self):
+        """Cells plus the memo's whole budget, so the size taken when the cube is cached stays an upper bound."""
+        return self._cells_bytes + self._memo_budget
+
+    def values(self, dim):
+        """Distinct observed values of a dimension, for filter widgets."""
+        return [v for v in self.cells[dim].dropna().unique()]
+
+    def _slice(self, filters):
+        if not filters:
+            return self.cells
+        mask = np.logical_and.reduce([self.cells[dim].isin(values).to_numpy() for dim, values in filters.items()])
+        return self.cells[mask]
+
+    def _query(self, kind, dim, filters):
+        filters = {d: tuple(v) for d, v in (filters or {}).items() if v}
+        key = (kind, dim, tuple(sorted(filters.items())))
+        with self._lock:
+            if key in self._queries:
+                self._queries.move_to_end(key)
+                return self._queries[key][0]
+        cells = self._slice(filters)
+        if kind == 'counts':
+            result = cells.groupby(dim, observed=True)['count'].sum()
+            result = result[result > 0].sort_values(ascending=False, kind='stable')
+        else:
+            result = cells.groupby(dim, observed=True)[CUBE_MEASURES].sum()
+        size = sizeof(result)
+        with self._lock:
+            if key not in self._queries and size <= self._memo_budget:
+                self._queries[key] = (result, size)
+                self._memo_bytes += size
+                while self._memo_bytes > self._memo_budget:
+                    _, (_, evicted) = self._queries.popitem(last=False)
+                    self._memo_bytes -= evicted
+        return result
+
+    def counts(self, dim, filters=None):
+        """Accident counts per value of ``dim`` (like ``value_counts``), most frequent first."""
+        return self._query('counts', dim, filters)
+
+    def casualties(self, dim, filters=None):
+        """Injured and killed totals per value of ``dim``."""
+        return self._query('casualties', dim, filters)
+
+    def top(self, dim, filters=None):
+        """(value, count) of the most frequent value of ``dim``, or (None, 0) when empty."""
+        counts = self.counts(dim, filters)
+        if counts.empty:
+            return None, 0
+        return counts.index[0], int(counts.iloc[0])
+
+
+def cached_cube(dataset_key, features):
+    """Build (once per dataset) the cube over derived EDA features."""
+    return frame_cache.get_or_load((dataset_key, 'aggregate_cube'), lambda: AggregateCube.from_frame(features))
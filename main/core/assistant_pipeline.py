@@ -0,0 +1,155 @@
+"""Asyncio pipeline for assistant queries with cancellation of stale queries.
+
+A single background event loop (shared by all sessions) runs each query:
+retrieval and structured-query routing run concurrently, then, only if the
+question needs the LLM and it has not been superseded during a short debounce,
+the completion is streamed into the run, which keeps every delta so that a script
+rerun attaching to the same run replays the answer from its start. Submitting a new query for a session cancels that session's previous one,
+so fast typing never queues redundant API calls. A session's run is forgotten
+once it finishes, so the pipeline only tracks queries still in flight.
+"""
+import asyncio
+import threading
+
+from core.llm_client import normalize_prompt
+
+DEBOUNCE_SECONDS = 0.25
+POLL_SECONDS = 0.1
+
+
+class QueryRun:
+    """Handle for one submitted query: routing result plus a stream of text deltas."""
+
+    def __init__(self, query):
+        self.query = query
+        self.structured = None
+        self.routed = threading.Event()
+        self.cancelled = threading.Event()
+        self.future = None
+        self._deltas = []
+        self._finished = False
+        self._changed = threading.Condition()
+
+    def cancel(self):
+        self.cancelled.set()
+        if self.future is not None:
+            self.future.cancel()
+
+    def wait_routed(self, timeout=None):
+        """Block until routing finishes; returns the structured answer or None."""
+        self.routed.wait(timeout)
+        return self.structured
+
+    def iter_text(self):
+        """
+        Yield the streamed completion text from its start until the run finishes or is
+        cancelled; every consumer sees all of it, however late it attaches.
+        """
+        position = 0
+        while True:
+            with self._changed:
+                self._changed.wait_for(lambda: position < len(self._deltas) or self._finished,
+                                       timeout=POLL_SECONDS)
+                deltas = self._deltas[position:]
+                finished = self._finished
+            position += len(deltas)
+            yield from deltas
+            # Nothing is added after the finish, so everything has been yielded
+            if finished or (not deltas and self.cancelled.is_set()):
+                return
+
+    def _put(self, item):
+        with self._changed:
+            self._deltas.append(item)
+            self._changed.notify_all()
+
+    def _finish(self):
+        with self._changed:
+            self._finished = True
+            self._changed.notify_all()
+
+
+class AssistantPipeline:
+    """
+    Runs queries on a background asyncio loop.
+
+    ``retrieve(query) -> context``, ``route(query) -> structured answer or None``,
+    ``build_prompt(query, context) -> prompt`` and ``stream(prompt, context) -> iterator``
+    are plain blocking callables; they run in worker threads.
+    """
+
+    def __init__(self, retrieve, route, build_prompt, stream, debounce=DEBOUNCE_SECONDS):
+        self.retrieve = retrieve
+        self.route = route
+        self.build_prompt = build_prompt
+        self.stream = stream
+        self.debounce = debounce
+        self._runs = {}
+        self._lock = threading.Lock()
+        self.loop = asyncio.new_event_loop()
+        threading.Thread(target=self.loop.run_forever, name="assistant-pipeline", daemon=True).start()
+
+    def submit(self, session_id, query):
+        """Start ``query`` for a session, cancelling its previous query unless it is the same one."""
+        with self._lock:
+            previous = self._runs.get(session_id)
+            # Join an identical query that is still in flight instead of issuing a second call
+            if previous is not None and normalize_prompt(previous.query) == normalize_prompt(query) \
+                    and not previous.cancelled.is_set() and not previous.future.done():
+                return previous
+            if previous is not None:
+                previous.cancel()
+            run = QueryRun(query)
+            self._runs[session_id] = run
+            # Set under the lock: a concurrent submit for the session reads it
+            run.future = asyncio.run_coroutine_threadsafe(self._execute(session_id, run), self.loop)
+        return run
+
+    def cancel(self, session_id):
+        with self._lock:
+            run = self._runs.pop(session_id, None)
+        if run is not None:
+            run.cancel()
+
+    def _forget(self, session_id, run):
+        """Drop a finished run unless a newer query for the session replaced it."""
+        with self._lock:
+            if self._runs.get(session_id) is run:
+                del self._runs[session_id]
+
+    async def _execute(self, session_id, run):
+        try:
+            context, structured = await asyncio.gather(
+                asyncio.to_thread(self.retrieve, run.query),
+                asyncio.to_thread(self.route, run.query),
+            )
+            run.structured = structured
+            run.routed.set()
+            if structured is not None:
+                return
+            # A newer query arriving during the debounce cancels this one before any API call
+            await asyncio.sleep(self.debounce)
+            prompt = self.build_prompt(run.query, context)
+            await asyncio.to_thread(self._pump, run, prompt, context)
+        except asyncio.CancelledError:
+            run.cancelled.set()
+            raise
+        except Exception as e:
+            run._put(f"⚠️ Error: {str(e)}")
+        finally:
+            run.routed.set()
+            run._finish()
+            self._forget(session_id, run)
+
+    def _pump(self, run, prompt, context):
+        """Copy deltas into the run, stopping (and closing the stream) once cancelled."""
+        iterator = iter(self.stream(prompt, context))
+        try:
+            for delta in iterator:
+                if run.cancelled.is_set():
+                    break
+                run._put(delta)
+        finally:
+            close = getattr(iterator, "close", None)
+            if close is not None:
+                close()
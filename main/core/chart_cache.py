@@ -0,0 +1,42 @@
+"""Rendered chart cache: Matplotlib figures are drawn once per key and kept as PNG bytes.
+
+Keys are (dataset key, question, style, filters). Every figure is closed right after
+rendering, even when drawing fails, so long sessions do not accumulate open figures.
+Import this module before ``matplotlib.pyplot`` so the Agg backend is selected first.
+"""
+import io
+import os
+
+import matplotlib
+
+matplotlib.use("Agg")
+
+import matplotlib.pyplot as plt  # noqa: E402
+
+from core.data_cache import SharedCache  # noqa: E402
+
+CHART_DPI = 100
+CHART_FIGSIZE = (8, 4)
+chart_cache = SharedCache(float(os.environ.get("RAILWAY_CHART_CACHE_MB", "64")) * 1024 * 1024)
+
+
+def filters_key(filters):
+    """Hashable, order-independent form of a {dimension: [values]} filter dict."""
+    return tuple(sorted((dim, tuple(values)) for dim, values in (filters or {}).items() if values))
+
+
+def render_png(draw, figsize=CHART_FIGSIZE, dpi=CHART_DPI):
+    """Create a figure, fill it with ``draw(fig)`` and return it as PNG bytes; the figure is always closed."""
+    fig = plt.figure(figsize=figsize)
+    try:
+        draw(fig)
+        buffer = io.BytesIO()
+        fig.savefig(buffer, format="png", dpi=dpi)
+        return buffer.getvalue()
+    finally:
+        plt.close(fig)
+
+
+def cached_chart(key, draw):
+    """PNG bytes for ``key``, rendering with ``draw`` only on a cache miss."""
+    return chart_cache.get_or_load(key, lambda: render_png(draw))
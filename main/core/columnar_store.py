@@ -0,0 +1,122 @@
+"""Typed, memory-mapped columnar copies of the bundled ``Assests`` datasets.
+
+Source CSV/xlsx files are converted once to uncompressed Arrow IPC (Feather v2)
+files with categorical and downcast numeric dtypes. Loads memory-map the file and
+read only the requested columns. Run ``python -m core.columnar_store`` from
+``main/`` to (re)build every dataset; loads also rebuild stale files on demand.
+pyarrow is optional: without it, loads fall back to parsing the source file.
+Worker processes attached to a shared snapshot (``core.shared_snapshot``) load the
+datasets from its memory maps instead.
+"""
+import os
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+from core.shared_snapshot import attached_snapshot
+
+try:
+    import pyarrow.feather as feather
+except ImportError:  # pragma: no cover - optional dependency
+    feather = None
+
+ASSETS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "Assests")
+COLUMNAR_DIR = os.path.join(ASSETS_DIR, "columnar")
+
+# Dataset name -> source file in Assests
+DATASETS = {
+    'preprocessed': 'preprocessed_accident_data.csv',
+    'enhanced': 'enhanced_accident_data.csv',
+    'train_accident_analysis': 'train_accident_analysis dataset.csv',
+    'accidents_1902_2024': 'train_Accident_1900_2024_cleaned.xlsx',
+}
+
+# Low-cardinality text columns stored as dictionary-encoded categoricals
+CATEGORICAL_COLUMNS = [
+    'Standard Accident Type', 'cause', 'env', 'railway_division',
+    'State', 'Month', 'Accident Rail Zone', 'Accident Type', 'Standard Cause Type',
+]
+
+
+def source_path(name):
+    return os.path.join(ASSETS_DIR, DATASETS[name])
+
+
+def columnar_path(name):
+    return os.path.join(COLUMNAR_DIR, name + ".arrow")
+
+
+def read_source(name, columns=None):
+    """Parse the original CSV/xlsx file for ``name``."""
+    path = source_path(name)
+    if path.endswith('.xlsx'):
+        return pd.read_excel(path, usecols=columns)
+    return pd.read_csv(path, usecols=columns)
+
+
+def optimize_dtypes(df):
+    """Return df with categorical text columns and losslessly downcast numeric columns."""
+    df = df.copy()
+    for col in df.columns:
+        series = df[col]
+        if series.dtype == object:
+            # Spreadsheet columns can mix numbers and text; store them uniformly as text
+            series = series.where(series.isna(), series.astype(str))
+            df[col] = series
+        if col in CATEGORICAL_COLUMNS:
+            df[col] = series.astype('category')
+        elif pd.api.types.is_integer_dtype(series):
+            df[col] = pd.to_numeric(series, downcast='integer')
+        elif pd.api.types.is_float_dtype(series):
+            narrowed = series.astype(np.float32)
+            # Keep float64 where float32 would change any value
+            if np.array_equal(narrowed.to_numpy(dtype=np.float64), series.to_numpy(), equal_nan=True):
+                df[col] = narrowed
+    return df
+
+
+def ingest(name):
+    """Convert one source dataset to a typed Arrow IPC file and return its path."""
+    if feather is None:
+        raise ImportError("pyarrow is required to build the columnar store (pip install pyarrow).")
+    os.makedirs(COLUMNAR_DIR, exist_ok=True)
+    path = columnar_path(name)
+    # A unique temporary file, so processes rebuilding the same dataset never write to one file
+    fd, tmp_path = tempfile.mkstemp(dir=COLUMNAR_DIR, prefix=name + ".", suffix=".tmp")
+    os.close(fd)
+    try:
+        # Uncompressed so the file can be memory-mapped without decoding
+        feather.write_feather(optimize_dtypes(read_source(name)), tmp_path, compression='uncompressed')
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return path
+
+
+def is_stale(name):
+    path = columnar_path(name)
+    return not os.path.exists(path) or os.path.getmtime(path) < os.path.getmtime(source_path(name))
+
+
+def load_dataset(name, columns=None):
+    """Load ``columns`` (default: all) of a bundled dataset from its memory-mapped columnar file."""
+    snapshot = attached_snapshot()
+    if snapshot is not None and name in snapshot.datasets:
+        return snapshot.frame(name, columns)
+    if feather is None:
+        return optimize_dtypes(read_source(name, columns))
+    if is_stale(name):
+        ingest(name)
+    return feather.read_table(columnar_path(name), columns=columns, memory_map=True).to_pandas()
+
+
+def ingest_all():
+    """Build the columnar file for every bundled dataset."""
+    return {name: ingest(name) for name in DATASETS}
+
+
+if __name__ == "__main__":
+    for dataset, output in ingest_all().items():
+        print(f"{dataset}: {output} ({os.path.getsize(output):,} bytes)")
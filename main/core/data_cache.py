@@ -0,0 +1,126 @@
+"""Process-wide, size-bounded LRU cache shared by every Streamlit session.
+
+Entries are keyed by content hash, so the same upload opened in many sessions is
+parsed and held in memory once. DataFrames are handed out as copies that keep the
+cached frame read-only: callers may add or modify columns on what they receive
+without affecting other sessions. From pandas 3 copy-on-write makes these shallow
+copies; older pandas gets a deep copy per lookup.
+"""
+import hashlib
+import os
+import pickle
+import sys
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+
+# Copy-on-write is always on from pandas 3, so shallow copies are isolated
+_SHALLOW_COPIES_ISOLATED = int(pd.__version__.split('.')[0]) >= 3
+
+DEFAULT_MAX_MB = float(os.environ.get("RAILWAY_DATA_CACHE_MB", "512"))
+
+
+def content_hash(data):
+    """SHA-256 of raw bytes, e.g. ``uploaded_file.getvalue()``."""
+    return hashlib.sha256(data).hexdigest()
+
+
+def sizeof(value):
+    """Approximate in-memory size of a cached value in bytes."""
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(deep=True).sum())
+    if isinstance(value, pd.Series):
+        return int(value.memory_usage(deep=True))
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return len(value)
+    nbytes = getattr(value, 'nbytes', None)
+    if nbytes is not None:
+        return int(nbytes)
+    # Anything else still counts toward the bound; the pickled size is a fair proxy
+    try:
+        return len(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+    except Exception:
+        return sys.getsizeof(value)
+
+
+def _read_only_view(value):
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        return value.copy(deep=not _SHALLOW_COPIES_ISOLATED)
+    return value
+
+
+class SharedCache:
+    """Thread-safe LRU cache evicting least recently used entries beyond ``max_bytes``."""
+
+    def __init__(self, max_bytes):
+        self.max_bytes = int(max_bytes)
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return _read_only_view(entry[0])
+
+    def put(self, key, value, size=None):
+        """Cache ``value``, counting ``size`` bytes toward the bound (``sizeof(value)`` by default)."""
+        size = sizeof(value) if size is None else int(size)
+        with self._lock:
+            if key in self._entries:
+                self.current_bytes -= self._entries.pop(key)[1]
+            # Values larger than the whole budget are returned but never cached
+            if size <= self.max_bytes:
+                self._entries[key] = (value, size)
+                self.current_bytes += size
+                self._evict()
+        return _read_only_view(value)
+
+    def get_or_load(self, key, loader):
+        """Return the cached value for ``key``, calling ``loader()`` to build it on a miss."""
+        value = self.get(key)
+        if value is None:
+            value = self.put(key, loader())
+        return value
+
+    def resize(self, max_bytes):
+        with self._lock:
+            self.max_bytes = int(max_bytes)
+            self._evict()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.current_bytes = 0
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'bytes': self.current_bytes,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'evictions': self.evictions,
+            }
+
+    def _evict(self):
+        while self.current_bytes > self.max_bytes and self._entries:
+            _, (_, size) = self._entries.popitem(last=False)
+            self.current_bytes -= size
+            self.evictions += 1
+
+
+# Shared by all sessions in this Streamlit process
+frame_cache = SharedCache(DEFAULT_MAX_MB * 1024 * 1024)
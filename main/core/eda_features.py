@@ -0,0 +1,94 @@
+"""Vectorized feature derivation for the EDA page (daytime, season, train type, region)."""
+import re
+
+import numpy as np
+import pandas as pd
+
+from core.data_cache import frame_cache
+
+TIME_FORMAT = '%d-%m-%Y %H:%M'  # Day-first ``time`` text of the accident analysis dataset
+
+DAYTIME_BINS = [0, 6, 12, 18, 24]
+DAYTIME_LABELS = ["Night", "Morning", "Afternoon", "Evening"]
+
+SEASONS = ["Winter", "Summer", "Monsoon", "Autumn"]
+# Season code per month number (index 0 unused): Dec-Mar winter, Apr-Jun summer, Jul-Sep monsoon
+MONTH_TO_SEASON = np.array([0, 0, 0, 0, 1, 1, 1, 2, 2, 2, 3, 3, 0], dtype=np.int8)
+
+TRAIN_TYPES = ["Express", "Passenger", "Freight", "Mail", "others"]
+# One alternative per type, tried in list order, so the first listed type found in a name wins
+TRAIN_TYPE_PATTERN = re.compile(r"^(?:" + "|".join(rf".*?({re.escape(t)})" for t in TRAIN_TYPES) + ")", re.DOTALL)
+
+REGION_MAP = {"n": "North", "nc": "North", "ne": "North", "nef": "North", "nw": "North",
+              "s": "South", "sc": "South", "se": "South", "sw": "South",
+              "e": "East", "ec": "East", "eco": "East", "c": "Central", "w": "West"}
+
+# Rows whose derived or raw value equals these are excluded from the analysis
+EXCLUDED_VALUES = {'daytime': 'Unknown', 'season': 'Unknown', 'region': 'Unknown',
+                   'train_type': 'Unknown', 'env': 'Unknown', 'cause': 'unknown'}
+
+
+def parse_day_first(text):
+    """
+    Parse ``TIME_FORMAT`` text, falling back to day-first inference for values in other
+    layouts. Each distinct value is parsed once.
+    """
+    codes, uniques = pd.factorize(pd.Series(text), use_na_sentinel=True)
+    uniques = pd.Series(uniques, dtype=object)
+    parsed = pd.to_datetime(uniques, format=TIME_FORMAT, errors='coerce')
+    leftover = parsed.isna().to_numpy()
+    if leftover.any():
+        parsed[leftover] = pd.to_datetime(uniques[leftover], errors='coerce', dayfirst=True)
+    # Missing text (code -1) picks up the trailing NaT
+    values = np.append(parsed.to_numpy(dtype='datetime64[ns]'), np.datetime64('NaT', 'ns'))
+    return pd.Series(values[codes], index=getattr(text, 'index', None), name=getattr(text, 'name', None))
+
+
+def season_from_months(months):
+    """Map month numbers (1-12) to a categorical season via array lookup."""
+    codes = MONTH_TO_SEASON[np.asarray(months, dtype=np.int64)]
+    return pd.Categorical.from_codes(codes, categories=SEASONS)
+
+
+def train_type_from_names(names):
+    """Return the first of TRAIN_TYPES contained in each name, else "Unknown" (matched once per distinct name)."""
+    names = names.astype("category")
+    matched = pd.Series(names.cat.categories).astype("string").str.extract(TRAIN_TYPE_PATTERN).notna().to_numpy()
+    # At most one alternative group matches; trailing "Unknown" is picked up by missing names (code -1)
+    lookup = np.append(np.where(matched.any(axis=1), np.array(TRAIN_TYPES, dtype=object)[matched.argmax(axis=1)],
+                                "Unknown"), "Unknown").astype(object)
+    return pd.Series(lookup[names.cat.codes.to_numpy()], index=names.index, dtype="string").astype("category")
+
+
+def region_from_divisions(divisions):
+    """Map railway divisions to regions once per category instead of once per row."""
+    divisions = divisions.astype("category")
+    categories = list(divisions.cat.categories)
+    # Trailing "Unknown" is picked up by missing divisions (code -1)
+    lookup = np.array([REGION_MAP.get(c, "Unknown") for c in categories] + ["Unknown"], dtype=object)
+    return pd.Series(lookup[divisions.cat.codes.to_numpy()], index=divisions.index).astype("category")
+
+
+def derive_features(df):
+    """Add time, hour, daytime, season, train_type and region columns and drop excluded rows."""
+    df = df.copy()
+    # Day-first (dd-mm-yyyy) explicitly: inferring from the first value misreads ambiguous dates, per chunk when streaming
+    df['time'] = parse_day_first(df['time'])
+    df = df[df['time'].notna()]
+
+    df['hour'] = df['time'].dt.hour
+    df['daytime'] = pd.cut(df['hour'], DAYTIME_BINS, labels=DAYTIME_LABELS)
+    df['season'] = season_from_months(df['time'].dt.month.to_numpy())
+    df['train_type'] = train_type_from_names(df['train_name'])
+    df['region'] = region_from_divisions(df['railway_division'])
+
+    mask = np.logical_and.reduce([(df[col] != value).to_numpy() for col, value in EXCLUDED_VALUES.items()])
+    df = df[mask]
+
+    # Drop categories emptied by the filter so charts only show observed values
+    return df.apply(lambda s: s.cat.remove_unused_categories() if isinstance(s.dtype, pd.CategoricalDtype) else s)
+
+
+def cached_features(dataset_key, df):
+    """``derive_features`` memoized per dataset in the shared process-wide cache."""
+    return frame_cache.get_or_load((dataset_key, 'eda_features'), lambda: derive_features(df))
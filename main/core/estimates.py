@@ -0,0 +1,70 @@
+"""Severity classification and resource estimates, as scalar and vectorized NumPy helpers.
+
+Resource estimates are served from the versioned tables in ``core.resource_tables``.
+"""
+import numpy as np
+
+from core.resource_tables import ResourceTables
+
+# Severity classification thresholds
+CRITICAL_THRESHOLD = 75
+MID_LEVEL_THRESHOLD = 50
+LOW_LEVEL_THRESHOLD = 25
+
+SEVERITY_THRESHOLDS = np.array([LOW_LEVEL_THRESHOLD, MID_LEVEL_THRESHOLD, CRITICAL_THRESHOLD])
+SEVERITY_LEVELS = np.array(["Very Low", "Low-Level", "Mid-Level", "Critical"], dtype=object)
+
+# Ambulance and damage cost tables (Assests/resource_tables.json)
+RESOURCE_TABLES = ResourceTables.load()
+AMBULANCE_WEIGHTS = RESOURCE_TABLES.ambulance_weights
+
+# Structural damage base costs (INR); unknown accident types use 'Other'
+BASE_COSTS = RESOURCE_TABLES.base_costs
+BASE_COST_TYPES = RESOURCE_TABLES.accident_types
+
+# Severity score (deaths + injuries) lower bounds and the multipliers they unlock
+COST_MULTIPLIER_THRESHOLDS = RESOURCE_TABLES.severity_thresholds
+COST_MULTIPLIERS = RESOURCE_TABLES.multipliers
+
+
+def classify_severity(score):
+    """Classify severity score into descriptive levels."""
+    if score >= CRITICAL_THRESHOLD:
+        return "Critical"
+    elif score >= MID_LEVEL_THRESHOLD:
+        return "Mid-Level"
+    elif score >= LOW_LEVEL_THRESHOLD:
+        return "Low-Level"
+    else:
+        return "Very Low"
+
+
+def estimate_ambulances(deaths, injuries, rescue_time):
+    """
+    Estimate ambulances needed from the weighted deaths, injuries and rescue hours
+    in ``RESOURCE_TABLES`` (see ``ResourceTables.ambulances``).
+    """
+    return RESOURCE_TABLES.ambulances(deaths, injuries, rescue_time)
+
+
+def estimate_structural_damage_cost(accident_type, deaths, injuries):
+    """
+    Estimate structural damage cost (INR) based on accident type and severity.
+    """
+    return RESOURCE_TABLES.damage_cost(accident_type, deaths, injuries)
+
+
+def classify_severity_batch(scores):
+    """Vectorized ``classify_severity`` for an array of scores."""
+    scores = np.nan_to_num(np.asarray(scores, dtype=float), nan=0.0)
+    return SEVERITY_LEVELS[np.searchsorted(SEVERITY_THRESHOLDS, scores, side='right')]
+
+
+def estimate_ambulances_batch(deaths, injuries, rescue_time):
+    """Vectorized ``estimate_ambulances``; returns an int64 array."""
+    return RESOURCE_TABLES.ambulances_batch(deaths, injuries, rescue_time)
+
+
+def estimate_structural_damage_cost_batch(accident_types, deaths, injuries):
+    """Vectorized ``estimate_structural_damage_cost``; returns an int64 array."""
+    return RESOURCE_TABLES.damage_cost_batch(accident_types, deaths, injuries)
@@ -0,0 +1,129 @@
+"""Compiled single-row inference for the severity preprocessor + random forest.
+
+The fitted ColumnTransformer is reduced to imputer fill values, scaler means and
+scales, and a one-hot column lookup; the forest is flattened into concatenated
+node arrays that are walked for all trees at once. Predicting one incident then
+needs no pandas objects and no per-tree Python calls.
+
+Results match ``RandomForestRegressor.predict`` bit for bit when that runs with
+``n_jobs=1``: features are cast to float32 like sklearn's trees, and tree outputs
+are summed in estimator order before dividing by the number of trees. (With
+``n_jobs > 1`` sklearn's own summation order varies between calls.)
+
+A compiled model holds only NumPy arrays and plain values, so it can stand in for the
+forest wherever ``predict`` is all that is needed: ``predict`` scores preprocessed
+feature matrices like ``RandomForestRegressor.predict``, and a model saved with
+joblib and loaded with ``mmap_mode`` shares its node arrays between processes.
+"""
+import numpy as np
+
+from core.data_cache import frame_cache
+
+BATCH_ALL_TREES_ROWS = 1000  # Up to this many rows ``predict`` walks every tree at once, beyond it tree by tree
+
+
+class CompiledSeverityModel:
+    """NumPy-only equivalent of ``model.predict(preprocessor.transform(row))``."""
+
+    def __init__(self, preprocessor, model):
+        self._compile_preprocessor(preprocessor)
+        self._compile_forest(model)
+
+    def _compile_preprocessor(self, preprocessor):
+        numeric = preprocessor.named_transformers_['num']
+        categorical = preprocessor.named_transformers_['cat']
+        self.numeric_columns = list(preprocessor.transformers_[0][2])
+        self.categorical_column = list(preprocessor.transformers_[1][2])[0]
+        self.n_features = sum(s.stop - s.start for s in preprocessor.output_indices_.values())
+
+        scaler = numeric.named_steps['scaler']
+        self.numeric_fill = numeric.named_steps['imputer'].statistics_.astype(np.float64)
+        self.numeric_mean = scaler.mean_ if scaler.mean_ is not None else np.zeros(len(self.numeric_columns))
+        self.numeric_scale = scaler.scale_ if scaler.scale_ is not None else np.ones(len(self.numeric_columns))
+        self.numeric_slice = preprocessor.output_indices_['num']
+
+        cat_offset = preprocessor.output_indices_['cat'].start
+        self.category_fill = categorical.named_steps['imputer'].statistics_[0]
+        categories = categorical.named_steps['onehot'].categories_[0]
+        self.category_columns = {value: cat_offset + i for i, value in enumerate(categories)}
+
+    def _compile_forest(self, model):
+        trees = [estimator.tree_ for estimator in model.estimators_]
+        sizes = np.array([tree.node_count for tree in trees])
+        offsets = np.concatenate([[0], np.cumsum(sizes)[:-1]])
+
+        left = np.concatenate([tree.children_left for tree in trees]).astype(np.int64)
+        right = np.concatenate([tree.children_right for tree in trees]).astype(np.int64)
+        node_offsets = np.repeat(offsets, sizes)
+        nodes = np.arange(sizes.sum())
+        leaf = left == -1
+        # Leaves point at themselves so extra walk steps are no-ops
+        self.left = np.where(leaf, nodes, left + node_offsets)
+        self.right = np.where(leaf, nodes, right + node_offsets)
+        self.feature = np.where(leaf, 0, np.concatenate([tree.feature for tree in trees])).astype(np.int64)
+        self.threshold = np.concatenate([tree.threshold for tree in trees])
+        self.value = np.concatenate([tree.value[:, 0, 0] for tree in trees])
+        self.roots = offsets.astype(np.int64)
+        self.depths = np.array([tree.max_depth for tree in trees], dtype=np.int64)
+        self.max_depth = int(self.depths.max())
+        self.n_trees = len(trees)
+
+    @property
+    def nbytes(self):
+        return int(sum(a.nbytes for a in (self.left, self.right, self.feature, self.threshold, self.value)))
+
+    def features(self, accident_type, deaths, injuries, rescue_time):
+        """Feature vector (float32, as the trees see it) for one incident."""
+        raw = np.array([deaths, injuries, rescue_time], dtype=np.float64)
+        raw = np.where(np.isnan(raw), self.numeric_fill, raw)
+        x = np.zeros(self.n_features, dtype=np.float64)
+        x[self.numeric_slice] = (raw - self.numeric_mean) / self.numeric_scale
+        if accident_type != accident_type:  # NaN only; like SimpleImputer, None is an unknown category
+            accident_type = self.category_fill
+        column = self.category_columns.get(accident_type)
+        if column is not None:
+            x[column] = 1.0
+        return x.astype(np.float32)
+
+    def predict_features(self, x):
+        """Forest prediction for one float32 feature vector."""
+        nodes = self.roots
+        for _ in range(self.max_depth):
+            nodes = np.where(x[self.feature[nodes]] <= self.threshold[nodes], self.left[nodes], self.right[nodes])
+        # Sequential sum in estimator order, as sklearn accumulates tree predictions
+        return np.add.accumulate(self.value[nodes])[-1] / self.n_trees
+
+    def predict_one(self, accident_type, deaths, injuries, rescue_time):
+        """Predicted severity for one incident."""
+        return float(self.predict_features(self.features(accident_type, deaths, injuries, rescue_time)))
+
+    def predict(self, X):
+        """Forest predictions for preprocessed rows (an array or DataFrame), as ``model.predict(X)``."""
+        X = np.asarray(X, dtype=np.float32)
+        if len(X) <= BATCH_ALL_TREES_ROWS:
+            # Few rows: one (rows, trees) walk keeps the number of NumPy calls at the forest depth
+            nodes = self._walk(X, np.broadcast_to(self.roots, (len(X), self.n_trees)), self.max_depth)
+            return np.add.accumulate(self.value[nodes], axis=1)[:, -1] / self.n_trees
+        # Many rows: per-tree walks stay in cache and stop at each tree's own depth
+        total = np.zeros(len(X))
+        for root, depth in zip(self.roots, self.depths):
+            total += self.value[self._walk(X, np.full(len(X), root), depth)]
+        return total / self.n_trees
+
+    def _walk(self, X, nodes, depth):
+        """Leaves reached from ``nodes`` (one row of node ids per row of ``X``) after ``depth`` steps."""
+        cells = X.ravel()
+        offsets = np.arange(len(X)) * X.shape[1]
+        if nodes.ndim == 2:
+            offsets = offsets[:, None]
+        for _ in range(depth):
+            go_left = cells.take(offsets + self.feature.take(nodes)) <= self.threshold.take(nodes)
+            nodes = np.where(go_left, self.left.take(nodes), self.right.take(nodes))
+        return nodes
+
+
+def cached_compiled_model(model_key, preprocessor, model):
+    """Compile once per persisted model artifact and share across sessions."""
+    if isinstance(model, CompiledSeverityModel):
+        return model  # Already compiled, e.g. served from a shared snapshot
+    return frame_cache.get_or_load(('compiled_model', model_key), lambda: CompiledSeverityModel(preprocessor, model))
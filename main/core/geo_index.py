@@ -0,0 +1,197 @@
+"""Railway zone and state spatial index for accident hotspot and proximity queries.
+
+Accidents are located through a bundled table of centroids (``Assests/geo_centroids.csv``):
+zone headquarters keyed by the division codes of the accident analysis dataset, and
+state centroids. Each distinct zone/state value is resolved to a centroid once (exact
+name, code or alias, then the longest alias it contains), and accident counts and
+casualty sums are aggregated per centroid. Hotspot rankings and heatmap tiles
+(centroid aggregates binned into lat/lon grid cells at a few sizes) are precomputed
+from those aggregates, so their cost depends on the number of zones and states, not
+on the number of accidents; indexes over new rows are merged the same way.
+"""
+import os
+
+import numpy as np
+import pandas as pd
+
+from core.columnar_store import ASSETS_DIR
+from core.data_cache import frame_cache
+
+CENTROIDS_PATH = os.path.join(ASSETS_DIR, "geo_centroids.csv")
+LEVELS = ('zone', 'state')
+MEASURES = ['accidents', 'killed', 'injured']
+TILE_SIZES_DEG = (1, 2, 5)
+EARTH_RADIUS_KM = 6371.0088
+
+
+def haversine_km(lat, lon, lats, lons):
+    """Great-circle distances (km) from one point to arrays of points."""
+    lat, lon, lats, lons = (np.radians(np.asarray(v, dtype=np.float64)) for v in (lat, lon, lats, lons))
+    a = np.sin((lats - lat) / 2) ** 2 + np.cos(lat) * np.cos(lats) * np.sin((lons - lon) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(a))
+
+
+class Centroids:
+    """Bundled zone/state centroids with an alias lookup per level."""
+
+    def __init__(self, table):
+        self.table = table.set_index(['level', 'key'])
+        self.aliases = {level: {} for level in LEVELS}
+        for row in table.itertuples(index=False):
+            names = [row.key, row.name] + (str(row.aliases).split('|') if isinstance(row.aliases, str) else [])
+            for name in names:
+                self.aliases[row.level].setdefault(name.strip().lower(), row.key)
+        # Longest alias first, so "north central" wins over "central"
+        self._by_length = {level: sorted(aliases, key=len, reverse=True) for level, aliases in self.aliases.items()}
+
+    @classmethod
+    def load(cls, path=CENTROIDS_PATH):
+        return cls(pd.read_csv(path, keep_default_na=False, na_values=['']))
+
+    def resolve(self, level, text):
+        """Centroid key for a zone/state name, code or alias (None when unknown)."""
+        if text is None or text != text:
+            return None
+        needle = str(text).strip().lower()
+        if needle in self.aliases[level]:
+            return self.aliases[level][needle]
+        for alias in self._by_length[level]:
+            if len(alias) > 3 and alias in needle:
+                return self.aliases[level][alias]
+        return None
+
+    def locate(self, text):
+        """(level, key, name, lat, lon) for a state or zone mentioned by name, or None."""
+        for level in ('state', 'zone'):
+            key = self.resolve(level, text)
+            if key is not None:
+                row = self.table.loc[(level, key)]
+                return level, key, row['name'], float(row['lat']), float(row['lon'])
+        return None
+
+    def names(self, level):
+        return self.table.loc[level, 'name']
+
+
+_centroids = None
+
+
+def bundled_centroids():
+    """The bundled centroid table, loaded once per process."""
+    global _centroids
+    if _centroids is None:
+        _centroids = Centroids.load()
+    return _centroids
+
+
+class GeoIndex:
+    """Accidents, killed and injured per zone or state centroid, with hotspot rankings and heatmap tiles."""
+
+    def __init__(self, level, counts, unlocated=None, centroids=None):
+        self.level = level
+        self.centroids = centroids or bundled_centroids()
+        self.counts = counts[counts['accidents'] > 0]
+        self.unlocated = unlocated if unlocated is not None else pd.Series(dtype=np.int64)
+        places = self.centroids.table.loc[level]
+        table = places.loc[self.counts.index, ['name', 'lat', 'lon']].join(self.counts)
+        self.table = table.rename_axis('key')
+        self._rankings = {m: self.table.sort_values(m, ascending=False, kind='stable').index for m in MEASURES}
+        self._lats, self._lons = self.table['lat'].to_numpy(), self.table['lon'].to_numpy()
+        self.tiles = {size: self._tile(size) for size in TILE_SIZES_DEG}
+
+    @classmethod
+    def from_frame(cls, df, level, column, killed, injured, centroids=None):
+        """Index ``df`` by its ``column`` of zone/state values; ``killed``/``injured`` name the casualty columns."""
+        centroids = centroids or bundled_centroids()
+        frame = pd.DataFrame({'value': df[column].astype(object), 'killed': df[killed].fillna(0).to_numpy(),
+                              'injured': df[injured].fillna(0).to_numpy()})
+        grouped = frame.groupby('value', dropna=False, sort=False)
+        by_value = grouped[['killed', 'injured']].sum()
+        by_value.insert(0, 'accidents', grouped.size())
+        # Resolve each distinct value once
+        keys = pd.Series([centroids.resolve(level, v) for v in by_value.index], index=by_value.index)
+        located = keys.notna().to_numpy()
+        counts = by_value[located].groupby(keys[located].to_numpy()).sum()
+        unlocated = by_value.loc[~located, 'accidents']
+        unlocated.index = unlocated.index.map(lambda v: 'Unknown' if v != v else str(v))
+        return cls(level, counts, unlocated.groupby(level=0).sum(), centroids)
+
+    @classmethod
+    def by_zone_code(cls, df):
+        """Zones of the accident analysis dataset (``railway_division`` codes, killed, injured)."""
+        return cls.from_frame(df, 'zone', 'railway_division', 'killed', 'injured')
+
+    @classmethod
+    def by_zone_name(cls, df):
+        """Zones of the 1902-2024 dataset (``Accident Rail Zone`` names, Deaths, Injuries)."""
+        return cls.from_frame(df, 'zone', 'Accident Rail Zone', 'Deaths', 'Injuries')
+
+    @classmethod
+    def by_state(cls, df):
+        """States of the 1902-2024 dataset (``State``, Deaths, Injuries)."""
+        return cls.from_frame(df, 'state', 'State', 'Deaths', 'Injuries')
+
+    @classmethod
+    def merge(cls, indexes):
+        """Combine indexes built over disjoint rows, e.g. chunks of a streamed upload or newly archived rows."""
+        indexes = list(indexes)
+        counts = pd.concat([index.counts for index in indexes]).groupby(level=0).sum()
+        unlocated = pd.concat([index.unlocated for index in indexes]).groupby(level=0).sum()
+        return cls(indexes[0].level, counts, unlocated.astype(np.int64), indexes[0].centroids)
+
+    def without(self, index):
+        """This index less one built over some of its rows, e.g. rows superseded by a refresh."""
+        counts = self.counts.sub(index.counts, fill_value=0)
+        unlocated = self.unlocated.sub(index.unlocated, fill_value=0).astype(np.int64)
+        return GeoIndex(self.level, counts.astype(self.counts.dtypes.to_dict()), unlocated[unlocated > 0],
+                        self.centroids)
+
+    @property
+    def nbytes(self):
+        tiles = sum(int(t.memory_usage(deep=True).sum()) for t in self.tiles.values())
+        return int(self.table.memory_usage(deep=True).sum()) + tiles
+
+    def _tile(self, size):
+        """Aggregates per ``size``-degree grid cell, located at the cell centre."""
+        if self.table.empty:
+            return pd.DataFrame(columns=['lat', 'lon'] + MEASURES)
+        rows = np.floor(self._lats / size).astype(np.int64)
+        cols = np.floor(self._lons / size).astype(np.int64)
+        tiles = self.table[MEASURES].groupby([rows, cols]).sum()
+        tiles.index.names = ['row', 'col']
+        tiles = tiles.reset_index()
+        tiles.insert(0, 'lat', (tiles.pop('row') + 0.5) * size)
+        tiles.insert(1, 'lon', (tiles.pop('col') + 0.5) * size)
+        return tiles
+
+    def heatmap(self, size=TILE_SIZES_DEG[0]):
+        """Precomputed heatmap tile for ``size`` degrees (one of ``TILE_SIZES_DEG``)."""
+        if size not in self.tiles:
+            raise ValueError(f"No precomputed tiles of {size}°; available: {TILE_SIZES_DEG}")
+        return self.tiles[size]
+
+    def hotspots(self, n=10, by='accidents'):
+        """The ``n`` zones/states with the most accidents (or killed/injured)."""
+        return self.table.loc[self._rankings[by][:n]]
+
+    def near(self, lat, lon, radius_km=None, n=None):
+        """Zones/states by distance from (lat, lon), optionally within ``radius_km`` and limited to ``n``."""
+        distances = haversine_km(lat, lon, self._lats, self._lons)
+        order = np.argsort(distances, kind='stable')
+        if radius_km is not None:
+            order = order[distances[order] <= radius_km]
+        if n is not None:
+            order = order[:n]
+        return self.table.iloc[order].assign(distance_km=distances[order])
+
+    def near_place(self, place, radius_km=None, n=None):
+        """``near`` a state or zone given by name, or None if the place is not in the centroid table."""
+        located = self.centroids.locate(place)
+        if located is None:
+            return None
+        return self.near(located[3], located[4], radius_km, n)
+
+
+def cached_geo_index(dataset_key, level, build):
+    """The ``level`` index returned by ``build()``, built once per dataset in the shared process-wide cache."""
+    return frame_cache.get_or_load((dataset_key, f'geo_index_{level}'), build)
@@ -0,0 +1,171 @@
+"""Append-only refresh of a loaded dataset, with new and changed rows detected by row hashes.
+
+``AppendOnlyDataset`` keeps the stored rows under stable row ids together with a
+64-bit hash of each row's content (numbers hashed as floats, so ``3`` and ``3.0``
+match across exports). ``diff`` hashes a refresh upload - the latest full export or
+just the new rows - and splits it into rows already stored, new rows and, when
+``key`` columns identify an incident, new versions of stored rows. Callers fold the
+``Delta`` into what they derived from the stored rows (feature frames, aggregate
+cubes, geo indexes, preprocessing statistics), so a refresh costs hashing the
+upload plus work proportional to the delta instead of re-deriving the history.
+
+Rows are compared as multisets, since identical rows can be distinct incidents: an
+upload with three copies of a row stored twice adds one. Refreshes only add or
+replace rows; rows missing from an upload are kept.
+"""
+import copy
+
+import numpy as np
+import pandas as pd
+
+from core.data_cache import content_hash
+from core.streaming import validate_columns
+
+REFIT_ROW_FRACTION = 0.1  # Flag a refit once this share of rows has arrived since the model was fitted
+REFIT_MEAN_SHIFT = 0.1  # ... or a numeric feature's mean has moved by this many fitted standard deviations
+
+
+def row_hashes(df, columns):
+    """uint64 hash per row of ``df[columns]``, comparing numbers as floats."""
+    # Text hashes by value whether stored as object, string or categorical, so only numbers need casting
+    canonical = pd.DataFrame({
+        c: df[c].astype(np.float64) if pd.api.types.is_numeric_dtype(df[c]) else df[c] for c in columns
+    })
+    return pd.util.hash_pandas_object(canonical, index=False).to_numpy()
+
+
+def append_rows(frame, rows):
+    """``frame`` followed by ``rows``, keeping categorical columns categorical over the union of their categories."""
+    rows = rows[frame.columns]
+    for col in frame.columns:
+        if isinstance(frame[col].dtype, pd.CategoricalDtype):
+            categories = frame[col].cat.categories.union(pd.Index(rows[col].dropna().unique()), sort=False)
+            frame = frame.assign(**{col: frame[col].cat.set_categories(categories)})
+            rows = rows.assign(**{col: pd.Categorical(rows[col], categories=categories)})
+    return pd.concat([frame, rows])
+
+
+class Delta:
+    """What a refresh changes: ``added`` rows (new ids) and the stored rows they ``replaced``."""
+
+    def __init__(self, added, replaced, new, unchanged, hashes, key_hashes=None):
+        self.added = added
+        self.replaced = replaced
+        self.new = int(new)
+        self.unchanged = int(unchanged)
+        self.hashes = hashes
+        self.key_hashes = key_hashes
+
+    @property
+    def changed(self):
+        """Added rows that are new versions of stored rows."""
+        return len(self.added) - self.new
+
+    def __bool__(self):
+        return len(self.added) > 0
+
+    def summary(self):
+        return f"{self.new:,} new, {self.changed:,} changed and {self.unchanged:,} unchanged rows"
+
+
+class AppendOnlyDataset:
+    """
+    Rows indexed by stable row ids, with content hashes over ``columns`` (default: all).
+
+    ``key`` names columns identifying an incident (e.g. its time and train); a refresh
+    row whose key matches stored rows but whose content differs replaces them.
+    ``aggregates`` holds caller-maintained results derived from the rows.
+    """
+
+    def __init__(self, frame, dataset_key, columns=None, key=None):
+        self.frame = frame.reset_index(drop=True)
+        self.dataset_key = dataset_key
+        self.columns = list(columns or frame.columns)
+        self.key = list(key) if key else None
+        self.hashes = row_hashes(self.frame, self.columns)
+        self.key_hashes = row_hashes(self.frame, self.key) if self.key else None
+        self.next_id = len(self.frame)
+        self.refreshes = 0
+        self.aggregates = {}
+
+    def __len__(self):
+        return len(self.frame)
+
+    @property
+    def nbytes(self):
+        rows = int(self.frame.memory_usage(deep=True).sum()) + self.hashes.nbytes
+        keys = self.key_hashes.nbytes if self.key_hashes is not None else 0
+        return rows + keys + sum(int(getattr(value, 'nbytes', 0)) for value in self.aggregates.values())
+
+    def diff(self, upload):
+        """Split ``upload`` into unchanged, new and changed rows against the stored rows."""
+        validate_columns(upload.columns, self.frame.columns)
+        upload = upload[self.frame.columns].reset_index(drop=True)
+        hashes = row_hashes(upload, self.columns)
+        stored = len(self.hashes)
+        if len(hashes) >= stored and np.array_equal(hashes[:stored], self.hashes):
+            # An append-only export: the stored rows come first and in order, so only the tail is new
+            unseen = np.arange(len(hashes)) >= stored
+        else:
+            # Identical rows can be distinct incidents, so compare as multisets: the k-th copy of a row
+            # in the upload is new when fewer than k copies are stored
+            codes, uniques = pd.factorize(np.concatenate([self.hashes, hashes]))
+            upload_codes = codes[stored:]
+            copies = np.bincount(codes[:stored], minlength=len(uniques))[upload_codes]
+            unseen = pd.Series(upload_codes).groupby(upload_codes).cumcount().to_numpy() >= copies
+        added = upload[unseen]
+        key_hashes = row_hashes(added, self.key) if self.key else None
+        replaced = np.zeros(len(self.frame), dtype=bool)
+        new = np.ones(len(added), dtype=bool)
+        if self.key and len(added):
+            # Stored rows whose incident reappears with different content, unless that exact row is re-sent too
+            replaced = pd.Series(self.key_hashes).isin(key_hashes).to_numpy()
+            if replaced.any():
+                replaced = replaced & ~pd.Series(self.hashes).isin(hashes).to_numpy()
+                new = ~pd.Series(key_hashes).isin(self.key_hashes[replaced]).to_numpy()
+        added = added.set_axis(pd.RangeIndex(self.next_id, self.next_id + len(added)))
+        return Delta(added, self.frame[replaced], new.sum(), (~unseen).sum(), hashes[unseen], key_hashes)
+
+    def apply(self, delta):
+        """A new dataset with ``delta`` applied; this one (possibly shared across sessions) is left as is."""
+        refreshed = copy.copy(self)
+        keep = ~self.frame.index.isin(delta.replaced.index)
+        refreshed.frame = append_rows(self.frame[keep], delta.added)
+        refreshed.hashes = np.concatenate([self.hashes[keep], delta.hashes])
+        if self.key:
+            refreshed.key_hashes = np.concatenate([self.key_hashes[keep], delta.key_hashes])
+        refreshed.next_id = self.next_id + len(delta.added)
+        refreshed.refreshes = self.refreshes + 1
+        refreshed.aggregates = dict(self.aggregates)
+        # Identify the version by its lineage, for keying caches of anything derived from it
+        lineage = self.dataset_key.encode() + delta.hashes.tobytes() + delta.replaced.index.to_numpy().tobytes()
+        refreshed.dataset_key = content_hash(lineage)
+        return refreshed
+
+
+def refit_reasons(preprocessor, statistics, row_fraction=REFIT_ROW_FRACTION, mean_shift=REFIT_MEAN_SHIFT):
+    """
+    Why a model fitted through ``preprocessor`` (a ``num``/``cat`` ColumnTransformer) no
+    longer matches the data described by ``statistics`` (a StreamedUpload); empty if it does.
+    """
+    columns = {name: list(cols) for name, _, cols in preprocessor.transformers}
+    scaler = preprocessor.named_transformers_['num'].named_steps['scaler']
+    reasons = []
+
+    fitted_rows = int(np.max(scaler.n_samples_seen_))
+    added = statistics.rows - fitted_rows
+    if added > row_fraction * fitted_rows:
+        reasons.append(f"{added:,} rows added since the fit (+{added / max(fitted_rows, 1):.0%})")
+
+    stats = statistics.numeric
+    means = stats.mean[[stats.columns.index(c) for c in columns['num']]]
+    for col, shift in zip(columns['num'], np.abs(means - scaler.mean_) / scaler.scale_):
+        if shift > mean_shift:
+            reasons.append(f"mean {col} moved by {shift:.2f} standard deviations")
+
+    category_column = columns['cat'][0]
+    fitted = preprocessor.named_transformers_['cat'].named_steps['onehot'].categories_[0]
+    unknown = sorted(set(statistics.categories.categories(category_column)) - set(fitted), key=str)
+    if unknown:
+        reasons.append(f"{category_column} values the model ignores: {', '.join(map(str, unknown))}")
+    return reasons
@@ -0,0 +1,222 @@
+"""Pooled, retrying, streaming client for OpenAI-compatible chat completion APIs.
+
+One ``requests.Session`` with keep-alive connection pooling is reused for every
+query. Transient failures (429/5xx, connection errors) retry with exponential
+backoff. Completions the server finished (a stream cut off before ``[DONE]`` is
+not) are cached on disk, keyed by the model, ``max_tokens``, the normalized prompt
+and the retrieved context, and expire after a TTL; expired entries are swept at
+most once per ``RAILWAY_LLM_CACHE_PRUNE`` seconds as new ones are written. Point
+``GROQ_API_URL`` at ``tools/mock_llm_server.py`` to exercise the client without
+network access.
+"""
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+DEFAULT_API_URL = os.environ.get("GROQ_API_URL", "https://api.groq.com/openai/v1/chat/completions")
+DEFAULT_MODEL = "llama3-8b-8192"
+DEFAULT_MAX_TOKENS = 750
+CACHE_DIR = os.environ.get(
+    "RAILWAY_LLM_CACHE_DIR",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "llm_cache"),
+)
+CACHE_TTL_SECONDS = float(os.environ.get("RAILWAY_LLM_CACHE_TTL", str(24 * 3600)))
+CACHE_PRUNE_SECONDS = float(os.environ.get("RAILWAY_LLM_CACHE_PRUNE", "3600"))
+CONNECT_TIMEOUT = 5
+READ_TIMEOUT = 60
+RETRIES = 3
+BACKOFF_FACTOR = 0.5
+
+
+class ChatError(RuntimeError):
+    """The chat API returned an error payload or an unusable response."""
+
+
+def normalize_prompt(prompt):
+    """Case- and whitespace-insensitive form of a prompt, for cache keys."""
+    return " ".join(str(prompt).lower().split())
+
+
+class CompletionCache:
+    """Completions stored as one JSON file per key, expiring ``ttl`` seconds after they were written."""
+
+    def __init__(self, directory=CACHE_DIR, ttl=CACHE_TTL_SECONDS, prune_every=CACHE_PRUNE_SECONDS):
+        self.directory = directory
+        self.ttl = ttl
+        self.prune_every = prune_every
+        self._next_prune = 0.0  # The first write sweeps entries left by earlier processes
+        self._prune_lock = threading.Lock()
+
+    def key(self, model, prompt, context, max_tokens):
+        payload = json.dumps([model, max_tokens, normalize_prompt(prompt), context], ensure_ascii=False)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.directory, key + ".json")
+
+    @staticmethod
+    def _read(path):
+        try:
+            with open(path, encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _expired(self, entry):
+        """Expiry from the entry's own ``created`` time, for both reads and sweeps."""
+        return time.time() - entry.get("created", 0) > self.ttl
+
+    def get(self, key):
+        path = self._path(key)
+        entry = self._read(path)
+        if entry is None:
+            return None
+        if self._expired(entry):
+            self._remove(path)
+            return None
+        return entry.get("content")
+
+    def put(self, key, content):
+        os.makedirs(self.directory, exist_ok=True)
+        # A unique temporary file, so concurrent writers of one key never interleave
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump({"created": time.time(), "content": content}, f)
+            os.replace(tmp_path, self._path(key))
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        self.maybe_prune()
+
+    def maybe_prune(self):
+        """``prune`` if the last sweep by this cache was more than ``prune_every`` seconds ago."""
+        with self._prune_lock:
+            if time.monotonic() < self._next_prune:
+                return 0
+            self._next_prune = time.monotonic() + self.prune_every
+        return self.prune()
+
+    def prune(self):
+        """Delete expired and unreadable entries; returns how many were removed."""
+        if not os.path.isdir(self.directory):
+            return 0
+        removed = 0
+        for name in os.listdir(self.directory):
+            path = os.path.join(self.directory, name)
+            if name.endswith(".json"):
+                entry = self._read(path)
+                if entry is None or self._expired(entry):
+                    removed += self._remove(path)
+        return removed
+
+    @staticmethod
+    def _remove(path):
+        try:
+            os.remove(path)
+            return 1
+        except OSError:
+            return 0
+
+
+def build_session(retries=RETRIES, backoff_factor=BACKOFF_FACTOR, pool_size=16):
+    """Keep-alive session retrying idempotent failures and rate limits with backoff."""
+    retry = Retry(total=retries, backoff_factor=backoff_factor, status_forcelist=(429, 500, 502, 503, 504),
+                  allowed_methods=frozenset({"POST"}), raise_on_status=False)
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+class ChatClient:
+    """Chat completions over a pooled session, with streaming and a disk cache."""
+
+    def __init__(self, api_key, api_url=DEFAULT_API_URL, model=DEFAULT_MODEL, max_tokens=DEFAULT_MAX_TOKENS,
+                 timeout=(CONNECT_TIMEOUT, READ_TIMEOUT), cache=None, session=None):
+        self.api_key = api_key
+        self.api_url = api_url
+        self.model = model
+        self.max_tokens = max_tokens
+        self.timeout = timeout
+        self.cache = cache if cache is not None else CompletionCache()
+        self.session = session or build_session()
+
+    def _request(self, prompt, stream):
+        headers = {"Authorization": f"Bearer {self.api_key}", "Content-Type": "application/json"}
+        data = {
+            "model": self.model,
+            "messages": [{"role": "user", "content": prompt}],
+            "max_tokens": self.max_tokens,
+            "stream": stream,
+        }
+        response = self.session.post(self.api_url, json=data, headers=headers, timeout=self.timeout, stream=stream)
+        if response.status_code >= 400:
+            try:
+                detail = response.json()
+            except ValueError:
+                detail = response.text
+            raise ChatError(f"API Error ({response.status_code}): {detail}")
+        return response
+
+    def complete(self, prompt, context=""):
+        """Full completion text for ``prompt`` (``context`` is part of the cache key)."""
+        return "".join(self.stream(prompt, context))
+
+    def stream(self, prompt, context=""):
+        """
+        Yield completion text as it arrives; cached completions are yielded at once.
+        Only completions the server finished are cached, so a dropped stream is asked again.
+        """
+        key = self.cache.key(self.model, prompt, context, self.max_tokens)
+        cached = self.cache.get(key)
+        if cached is not None:
+            yield cached
+            return
+
+        parts = []
+        with self._request(prompt, stream=True) as response:
+            if "text/event-stream" not in response.headers.get("Content-Type", ""):
+                # Server ignored "stream": treat the body as a regular completion
+                parts.append(self._content(response.json()))
+                yield parts[-1]
+                finished = True
+            else:
+                finished = yield from self._iter_deltas(response, parts)
+        if finished:
+            self.cache.put(key, "".join(parts))
+
+    @staticmethod
+    def _content(payload):
+        if "choices" not in payload:
+            raise ChatError(f"API Error: {payload}")
+        return payload["choices"][0]["message"]["content"]
+
+    @staticmethod
+    def _iter_deltas(response, parts):
+        """
+        Text deltas from an OpenAI-style server-sent event stream, also appended to ``parts``;
+        returns whether the stream ended with ``[DONE]`` rather than being cut off.
+        """
+        for line in response.iter_lines(decode_unicode=True):
+            if not line or not line.startswith("data:"):
+                continue
+            data = line[len("data:"):].strip()
+            if data == "[DONE]":
+                return True
+            chunk = json.loads(data)
+            if "error" in chunk:
+                raise ChatError(f"API Error: {chunk['error']}")
+            delta = chunk["choices"][0].get("delta", {}).get("content")
+            if delta:
+                parts.append(delta)
+                yield delta
+        return False
@@ -0,0 +1,87 @@
+"""On-disk registry of fitted severity model artifacts.
+
+Artifacts (the fitted ColumnTransformer, the forest and its metrics) are keyed by a
+content hash of the training data plus the hyperparameters, so every session and
+every process serving the same dataset reuses one fitted model instead of retraining.
+"""
+import hashlib
+import json
+import os
+import tempfile
+
+import joblib
+import pandas as pd
+import sklearn
+
+from core.data_cache import SharedCache
+
+REGISTRY_DIR = os.environ.get(
+    "RAILWAY_MODEL_REGISTRY",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "model_registry"),
+)
+ARTIFACT_SUFFIX = ".joblib"
+DEFAULT_MAX_MB = float(os.environ.get("RAILWAY_MODEL_CACHE_MB", "512"))
+
+# Process-wide LRU of artifacts already mapped into memory, shared by all sessions.
+# Entries are sized by their uncompressed file, which is close to their in-memory size.
+_loaded = SharedCache(DEFAULT_MAX_MB * 1024 * 1024)
+
+
+def dataset_hash(df):
+    """Return a stable SHA-256 of a dataframe's column names and cell values."""
+    digest = hashlib.sha256()
+    digest.update("\x1f".join(map(str, df.columns)).encode("utf-8"))
+    digest.update(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+def artifact_key(df, params):
+    """Key an artifact by training data content, hyperparameters and sklearn version."""
+    return key_for_hash(dataset_hash(df), params)
+
+
+def key_for_hash(data_hash, params):
+    """``artifact_key`` for data identified by a precomputed hash, e.g. of a file too large to load."""
+    payload = json.dumps({"params": params, "sklearn": sklearn.__version__}, sort_keys=True, default=str)
+    return hashlib.sha256((data_hash + payload).encode("utf-8")).hexdigest()[:32]
+
+
+def artifact_path(key):
+    return os.path.join(REGISTRY_DIR, key + ARTIFACT_SUFFIX)
+
+
+def latest_key():
+    """Key of the most recently saved artifact, or None when the registry is empty."""
+    if not os.path.isdir(REGISTRY_DIR):
+        return None
+    paths = [os.path.join(REGISTRY_DIR, name) for name in os.listdir(REGISTRY_DIR) if name.endswith(ARTIFACT_SUFFIX)]
+    if not paths:
+        return None
+    return os.path.basename(max(paths, key=os.path.getmtime))[:-len(ARTIFACT_SUFFIX)]
+
+
+def load(key):
+    """Return the artifact stored under ``key`` or None; arrays are memory-mapped read-only."""
+    artifact = _loaded.get(key)
+    if artifact is not None:
+        return artifact
+    path = artifact_path(key)
+    if not os.path.exists(path):
+        return None
+    return _loaded.put(key, joblib.load(path, mmap_mode="r"), size=os.path.getsize(path))
+
+
+def save(key, artifact):
+    """Persist ``artifact`` atomically so concurrent processes never read a partial file."""
+    os.makedirs(REGISTRY_DIR, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=REGISTRY_DIR, suffix=".tmp")
+    os.close(fd)
+    try:
+        # Uncompressed dumps are required for memory-mapped loading.
+        joblib.dump(artifact, tmp_path)
+        os.replace(tmp_path, artifact_path(key))
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    _loaded.put(key, artifact, size=os.path.getsize(artifact_path(key)))
+    return artifact_path(key)
@@ -0,0 +1,356 @@
+"""Intent router and structured query engine for the assistant's statistical questions.
+
+Questions such as "deaths by state in the 1990s" or "top causes since 2010" are
+parsed into a ``StructuredQuery`` and answered from a pre-aggregated group-by
+index (counts, deaths and injuries per year x state x cause x type x zone) built
+once per dataset. Anything the parser does not recognise returns None so the
+caller can fall back to the LLM, and so do narrative questions ("what caused the
+1981 Bihar disaster?") and questions naming a year, place or train the parsed
+query would not use: a partial parse would answer a different question.
+Hotspot ("top 5 accident hotspots") and proximity ("accidents within 200 km of
+Delhi") questions are parsed into a ``GeoQuery`` and answered from the
+precomputed state/zone ``GeoIndex``.
+"""
+import re
+import sys
+
+import numpy as np
+import pandas as pd
+
+from core.data_cache import frame_cache
+
+# Dimensions kept in the group-by index, keyed by how questions refer to them
+DIMENSIONS = {
+    'state': 'State',
+    'cause': 'Standard Cause Type',
+    'type': 'Standard Accident Type',
+    'zone': 'Accident Rail Zone',
+    'year': 'Year',
+    'decade': 'Decade',
+}
+INDEX_DIMENSIONS = ['Year', 'State', 'Standard Cause Type', 'Standard Accident Type', 'Accident Rail Zone']
+
+METRIC_WORDS = [
+    ('casualties', re.compile(r"\bcasualt(?:y|ies)\b")),
+    ('Deaths', re.compile(r"\b(?:deaths?|killed|fatalit(?:y|ies)|died|dead)\b")),
+    ('Injuries', re.compile(r"\b(?:injur(?:y|ies|ed))\b")),
+    ('accidents', re.compile(r"\b(?:accidents?|incidents?|crash(?:es)?|how many|number of|count)\b")),
+]
+GROUP_WORDS = [
+    ('decade', re.compile(r"\b(?:by|per|each|every|across)\s+decades?\b|\bdecade[- ]wise\b")),
+    ('year', re.compile(r"\b(?:by|per|each|every|across)\s+years?\b|\byear[- ]wise\b|\bannual(?:ly)?\b|\btrend\b")),
+    ('state', re.compile(r"\bstates?\b")),
+    ('zone', re.compile(r"\b(?:zones?|railway zones?)\b")),
+    ('cause', re.compile(r"\bcauses?\b")),
+    ('type', re.compile(r"\b(?:types?|kinds?|categor(?:y|ies))\b")),
+]
+COUNT_PATTERN = re.compile(r"\b(?:how many|number of|total|count|sum)\b")
+TOP_PATTERN = re.compile(r"\b(?:top|most|highest|worst|largest|biggest|which)\b(?:\s+(\d+))?")
+DECADE_PATTERN = re.compile(r"\b(?:in\s+the\s+)?(1[89]\d0|20[0-2]0)'?s\b")
+BETWEEN_PATTERN = re.compile(r"\b(?:between|from)\s+(1[89]\d\d|20\d\d)\s+(?:and|to|-|until)\s+(1[89]\d\d|20\d\d)\b")
+SINCE_PATTERN = re.compile(r"\b(since|after|from)\s+(1[89]\d\d|20\d\d)\b")
+BEFORE_PATTERN = re.compile(r"\b(before|until|till|prior to)\s+(1[89]\d\d|20\d\d)\b")
+YEAR_PATTERN = re.compile(r"\b(1[89]\d\d|20\d\d)\b")
+NARRATIVE_PATTERN = re.compile(
+    r"\bwhat\s+caused\b|\bwhat\s+(?:was|were|is)\s+the\s+causes?\s+of\s+the\b|\bwhy\b|\bdescribe\b|"
+    r"\bexplain\b|\btell\s+me\s+about\b|\bwhat\s+happened\b|\bdetails\b|"
+    r"\bthe\s+(?:[\w-]+\s+){0,4}(?:disaster|tragedy|mishap|wreck)\b")
+# Verbs and nouns for accident types that do not spell the type's name
+TYPE_SYNONYMS = [
+    ('Derailment', re.compile(r"\bderail(?:s|ed|ing|ments?)?\b")),
+    ('Collision', re.compile(r"\bcollid(?:e|es|ed|ing)\b|\bcollisions?\b")),
+    ('Structure Collapse', re.compile(r"\bcollaps(?:e|es|ed|ing)\b")),
+    ('Level crossing', re.compile(r"\blevel[- ]crossings?\b")),
+    ('Bombing', re.compile(r"\bbomb(?:s|ed|ings?)?\b|\bblasts?\b|\bexplosions?\b")),
+    ('Attack', re.compile(r"\battack(?:s|ed)?\b")),
+    ('Fire', re.compile(r"\bfires?\b|\bburn(?:s|t|ed|ing)?\b|\bcaught\s+fire\b")),
+]
+# Columns naming individual accidents, trains and places; their proper names are not index dimensions
+NAME_COLUMNS = ['Accident Name', 'Train Name', 'Location']
+# Capitalised words of those columns that are ordinary vocabulary rather than names
+GENERIC_NAME_WORDS = frozenset("""
+    accident accidents attack away basin beach between blasts block bomb bombing bombings bridge cabin capital
+    cargo central city coal collapse collision commuter coupled covid crash crashed crossing death decker delta
+    deluxe derailment diesel disaster district double down downward east electric employees empty engine engines
+    explosion explosive express fast fire forest freight frontier ghat ghats girder golden goods grand halt harbour
+    head holiday incharge incident india island junction lake level light link local mail minivan mishap mixed
+    mount mountain multiple near north northern outer outskirts overhead passenger queen rail railway railways rear
+    repeat river road sanctuary section serial shuttle south southern special state station stationary stations
+    store suburban superfast tank tanker taxi temple terminal terminus town train trains truck trucks twin unit
+    unknown upper urban valley village wagon washed water weekly west wildlife wiring worker wreck yard
+""".split())
+DEFAULT_TOP_N = 10
+HOTSPOT_PATTERN = re.compile(r"\bhot\s*-?\s*spots?\b|\baccident[- ]prone\b")
+NEAR_PATTERN = re.compile(
+    r"\b(?:within\s+(\d+)\s*(?:km|kilomet(?:er|re)s?)\s+(?:of|from)|near(?:by)?|around|close\s+to)\s+(.+)")
+TIME_PATTERNS = [BETWEEN_PATTERN, DECADE_PATTERN, SINCE_PATTERN, BEFORE_PATTERN, YEAR_PATTERN]
+GEO_MEASURES = {'Deaths': 'killed', 'Injuries': 'injured'}  # Metric -> GeoIndex measure; others rank by accidents
+DEFAULT_HOTSPOTS = 5
+DEFAULT_NEAR_RADIUS_KM = 300
+
+
+class StructuredQuery:
+    """A parsed aggregate question: metric, optional group-by, filters and limit."""
+
+    def __init__(self, metric, group_by=None, year_range=None, filters=None, top_n=None):
+        self.metric = metric
+        self.group_by = group_by
+        self.year_range = year_range
+        self.filters = filters or {}
+        self.top_n = top_n
+
+    def describe(self):
+        metric = {'accidents': 'accidents', 'casualties': 'casualties (deaths + injuries)'}.get(
+            self.metric, self.metric.lower())
+        parts = [f"{'Top ' + str(self.top_n) + ' ' if self.top_n else ''}{metric}"]
+        if self.group_by:
+            parts.append(f"by {self.group_by}")
+        for column, value in self.filters.items():
+            parts.append(f"where {column} = {value}")
+        if self.year_range:
+            start, end = self.year_range
+            parts.append(f"in {start}" if start == end else f"from {start} to {end}")
+        return " ".join(parts)
+
+    def __repr__(self):
+        return f"StructuredQuery({self.describe()!r})"
+
+
+class GeoQuery:
+    """A parsed hotspot (top ``top_n`` places by a measure) or proximity (places near ``place``) question."""
+
+    def __init__(self, by='accidents', top_n=None, place=None, radius_km=None):
+        self.by = by
+        self.top_n = top_n
+        self.place = place
+        self.radius_km = radius_km
+
+    def describe(self, level='place'):
+        if self.place is not None:
+            return f"accidents per {level} within {self.radius_km} km of {self.place}"
+        return f"top {self.top_n} {level} hotspots by {self.by}"
+
+    def __repr__(self):
+        return f"GeoQuery({self.describe()!r})"
+
+
+class GroupByIndex:
+    """Counts and casualty sums pre-aggregated over ``INDEX_DIMENSIONS``, sorted by year."""
+
+    def __init__(self, df):
+        dims = [d for d in INDEX_DIMENSIONS if d in df.columns]
+        frame = df[dims + ['Deaths', 'Injuries']].copy()
+        for dim in dims:
+            if dim != 'Year':
+                frame[dim] = frame[dim].astype(object).fillna('Unknown').astype(str).str.strip()
+        grouped = frame.groupby(dims, observed=True, sort=True)
+        table = grouped[['Deaths', 'Injuries']].sum()
+        table.insert(0, 'accidents', grouped.size())
+        table = table.reset_index().sort_values('Year', kind='stable', ignore_index=True)
+        table['casualties'] = table['Deaths'] + table['Injuries']
+        table['Decade'] = (table['Year'] // 10 * 10).astype(str) + 's'
+        self.table = table
+        self.years = table['Year'].to_numpy()
+        self.values = {dim: sorted(table[dim].unique(), key=len, reverse=True) for dim in dims if dim != 'Year'}
+        self.names = _proper_names(df, self.values)
+
+    @property
+    def nbytes(self):
+        return int(self.table.memory_usage(deep=True).sum()) + sum(sys.getsizeof(name) for name in self.names)
+
+    def run(self, query):
+        """Aggregate ``query``; returns a Series (grouped) or a scalar."""
+        table = self.table
+        if query.year_range:
+            # Rows are sorted by year, so the range is a binary-searched slice
+            start, end = query.year_range
+            lo, hi = np.searchsorted(self.years, [start, end + 1])
+            table = table.iloc[lo:hi]
+        for column, value in query.filters.items():
+            table = table[table[column] == value]
+        if not query.group_by:
+            return table[query.metric].sum()
+        column = DIMENSIONS[query.group_by]
+        result = table.groupby(column, sort=True)[query.metric].sum()
+        if query.group_by not in ('year', 'decade'):
+            result = result.sort_values(ascending=False, kind='stable')
+        return result.head(query.top_n) if query.top_n else result
+
+
+def _proper_names(df, values):
+    """
+    Lower-cased place, train and accident names from ``NAME_COLUMNS`` that are
+    neither ordinary words nor part of a dimension value.
+    """
+    dimension_words = {word for column in values.values() for value in column for word in value.lower().split()}
+    names = set()
+    for column in NAME_COLUMNS:
+        if column in df.columns:
+            for text in df[column].dropna().astype(str).unique():
+                names.update(word.lower() for word in re.findall(r"\b[A-Z][A-Za-z]{3,}\b", text))
+    vocabulary = [pattern for _, pattern in METRIC_WORDS + GROUP_WORDS] + [COUNT_PATTERN, TOP_PATTERN]
+    return frozenset(name for name in names - GENERIC_NAME_WORDS - dimension_words
+                     if not any(pattern.fullmatch(name) for pattern in vocabulary))
+
+
+def _mentions(text, values):
+    """(value, span) of every known dimension value mentioned in ``text``."""
+    found = []
+    for value in values:
+        if len(value) > 3 and value.lower() != 'unknown':
+            found += [(value, m.span()) for m in re.finditer(rf"\b{re.escape(value.lower())}s?\b", text)]
+    return found
+
+
+def _match_entity(text, values):
+    """Longest known dimension value mentioned in ``text`` (values are pre-sorted longest first)."""
+    found = _mentions(text, values)
+    return found[0] if found else (None, None)
+
+
+def _unused_mention(text, index, query, spans):
+    """
+    True if ``text`` names a year, dimension value or proper name that ``query``
+    does not use; ``spans`` are the text spans of the values it filters on.
+    """
+    for m in YEAR_PATTERN.finditer(text):
+        year = int(m.group(1))
+        if not query.year_range or not query.year_range[0] <= year <= query.year_range[1]:
+            return True
+
+    def inside_used(span):
+        return any(start <= span[0] and span[1] <= end for start, end in spans)
+
+    for values in index.values.values():
+        if any(not inside_used(span) for _, span in _mentions(text, values)):
+            return True
+    for m in re.finditer(r"\b[a-z]{4,}\b", text):
+        if m.group() in index.names and not inside_used(m.span()):
+            return True
+    return False
+
+
+def parse_question(question, index):
+    """Parse a question into a StructuredQuery, or None if it is not an aggregate question."""
+    text = question.lower()
+    if NARRATIVE_PATTERN.search(text):
+        return None
+    metric = next((name for name, pattern in METRIC_WORDS if pattern.search(text)), None)
+    group_by = next((name for name, pattern in GROUP_WORDS if pattern.search(text)), None)
+    if metric is None and group_by is None:
+        return None
+    metric = metric or 'accidents'
+
+    year_range = None
+    if m := BETWEEN_PATTERN.search(text):
+        year_range = tuple(sorted((int(m.group(1)), int(m.group(2)))))
+    elif m := DECADE_PATTERN.search(text):
+        year_range = (int(m.group(1)), int(m.group(1)) + 9)
+    elif m := SINCE_PATTERN.search(text):
+        start = int(m.group(2)) + (1 if m.group(1) == 'after' else 0)
+        year_range = (start, int(index.years.max()) if len(index.years) else start)
+    elif m := BEFORE_PATTERN.search(text):
+        end = int(m.group(2)) - (1 if m.group(1) in ('before', 'prior to') else 0)
+        year_range = (int(index.years.min()) if len(index.years) else end, end)
+    elif m := YEAR_PATTERN.search(text):
+        year_range = (int(m.group(1)), int(m.group(1)))
+
+    filters = {}
+    spans = []
+    for name in ('state', 'cause', 'type', 'zone'):
+        column = DIMENSIONS[name]
+        if name != group_by and column in index.values:
+            value, span = _match_entity(text, index.values[column])
+            if value is None and name == 'type':
+                value = next((value for value, pattern in TYPE_SYNONYMS
+                              if value in index.values[column] and pattern.search(text)), None)
+            if value is not None:
+                filters[column] = value
+                if span:
+                    spans.append(span)
+
+    # A bare mention of accidents ("tell me about the Howrah accident") is narrative, not a count
+    if group_by is None and metric == 'accidents' and not COUNT_PATTERN.search(text):
+        return None
+    if group_by is None and not (filters or year_range or COUNT_PATTERN.search(text)):
+        return None
+
+    top_n = None
+    top = TOP_PATTERN.search(text)
+    if top and group_by:
+        top_n = int(top.group(1)) if top.group(1) else DEFAULT_TOP_N
+    query = StructuredQuery(metric, group_by, year_range, filters, top_n)
+    if _unused_mention(text, index, query, spans):
+        return None
+    return query
+
+
+def parse_geo_question(question):
+    """Parse a hotspot or proximity question into a GeoQuery, or None."""
+    text = question.lower()
+    # Place totals cover every year, type and cause, so questions restricting those are not place questions
+    restricted = [pattern for _, pattern in TYPE_SYNONYMS] + [dict(GROUP_WORDS)[name] for name in ('cause', 'type')]
+    if NARRATIVE_PATTERN.search(text) or any(pattern.search(text) for pattern in TIME_PATTERNS + restricted):
+        return None
+    metric = next((name for name, pattern in METRIC_WORDS if pattern.search(text)), None)
+    by = GEO_MEASURES.get(metric, 'accidents')
+    if m := NEAR_PATTERN.search(text):
+        radius = int(m.group(1)) if m.group(1) else DEFAULT_NEAR_RADIUS_KM
+        return GeoQuery(by, place=m.group(2).strip(" ?.!"), radius_km=radius)
+    if HOTSPOT_PATTERN.search(text):
+        top = TOP_PATTERN.search(text)
+        return GeoQuery(by, top_n=int(top.group(1)) if top and top.group(1) else DEFAULT_HOTSPOTS)
+    return None
+
+
+def format_geo_answer(query, result, level):
+    """Markdown answer for a GeoQuery result (a frame of places)."""
+    label = query.describe(level)
+    if result.empty:
+        return f"No records match: {label}."
+    if query.place is not None:
+        return (f"**{label[0].upper() + label[1:]}:** {len(result)} {level}s with "
+                f"{result['accidents'].sum():,.0f} accidents")
+    top = result.iloc[0]
+    return f"**{label[0].upper() + label[1:]}** — highest: **{top['name']}** ({top[query.by]:,.0f})"
+
+
+def format_answer(query, result):
+    """Markdown answer for a query result."""
+    label = query.describe()
+    if not isinstance(result, pd.Series):
+        return f"**{label[0].upper() + label[1:]}:** {result:,.0f}"
+    if result.empty:
+        return f"No records match: {label}."
+    return f"**{label[0].upper() + label[1:]}** — highest: **{result.idxmax()}** ({result.max():,.0f})"
+
+
+def cached_group_index(dataset_key, df):
+    """Build (once per dataset) the group-by index, shared across sessions."""
+    return frame_cache.get_or_load((dataset_key, 'group_by_index'), lambda: GroupByIndex(df))
+
+
+def answer(question, index):
+    """(query, result, markdown) for an aggregate question, or None to defer to the LLM."""
+    query = parse_question(question, index)
+    if query is None:
+        return None
+    result = index.run(query)
+    return query, result, format_answer(query, result)
+
+
+def answer_geo(question, geo_index):
+    """(query, places, markdown) for a hotspot or proximity question, or None to defer."""
+    query = parse_geo_question(question)
+    if query is None:
+        return None
+    if query.place is not None:
+        located = geo_index.centroids.locate(query.place)
+        if located is None:
+            return None  # Not a state or zone the index can locate, e.g. a station
+        query.place = located[2]
+        result = geo_index.near(located[3], located[4], query.radius_km).round({'distance_km': 1})
+    else:
+        result = geo_index.hotspots(query.top_n, query.by)
+    result = result.drop(columns=['lat', 'lon']).set_index('name')
+    return query, result, format_geo_answer(query, result.reset_index(), geo_index.level)
@@ -0,0 +1,190 @@
+"""Versioned, data-driven ambulance and structural damage cost estimates.
+
+The weights, base costs and severity multipliers live in ``Assests/resource_tables.json``
+(override the path with ``RAILWAY_RESOURCE_TABLES``). Loading them precomputes:
+
+* ambulance weights as integers (tenths), so the weighted sum of whole casualty and
+  rescue-hour counts is exact; ``ceil(0.3*1 + 0.5*1 + 0.8*14)`` is 13 in floating
+  point but 12 here;
+* a dense damage cost table indexed by accident type code and severity score
+  (deaths + injuries), clamped at the highest threshold since every score above it
+  has the same multiplier. Costs are integer rupees.
+
+Single and bulk estimates are then table lookups and integer arithmetic. The
+enhanced dataset is derived from the same tables; regenerate it after changing them::
+
+    python -m core.resource_tables            # rewrite Assests/enhanced_accident_data.csv
+    python -m core.resource_tables --check    # exit 1 if the file is out of date
+"""
+import argparse
+import json
+import math
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+from core.columnar_store import source_path
+
+CONFIG_PATH = os.environ.get(
+    "RAILWAY_RESOURCE_TABLES",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "Assests", "resource_tables.json"))
+UNIT_DECIMALS = 9  # Fractional inputs are rounded to this many places before the ceiling
+
+TYPE_COLUMN = 'Standard Accident Type'
+INPUT_COLUMNS = ['Deaths', 'Injuries', 'Rescue Time (hrs)']
+SEVERITY_COLUMN = 'Severity'
+AMBULANCE_COLUMN = 'Estimated Ambulances Required'
+COST_COLUMN = 'Estimated Structural Damage Cost (INR)'
+
+
+def _scaled_integers(values, scale, name):
+    """``values`` times ``scale`` as exact integers; raise ValueError if any is not whole."""
+    scaled = np.rint(np.asarray(values, dtype=float) * scale).astype(np.int64)
+    if not np.allclose(scaled, np.asarray(values, dtype=float) * scale, rtol=0, atol=1e-9):
+        raise ValueError(f"{name} must be whole multiples of 1/{scale}: {values}")
+    return scaled
+
+
+class ResourceTables:
+    """Precomputed estimate tables for one version of the resource configuration."""
+
+    def __init__(self, config):
+        self.config = config
+        self.version = config['version']
+
+        ambulances = config['ambulances']
+        self.ambulance_weights = dict(ambulances['weights'])
+        self.weight_scale = int(ambulances['weight_scale'])
+        self.weight_units = _scaled_integers([self.ambulance_weights[k] for k in ('deaths', 'injuries', 'rescue_time')],
+                                             self.weight_scale, "Ambulance weights")
+        self.minimum_ambulances = int(ambulances['minimum_with_casualties'])
+
+        costs = config['damage_costs']
+        self.base_costs = {t: int(cost) for t, cost in costs['base_costs'].items()}
+        self.accident_types = list(self.base_costs)
+        self.default_type = costs['default_type']
+        self.default_code = self.accident_types.index(self.default_type)
+        self.type_index = {t: code for code, t in enumerate(self.accident_types)}
+        self.type_lookup = pd.Index(self.accident_types, dtype=object)
+        self.severity_thresholds = np.asarray(costs['severity_thresholds'], dtype=np.int64)
+        self.multipliers = np.asarray(costs['multipliers'], dtype=float)
+        if len(self.multipliers) != len(self.severity_thresholds) + 1:
+            raise ValueError("Damage costs need one more multiplier than severity thresholds.")
+        self.multiplier_scale = int(costs['multiplier_scale'])
+        multiplier_units = _scaled_integers(self.multipliers, self.multiplier_scale, "Cost multipliers")
+
+        # cost_table[type code, min(severity, cap)]; scores at or above the cap share its multiplier
+        self.severity_cap = int(self.severity_thresholds[-1])
+        bands = np.searchsorted(self.severity_thresholds, np.arange(self.severity_cap + 1), side='right')
+        base = np.array([self.base_costs[t] for t in self.accident_types], dtype=np.int64)
+        self.cost_table = base[:, None] * multiplier_units[bands][None, :] // self.multiplier_scale
+
+    @classmethod
+    def load(cls, path=CONFIG_PATH):
+        with open(path, encoding="utf-8") as f:
+            return cls(json.load(f))
+
+    @property
+    def nbytes(self):
+        return self.cost_table.nbytes
+
+    def _ceil_units(self, units):
+        """Ambulances for weighted units: ceiling of units / scale, at least the minimum when any are present."""
+        ambulances = -(-units // self.weight_scale)
+        return np.where((ambulances == 0) & (units > 0), self.minimum_ambulances, ambulances)
+
+    def ambulances(self, deaths, injuries, rescue_time):
+        """Estimated ambulances for one incident (an int)."""
+        units = sum(int(w) * v for w, v in zip(self.weight_units, (deaths, injuries, rescue_time)))
+        if not float(units).is_integer():
+            units = round(units, UNIT_DECIMALS)
+        return int(self._ceil_units(units))
+
+    def ambulances_batch(self, deaths, injuries, rescue_time):
+        """Vectorized ``ambulances``; returns an int64 array."""
+        values = np.stack([np.asarray(deaths, dtype=float), np.asarray(injuries, dtype=float),
+                           np.asarray(rescue_time, dtype=float)], axis=-1)
+        units = np.round(values @ self.weight_units.astype(float), UNIT_DECIMALS)
+        return self._ceil_units(units).astype(np.int64)
+
+    def type_codes(self, accident_types):
+        """Rows of ``cost_table`` for accident type labels (the default type when unknown)."""
+        # Look up each distinct label once
+        labels, uniques = pd.factorize(pd.Series(accident_types), use_na_sentinel=False)
+        codes = self.type_lookup.get_indexer(uniques.astype(object))
+        return np.where(codes < 0, self.default_code, codes)[labels]
+
+    def _severity_columns(self, severity):
+        return np.clip(np.floor(np.nan_to_num(severity, nan=0.0)), 0, self.severity_cap).astype(np.int64)
+
+    def damage_cost(self, accident_type, deaths, injuries):
+        """Estimated structural damage cost in rupees for one incident (an int)."""
+        code = self.type_index.get(accident_type, self.default_code)
+        severity = deaths + injuries
+        column = min(max(math.floor(severity), 0), self.severity_cap) if severity == severity else 0
+        return int(self.cost_table[code, column])
+
+    def damage_cost_batch(self, accident_types, deaths, injuries):
+        """Vectorized ``damage_cost``; returns an int64 array."""
+        severity = np.asarray(deaths, dtype=float) + np.asarray(injuries, dtype=float)
+        return self.cost_table[self.type_codes(accident_types), self._severity_columns(severity)]
+
+    def ambulance_formula_latex(self):
+        """LaTeX of the ambulance estimate as ``ambulances`` computes it: integer weights over their scale."""
+        terms = [rf"{units}\,\text{{{label}}}" for units, label in
+                 zip(self.weight_units.tolist(), ('Deaths', 'Injuries', 'Rescue Time (hrs)'))]
+        return (rf"\text{{Estimated Ambulances}} = \left\lceil \frac{{{' + '.join(terms)}}}{{{self.weight_scale}}} "
+                rf"\right\rceil \quad (\text{{at least {self.minimum_ambulances} when the numerator is positive}})")
+
+    def base_cost_lines(self):
+        """Markdown bullet lines of base costs, in Indian digit grouping as shown on the pages."""
+        return [f"- {t}: ₹{indian_grouping(cost)}" for t, cost in
+                sorted(self.base_costs.items(), key=lambda item: -item[1])]
+
+    def multiplier_lines(self):
+        """Markdown bullet lines of severity bands and their multipliers, highest band first."""
+        bounds = self.severity_thresholds.tolist()
+        bands = [f"≥ {bounds[-1]}"] + [f"{low}–{high - 1}" for low, high in zip(bounds[-2::-1], bounds[:0:-1])]
+        bands.append(f"< {bounds[0]}")
+        return [f"- {band}: ×{multiplier}" for band, multiplier in zip(bands, self.multipliers[::-1])]
+
+
+def indian_grouping(amount):
+    """``10000000`` -> ``'1,00,00,000'``."""
+    digits = str(int(amount))
+    head, tail = digits[:-3], digits[-3:]
+    groups = []
+    while len(head) > 2:
+        head, groups = head[:-2], [head[-2:]] + groups
+    return ",".join(([head] if head else []) + groups + [tail])
+
+
+def regenerate_enhanced(df, tables):
+    """Recompute the derived columns of the enhanced dataset from ``tables`` in one vectorized pass."""
+    df = df.copy()
+    deaths, injuries, rescue_time = (df[c].fillna(0).to_numpy() for c in INPUT_COLUMNS)
+    df[SEVERITY_COLUMN] = df['Deaths'] + df['Injuries']
+    df[AMBULANCE_COLUMN] = tables.ambulances_batch(deaths, injuries, rescue_time)
+    df[COST_COLUMN] = tables.damage_cost_batch(df[TYPE_COLUMN], deaths, injuries)
+    return df
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Regenerate the enhanced dataset's resource estimates.")
+    parser.add_argument("--config", default=CONFIG_PATH)
+    parser.add_argument("--check", action="store_true", help="only report whether the file is up to date")
+    args = parser.parse_args()
+
+    resource_tables = ResourceTables.load(args.config)
+    path = source_path('enhanced')
+    current = pd.read_csv(path)
+    regenerated = regenerate_enhanced(current, resource_tables)
+    changed = int((regenerated != current).any(axis=1).sum())
+    if args.check:
+        print(f"{path}: {changed:,} of {len(current):,} rows differ from resource tables v{resource_tables.version}")
+        sys.exit(1 if changed else 0)
+    regenerated.to_csv(path, index=False)
+    print(f"{path}: {len(regenerated):,} rows regenerated with resource tables v{resource_tables.version} "
+          f"({changed:,} changed)")
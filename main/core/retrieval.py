@@ -0,0 +1,170 @@
+"""Local BM25 retrieval index over the accident records for grounding the AI Assistant.
+
+The index is built once per dataset: an inverted index with precomputed BM25 term
+weights, plus secondary indexes from year, state and cause to row positions. Queries
+return the top-k relevant rows, rendered compactly and trimmed to a token budget, so
+the assistant sends only the records that matter instead of none (or all) of them.
+"""
+import re
+from collections import defaultdict
+
+import numpy as np
+
+from core.data_cache import frame_cache
+from core.geo_index import bundled_centroids
+
+TEXT_COLUMNS = ['Accident Name', 'Train Name', 'Location', 'State', 'Accident Rail Zone', 'Accident Type',
+                'Standard Accident Type', 'Cause', 'Standard Cause Type', 'Reforms/Changes', 'Month', 'Year']
+# Columns rendered into the prompt for each retrieved record
+CONTEXT_COLUMNS = ['Year', 'Month', 'Day', 'Accident Name', 'Location', 'State', 'Standard Accident Type',
+                   'Cause', 'Deaths', 'Injuries']
+CHARS_PER_TOKEN = 4
+DEFAULT_TOP_K = 8
+DEFAULT_TOKEN_BUDGET = 600
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+YEAR_PATTERN = re.compile(r"\b(1[89]\d\d|20\d\d)\b")
+STOPWORDS = frozenset("a an and are as at be by for from how in is it many of on or the to was were what when "
+                      "where which who why with".split())
+
+
+def tokenize(text):
+    return [t for t in TOKEN_PATTERN.findall(str(text).lower()) if t not in STOPWORDS]
+
+
+def _postings_to_arrays(postings):
+    return {term: np.asarray(rows, dtype=np.int32) for term, rows in postings.items()}
+
+
+class AccidentIndex:
+    """BM25 inverted index with year/state/cause secondary indexes over an accident dataframe."""
+
+    def __init__(self, df, k1=1.5, b=0.75):
+        self.df = df.reset_index(drop=True)
+        self.text_columns = [c for c in TEXT_COLUMNS if c in self.df.columns]
+        self.context_columns = [c for c in CONTEXT_COLUMNS if c in self.df.columns]
+        self._build_bm25(k1, b)
+        self._build_secondary_indexes()
+
+    def _build_bm25(self, k1, b):
+        columns = [self.df[c].astype(object).fillna("").astype(str) for c in self.text_columns]
+        text = columns[0].str.cat(columns[1:], sep=" ") if columns else []
+        term_counts = defaultdict(lambda: defaultdict(int))
+        doc_lengths = np.zeros(len(text), dtype=np.float64)
+        for row, document in enumerate(text):
+            tokens = tokenize(document)
+            doc_lengths[row] = len(tokens)
+            for token in tokens:
+                term_counts[token][row] += 1
+
+        n_docs = max(len(text), 1)
+        avg_length = doc_lengths.mean() if len(text) else 1.0
+        length_norm = k1 * (1 - b + b * doc_lengths / (avg_length or 1.0))
+        # Precompute each posting's BM25 contribution so a query is a sum of array slices
+        self.postings = {}
+        for term, counts in term_counts.items():
+            rows = np.fromiter(counts.keys(), dtype=np.int32, count=len(counts))
+            tf = np.fromiter(counts.values(), dtype=np.float64, count=len(counts))
+            idf = np.log(1 + (n_docs - len(rows) + 0.5) / (len(rows) + 0.5))
+            self.postings[term] = (rows, idf * tf * (k1 + 1) / (tf + length_norm[rows]))
+
+    def _build_secondary_indexes(self):
+        self.by_year_index, self.by_state_index, self.by_cause_index = {}, {}, {}
+        for column, index, key in (('Year', self.by_year_index, int),
+                                   ('State', self.by_state_index, lambda v: str(v).lower()),
+                                   ('Cause', self.by_cause_index, lambda v: str(v).lower())):
+            if column not in self.df.columns:
+                continue
+            postings = defaultdict(list)
+            for row, value in enumerate(self.df[column]):
+                if value == value:  # skip NaN
+                    postings[key(value)].append(row)
+            index.update(_postings_to_arrays(postings))
+
+    @property
+    def nbytes(self):
+        postings = sum(rows.nbytes + weights.nbytes for rows, weights in self.postings.values())
+        return int(postings + self.df.memory_usage(deep=True).sum())
+
+    def _match_rows(self, index, needle):
+        """Rows whose indexed value equals ``needle`` or, failing that, contains it."""
+        needle = str(needle).lower()
+        if needle in index:
+            return index[needle]
+        matches = [rows for value, rows in index.items() if needle in value]
+        return np.unique(np.concatenate(matches)) if matches else np.empty(0, dtype=np.int32)
+
+    def rows_for_year(self, year):
+        return self.by_year_index.get(int(year), np.empty(0, dtype=np.int32))
+
+    def rows_for_state(self, state):
+        # Names, abbreviations and old names ("UP", "Orissa") resolve to the indexed state directly
+        key = bundled_centroids().resolve('state', state)
+        if key is not None and key.lower() in self.by_state_index:
+            return self.by_state_index[key.lower()]
+        return self._match_rows(self.by_state_index, state)
+
+    def rows_for_cause(self, cause):
+        return self._match_rows(self.by_cause_index, cause)
+
+    def _query_filters(self, query):
+        """Row restrictions implied by years and state names mentioned in the query."""
+        lowered = query.lower()
+        restrictions = []
+        years = [self.rows_for_year(y) for y in YEAR_PATTERN.findall(query)]
+        if any(len(rows) for rows in years):
+            restrictions.append(np.concatenate(years))
+        states = [rows for state, rows in self.by_state_index.items() if state in lowered]
+        if states:
+            restrictions.append(np.concatenate(states))
+        return restrictions
+
+    def search(self, query, k=DEFAULT_TOP_K):
+        """Top-k (row position, score) pairs for ``query`` by BM25, honouring year/state mentions."""
+        scores = np.zeros(len(self.df), dtype=np.float64)
+        for token in set(tokenize(query)):
+            if token in self.postings:
+                rows, weights = self.postings[token]
+                scores[rows] += weights
+
+        allowed = np.ones(len(self.df), dtype=bool)
+        for rows in self._query_filters(query):
+            restricted = np.zeros(len(self.df), dtype=bool)
+            restricted[rows] = True
+            allowed &= restricted
+        if allowed.any():
+            scores[~allowed] = -np.inf
+
+        candidates = np.flatnonzero(scores > 0) if np.isfinite(scores).any() else np.empty(0, dtype=np.int64)
+        if not len(candidates) and allowed.any() and not allowed.all():
+            # Year/state filters matched but no terms did: return those rows in order
+            candidates = np.flatnonzero(allowed)
+            scores = np.where(allowed, 0.0, -np.inf)
+        top = candidates[np.argsort(-scores[candidates], kind='stable')[:k]]
+        return [(int(row), float(scores[row])) for row in top]
+
+    def format_rows(self, rows):
+        """Render rows as compact ``column: value`` lines for a prompt."""
+        return self.format_records(self.df.iloc[list(rows)])
+
+    def format_records(self, records):
+        """Render records (a frame with this index's columns) like ``format_rows``."""
+        records = records[self.context_columns]
+        return ["; ".join(f"{c}: {v}" for c, v in zip(self.context_columns, values) if v == v)
+                for values in records.itertuples(index=False)]
+
+    def context(self, query, k=DEFAULT_TOP_K, token_budget=DEFAULT_TOKEN_BUDGET):
+        """Top-k relevant records as prompt text, stopping before ``token_budget`` is exceeded."""
+        lines, used = [], 0
+        for line in self.format_rows(row for row, _ in self.search(query, k)):
+            cost = len(line) // CHARS_PER_TOKEN + 1
+            if used + cost > token_budget:
+                break
+            lines.append(line)
+            used += cost
+        return "\n".join(lines)
+
+
+def cached_index(dataset_key, df):
+    """Build (once per dataset) the retrieval index, shared across sessions."""
+    return frame_cache.get_or_load((dataset_key, 'retrieval_index'), lambda: AccidentIndex(df))
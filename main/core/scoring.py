@@ -0,0 +1,58 @@
+"""Batch scoring of incident tables with a fitted preprocessor and severity forest."""
+import io
+
+import pandas as pd
+
+from core.estimates import (
+    classify_severity_batch,
+    estimate_ambulances_batch,
+    estimate_structural_damage_cost_batch,
+)
+
+TYPE_COLUMN = 'Standard Accident Type'
+OUTPUT_COLUMNS = ['Predicted Severity', 'Severity Level', 'Estimated Ambulances Required',
+                  'Estimated Structural Damage Cost (INR)']
+
+
+def missing_columns(df, preprocessor):
+    """Input columns the preprocessor needs that ``df`` lacks."""
+    return [c for c in preprocessor.feature_names_in_ if c not in df.columns]
+
+
+def predict_severity(df, preprocessor, feature_names, model):
+    """Predict severity for every row in one ``transform`` + ``predict`` pass."""
+    X = preprocessor.transform(df[list(preprocessor.feature_names_in_)])
+    return model.predict(pd.DataFrame(X, columns=feature_names))
+
+
+def score_frame(df, preprocessor, feature_names, model):
+    """Return ``df`` with predicted severity, level, ambulances and damage cost columns."""
+    severity = predict_severity(df, preprocessor, feature_names, model)
+    deaths = df['Deaths'].fillna(0).to_numpy()
+    injuries = df['Injuries'].fillna(0).to_numpy()
+    rescue_time = df['Rescue Time (hrs)'].fillna(0).to_numpy()
+
+    result = df.copy()
+    result[OUTPUT_COLUMNS[0]] = severity
+    result[OUTPUT_COLUMNS[1]] = classify_severity_batch(severity)
+    result[OUTPUT_COLUMNS[2]] = estimate_ambulances_batch(deaths, injuries, rescue_time)
+    result[OUTPUT_COLUMNS[3]] = estimate_structural_damage_cost_batch(df[TYPE_COLUMN], deaths, injuries)
+    return result
+
+
+def read_incident_file(uploaded_file):
+    """Read an uploaded CSV or Parquet incident file (Parquet needs pyarrow)."""
+    if uploaded_file.name.lower().endswith('.parquet'):
+        return pd.read_parquet(uploaded_file)
+    return pd.read_csv(uploaded_file)
+
+
+def iter_csv_chunks(df, chunk_rows=50_000):
+    """Yield ``df`` as UTF-8 CSV bytes, ``chunk_rows`` rows at a time."""
+    if df.empty:
+        yield df.to_csv(index=False).encode('utf-8')
+        return
+    for start in range(0, len(df), chunk_rows):
+        buffer = io.StringIO()
+        df.iloc[start:start + chunk_rows].to_csv(buffer, index=False, header=start == 0)
+        yield buffer.getvalue().encode('utf-8')
@@ -0,0 +1,187 @@
+"""Read-only snapshot of the bundled datasets and the severity model, shared by worker processes.
+
+A supervisor (``tools/serve_workers.py``) publishes the snapshot once: every column
+of each dataset goes to its own uncompressed ``.npy`` file (categorical columns as
+their integer codes, text columns as Arrow offset and UTF-8 data buffers), and the
+model artifact goes to a joblib file with the forest replaced by its compiled
+``CompiledSeverityModel`` node arrays. Workers started with ``RAILWAY_SHARED_SNAPSHOT``
+pointing at the snapshot memory-map those files read-only and build frames and the
+model directly on top of the mappings, so the operating system keeps one copy of
+each page in its page cache for every worker instead of one copy per process.
+Writes cannot reach the shared pages: the mappings are read-only, and writing to
+an array over them raises "assignment destination is read-only". Frames are
+therefore handed out as column selections of one frame per dataset that the
+snapshot keeps for the life of the process; since that frame still references
+every column, pandas copy-on-write copies a column into private memory before an
+in-place write (``.loc`` assignment, ``fillna(inplace=True)``) instead of
+attempting it on the mapping.
+
+Text columns need pyarrow, as they are rebuilt as Arrow-backed strings.
+"""
+import json
+import os
+import shutil
+import time
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from core.fast_path import CompiledSeverityModel
+
+try:
+    import pyarrow as pa
+except ImportError:  # pragma: no cover - optional dependency
+    pa = None
+
+SNAPSHOT_ENV = "RAILWAY_SHARED_SNAPSHOT"
+MANIFEST = "manifest.json"
+MODEL_FILE = "model.joblib"
+TEXT_BUFFERS = ('validity', 'offsets', 'data')  # Buffers of an Arrow large_string array
+
+
+def _is_text(dtype):
+    return isinstance(dtype, pd.StringDtype) or dtype == object
+
+
+def _write_column(series, path):
+    """Save one column under ``path`` (a file prefix); returns its manifest entry."""
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        np.save(path + ".npy", series.cat.codes.to_numpy())
+        return {'kind': 'category', 'categories': series.cat.categories.tolist(),
+                'ordered': bool(series.cat.ordered)}
+    if _is_text(series.dtype):
+        array = pa.array(series.astype(object), type=pa.large_string(), from_pandas=True)
+        buffers = {}
+        for name, buffer in zip(TEXT_BUFFERS, array.buffers()):
+            if buffer is not None:
+                np.save(f"{path}.{name}.npy", np.frombuffer(buffer, dtype=np.uint8))
+                buffers[name] = True
+        return {'kind': 'text', 'nulls': array.null_count, 'validity': 'validity' in buffers}
+    values = series.to_numpy()
+    if values.dtype == object:
+        raise TypeError(f"Column {series.name!r} of dtype {series.dtype} cannot be shared")
+    np.save(path + ".npy", values)
+    return {'kind': 'array'}
+
+
+def _read_column(entry, path, rows):
+    """A column backed by read-only memory maps of the files written by ``_write_column``."""
+    if entry['kind'] == 'category':
+        dtype = pd.CategoricalDtype(pd.Index(entry['categories']), ordered=entry['ordered'])
+        return pd.Categorical.from_codes(np.load(path + ".npy", mmap_mode='r'), dtype=dtype, validate=False)
+    if entry['kind'] == 'text':
+        buffers = [pa.py_buffer(np.load(f"{path}.{name}.npy", mmap_mode='r'))
+                   if name != 'validity' or entry['validity'] else None for name in TEXT_BUFFERS]
+        array = pa.Array.from_buffers(pa.large_string(), rows, buffers, entry['nulls'])
+        return pd.arrays.ArrowStringArray(array, dtype=pd.StringDtype('pyarrow', na_value=np.nan))
+    return np.load(path + ".npy", mmap_mode='r')
+
+
+def shareable_artifact(artifact):
+    """``artifact`` with its forest compiled to plain node arrays, which joblib can memory-map."""
+    model = artifact['severity_model']
+    if not hasattr(model, 'estimators_'):
+        raise TypeError(f"Only forest models can be shared; got {type(model).__name__}")
+    return dict(artifact, severity_model=CompiledSeverityModel(artifact['preprocessor'], model))
+
+
+def publish(directory, frames, model_key=None, artifact=None):
+    """
+    Write ``frames`` (name -> DataFrame) and optionally a model artifact to a new
+    snapshot under ``directory``; returns the snapshot's path for ``SNAPSHOT_ENV``.
+    """
+    if pa is None:
+        raise ImportError("pyarrow is required to share datasets between processes (pip install pyarrow).")
+    path = os.path.join(directory, f"{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}")
+    tmp_path = path + ".tmp"
+    os.makedirs(tmp_path)
+    try:
+        manifest = {'datasets': {}, 'model_key': None}
+        for name, frame in frames.items():
+            os.makedirs(os.path.join(tmp_path, name))
+            columns = [dict(_write_column(frame[col], os.path.join(tmp_path, name, str(i))), name=col)
+                       for i, col in enumerate(frame.columns)]
+            manifest['datasets'][name] = {'rows': len(frame), 'columns': columns}
+        if artifact is not None:
+            # Uncompressed dumps are required for memory-mapped loading
+            joblib.dump(shareable_artifact(artifact), os.path.join(tmp_path, MODEL_FILE))
+            manifest['model_key'] = model_key
+        with open(os.path.join(tmp_path, MANIFEST), "w", encoding="utf-8") as f:
+            json.dump(manifest, f)
+        # Workers only ever see a complete snapshot
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            shutil.rmtree(tmp_path)
+    return path
+
+
+class Snapshot:
+    """A published snapshot, attached read-only."""
+
+    def __init__(self, path):
+        self.path = path
+        with open(os.path.join(path, MANIFEST), encoding="utf-8") as f:
+            manifest = json.load(f)
+        self.datasets = manifest['datasets']
+        self.model_key = manifest['model_key']
+        self._artifact = None
+        self._frames = {}
+
+    def _mapped_frame(self, name):
+        """Every column of dataset ``name`` over the shared memory maps, built once and kept."""
+        if name not in self._frames:
+            dataset = self.datasets[name]
+            data = {entry['name']: _read_column(entry, os.path.join(self.path, name, str(i)), dataset['rows'])
+                    for i, entry in enumerate(dataset['columns'])}
+            # copy=False keeps every column a view of its mapping; setdefault keeps one frame under concurrent loads
+            self._frames.setdefault(name, pd.DataFrame(data, copy=False))
+        return self._frames[name]
+
+    def frame(self, name, columns=None):
+        """
+        ``columns`` (default: all) of dataset ``name``, sharing the memory maps until
+        written to; in-place writes copy the written columns first.
+        """
+        mapped = self._mapped_frame(name)
+        wanted = list(columns) if columns is not None else list(mapped.columns)
+        missing = [c for c in wanted if c not in mapped.columns]
+        if missing:
+            raise KeyError(f"Columns not in the shared {name} dataset: {', '.join(missing)}")
+        # A selection references the kept frame's columns, which is what makes copy-on-write copy them
+        return mapped[wanted]
+
+    def artifact(self, key):
+        """The shared model artifact if it is the one stored under ``key``, else None."""
+        if key is None or key != self.model_key:
+            return None
+        if self._artifact is None:
+            self._artifact = joblib.load(os.path.join(self.path, MODEL_FILE), mmap_mode="r")
+        return self._artifact
+
+    @property
+    def nbytes(self):
+        """Size of the snapshot's files, i.e. the memory shared by the workers mapping it."""
+        return sum(os.path.getsize(os.path.join(root, name))
+                   for root, _, names in os.walk(self.path) for name in names)
+
+
+_attached = None
+
+
+def attached_snapshot():
+    """The snapshot named by ``RAILWAY_SHARED_SNAPSHOT``, opened once per process; None when unset."""
+    global _attached
+    path = os.environ.get(SNAPSHOT_ENV)
+    if not path:
+        return None
+    if _attached is None or _attached.path != path:
+        _attached = Snapshot(path)
+    return _attached
+
+
+def shared_artifact(key):
+    """The attached snapshot's model artifact for ``key``, or None."""
+    snapshot = attached_snapshot()
+    return snapshot.artifact(key) if snapshot is not None else None
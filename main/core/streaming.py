@@ -0,0 +1,253 @@
+"""Chunked ingestion of large CSV uploads with running statistics.
+
+Uploads are parsed ``chunk_rows`` at a time. Each chunk is validated against the
+expected schema and folded into running aggregates: Welford/Chan means and
+variances with min/max and missing counts for numeric columns, value counts for
+categorical columns, and a uniform reservoir sample for previews. Memory stays
+bounded by the chunk and sample sizes however large the file is, and the
+statistics are exactly those of the full data, so preprocessors fitted from them
+match fitting on everything at once.
+"""
+import copy
+import os
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_CHUNK_ROWS = 100_000
+DEFAULT_SAMPLE_ROWS = 10_000
+# Uploads above this size are streamed by default
+STREAMING_THRESHOLD_BYTES = float(os.environ.get("RAILWAY_STREAMING_THRESHOLD_MB", "100")) * 1024 * 1024
+
+
+class SchemaError(ValueError):
+    """An upload is missing required columns."""
+
+
+class RunningStats:
+    """Count, mean, variance, min, max and missing/invalid counts per numeric column."""
+
+    def __init__(self, columns):
+        self.columns = list(columns)
+        k = len(self.columns)
+        self.count = np.zeros(k, dtype=np.int64)
+        self.mean = np.zeros(k)
+        self.m2 = np.zeros(k)
+        self.minimum = np.full(k, np.inf)
+        self.maximum = np.full(k, -np.inf)
+        self.missing = np.zeros(k, dtype=np.int64)
+        self.invalid = np.zeros(k, dtype=np.int64)
+
+    def update(self, frame):
+        """Fold in a chunk whose numeric columns are already coerced to floats."""
+        values = frame[self.columns].to_numpy(dtype=np.float64)
+        present = ~np.isnan(values)
+        n = present.sum(axis=0)
+        self.missing += len(values) - n
+        seen = n > 0
+        if not seen.any():
+            return
+        chunk_mean = np.divide(np.nansum(values, axis=0), n, out=np.zeros_like(self.mean), where=seen)
+        chunk_m2 = np.nansum((values - chunk_mean) ** 2, axis=0)
+        # Chan et al. pairwise combination of (count, mean, M2)
+        total = self.count + n
+        delta = chunk_mean - self.mean
+        ratio = np.divide(n, total, out=np.zeros_like(self.mean), where=total > 0)
+        self.mean = self.mean + delta * ratio
+        self.m2 = self.m2 + chunk_m2 + delta ** 2 * self.count * ratio
+        self.count = total
+        with np.errstate(invalid='ignore'):
+            self.minimum = np.fmin(self.minimum, np.nanmin(np.where(present, values, np.inf), axis=0))
+            self.maximum = np.fmax(self.maximum, np.nanmax(np.where(present, values, -np.inf), axis=0))
+
+    @property
+    def variance(self):
+        """Population variance of the non-missing values."""
+        return np.divide(self.m2, self.count, out=np.zeros_like(self.m2), where=self.count > 0)
+
+    def summary(self):
+        """describe()-style table of the full data."""
+        return pd.DataFrame({
+            'count': self.count, 'missing': self.missing, 'invalid': self.invalid, 'mean': self.mean,
+            'std': np.sqrt(self.variance), 'min': self.minimum, 'max': self.maximum,
+        }, index=self.columns).T
+
+
+class CategoryCounts:
+    """Value counts per categorical column, accumulated across chunks."""
+
+    def __init__(self, columns):
+        self.counts = {col: pd.Series(dtype=np.int64) for col in columns}
+
+    def update(self, frame):
+        for col, counts in self.counts.items():
+            chunk_counts = frame[col].value_counts(dropna=True)
+            chunk_counts = chunk_counts[chunk_counts > 0]  # Unobserved categorical levels
+            chunk_counts.index = chunk_counts.index.astype(object)
+            self.counts[col] = counts.add(chunk_counts, fill_value=0).astype(np.int64)
+
+    def categories(self, col):
+        """Sorted distinct values, as ``OneHotEncoder`` orders categories."""
+        return sorted(self.counts[col].index)
+
+    def most_frequent(self, col):
+        """Most frequent value; ties go to the smallest, as in ``SimpleImputer``."""
+        counts = self.counts[col]
+        return min(counts.index[counts == counts.max()]) if len(counts) else None
+
+
+class ReservoirSample:
+    """Uniform random sample of at most ``size`` rows from a stream of chunks (Algorithm R)."""
+
+    def __init__(self, size=DEFAULT_SAMPLE_ROWS, seed=0):
+        self.size = size
+        self.seen = 0
+        self.frame = None
+        self._rng = np.random.default_rng(seed)
+
+    def update(self, chunk):
+        chunk = chunk.reset_index(drop=True)
+        if self.frame is None:
+            self.frame = chunk.iloc[:0]
+        room = max(self.size - len(self.frame), 0)
+        if room:
+            self.frame = pd.concat([self.frame, chunk.iloc[:room]], ignore_index=True)
+        rest = chunk.iloc[room:]
+        if len(rest):
+            # Row t (1-based over the whole stream) replaces a random slot with probability size / t
+            t = self.seen + room + np.arange(1, len(rest) + 1)
+            slots = (self._rng.random(len(rest)) * t).astype(np.int64)
+            keep = slots < self.size
+            # Later rows overwrite earlier ones drawn for the same slot, as in the sequential algorithm
+            picks = pd.Series(np.flatnonzero(keep), index=slots[keep])
+            picks = picks[~picks.index.duplicated(keep='last')]
+            if len(picks):
+                order = np.arange(len(self.frame))
+                order[picks.index.to_numpy()] = len(self.frame) + np.arange(len(picks))
+                self.frame = pd.concat([self.frame, rest.iloc[picks.to_numpy()]], ignore_index=True).take(order)
+                self.frame = self.frame.reset_index(drop=True)
+        self.seen += len(chunk)
+
+
+class StreamedUpload:
+    """Everything kept from a streamed upload: row count, statistics and a preview sample."""
+
+    def __init__(self, numeric, categorical, sample_rows, seed):
+        self.rows = 0
+        self.chunks = 0
+        self.numeric = RunningStats(numeric)
+        self.categories = CategoryCounts(categorical)
+        self.reservoir = ReservoirSample(sample_rows, seed)
+        self.aggregates = {}  # Caller-built full-data results, e.g. from ``on_chunk``
+
+    def update(self, chunk, sample=None):
+        """Fold in a chunk (numeric columns coerced); ``sample`` limits which rows may enter the reservoir."""
+        self.numeric.update(chunk)
+        self.categories.update(chunk)
+        self.reservoir.update(chunk if sample is None else chunk[sample])
+        self.rows += len(chunk)
+        self.chunks += 1
+
+    def ingest(self, chunk):
+        """Coerce the numeric columns of a parsed chunk in place, then fold it in."""
+        self.numeric.invalid += coerce_numeric(chunk, self.numeric.columns)
+        self.update(chunk)
+
+    def extended(self, rows):
+        """A copy with ``rows`` folded in, e.g. new rows of a refresh; this upload is left as is."""
+        extended = copy.copy(self)
+        extended.numeric, extended.categories, extended.reservoir = (
+            copy.deepcopy(self.numeric), copy.deepcopy(self.categories), copy.deepcopy(self.reservoir))
+        extended.aggregates = dict(self.aggregates)
+        extended.ingest(rows.copy())
+        return extended
+
+    @property
+    def sample(self):
+        return self.reservoir.frame
+
+    @property
+    def nbytes(self):
+        sample = int(self.sample.memory_usage(deep=True).sum()) if self.sample is not None else 0
+        return sample + sum(int(getattr(value, 'nbytes', 0)) for value in self.aggregates.values())
+
+
+def validate_columns(columns, required):
+    """Raise SchemaError if any ``required`` column is absent."""
+    missing = [c for c in required if c not in columns]
+    if missing:
+        raise SchemaError(f"Missing required columns: {', '.join(missing)}")
+
+
+def coerce_numeric(chunk, columns):
+    """Convert ``columns`` of ``chunk`` to floats in place; return the count of unparseable values per column."""
+    invalid = np.zeros(len(columns), dtype=np.int64)
+    for i, col in enumerate(columns):
+        coerced = pd.to_numeric(chunk[col], errors='coerce')
+        invalid[i] = int((coerced.isna() & chunk[col].notna()).sum())
+        chunk[col] = coerced.astype(np.float64)
+    return invalid
+
+
+def stream_csv(source, numeric=(), categorical=(), required=None, usecols=None, dtype=None,
+               chunk_rows=DEFAULT_CHUNK_ROWS, sample_rows=DEFAULT_SAMPLE_ROWS, seed=0, on_chunk=None):
+    """
+    Parse ``source`` in chunks and return a StreamedUpload.
+
+    Numeric columns are coerced to floats (unparseable values count as invalid and
+    become missing). ``on_chunk(chunk)`` is called with each validated chunk so callers
+    can maintain their own aggregates without keeping the rows.
+    """
+    required = list(required if required is not None else [*numeric, *categorical])
+    result = StreamedUpload(numeric, categorical, sample_rows, seed)
+    reader = pd.read_csv(source, chunksize=chunk_rows, usecols=usecols, dtype=dtype)
+    for chunk in reader:
+        if result.chunks == 0:
+            validate_columns(chunk.columns, required)
+        result.ingest(chunk)
+        if on_chunk is not None:
+            on_chunk(chunk)
+    if result.chunks == 0:
+        raise SchemaError("The upload has no rows.")
+    return result
+
+
+def frame_statistics(frame, numeric=(), categorical=(), sample_rows=DEFAULT_SAMPLE_ROWS, seed=0):
+    """Statistics of an in-memory frame as one chunk, so they can be extended like a streamed upload."""
+    result = StreamedUpload(numeric, categorical, sample_rows, seed)
+    result.ingest(frame.copy())
+    return result
+
+
+def fit_from_statistics(preprocessor, streamed):
+    """
+    Fit a ``num``/``cat`` ColumnTransformer (mean imputer + scaler, mode imputer + one-hot)
+    to the full data described by ``streamed``.
+
+    The transformer is fitted on the sample for its structure, with the one-hot
+    categories fixed to the full category set; the imputer and scaler statistics are
+    then replaced by the full-data ones. Scaling follows mean imputation, so missing
+    values add to the row count but not to the sum of squares.
+    """
+    columns = {name: list(cols) for name, _, cols in preprocessor.transformers}
+    category_column = columns['cat'][0]
+    preprocessor.set_params(cat__onehot__categories=[streamed.categories.categories(category_column)])
+    # Fit on the transformer's input columns only, so the target is never a required input
+    inputs = {c for cols in columns.values() for c in cols}
+    preprocessor.fit(streamed.sample[[c for c in streamed.sample.columns if c in inputs]])
+
+    stats = streamed.numeric
+    positions = [stats.columns.index(c) for c in columns['num']]
+    means = stats.mean[positions]
+    variance = stats.m2[positions] / max(streamed.rows, 1)
+    numeric_steps = preprocessor.named_transformers_['num'].named_steps
+    numeric_steps['imputer'].statistics_ = means
+    scaler = numeric_steps['scaler']
+    scaler.mean_ = means
+    scaler.var_ = variance
+    scaler.scale_ = np.where(variance > 0, np.sqrt(variance), 1.0)
+    scaler.n_samples_seen_ = streamed.rows
+
+    mode = streamed.categories.most_frequent(category_column)
+    preprocessor.named_transformers_['cat'].named_steps['imputer'].statistics_ = np.array([mode], dtype=object)
+    return preprocessor
@@ -0,0 +1,228 @@
+"""Accident records sorted and indexed by timestamp, with precomputed rollups.
+
+``TimeSeriesStore`` keeps the rows in timestamp order alongside an int64 array of
+the timestamps and prefix sums of the accident count and the killed/injured
+measures. A date range is two binary searches: the rows come back as a slice and
+the totals as a difference of prefix sums, so neither rescans the data. Yearly,
+monthly and (year, season) rollups are built once; decade and all-years season
+views are folded from them. ``append`` adds new records in place: rows later than
+everything stored are concatenated and only their rollup cells are added, while
+out-of-order rows are merged by a stable sort; ``copy`` first when other readers
+must keep seeing the store as it was.
+"""
+import calendar
+import copy
+import threading
+
+import numpy as np
+import pandas as pd
+
+from core.data_cache import frame_cache
+from core.eda_features import MONTH_TO_SEASON, SEASONS, parse_day_first
+
+TIME_COLUMN = 'timestamp'
+MEASURES = ['killed', 'injured']
+GRANULARITIES = ('year', 'month', 'season', 'decade')
+MONTH_NUMBERS = {name.lower(): number for number, name in enumerate(calendar.month_name) if name}
+
+
+def timestamps_from_parts(years, months, days):
+    """Timestamps from year, month (number or English name) and day columns; invalid dates become NaT."""
+    months = pd.Series(months)
+    if not pd.api.types.is_numeric_dtype(months):
+        months = months.astype(str).str.strip().str.lower().map(MONTH_NUMBERS)
+    parts = pd.DataFrame({'year': pd.to_numeric(pd.Series(years), errors='coerce').to_numpy(),
+                          'month': pd.to_numeric(months, errors='coerce').to_numpy(),
+                          'day': pd.to_numeric(pd.Series(days), errors='coerce').to_numpy()})
+    return pd.to_datetime(parts, errors='coerce')
+
+
+def train_accident_rows(df):
+    """``df`` (EDA columns) with its ``time`` as the store's timestamp, for building or appending."""
+    frame = df.copy()
+    is_parsed = pd.api.types.is_datetime64_any_dtype(df['time'])
+    frame[TIME_COLUMN] = df['time'] if is_parsed else parse_day_first(df['time'])
+    return frame
+
+
+def _as_ns(value):
+    return pd.Timestamp(value).as_unit('ns').value
+
+
+def _year_bounds(start, end):
+    """Timestamps bounding whole years when given ints, e.g. (1990, 1999) -> [1990-01-01, 2000-01-01)."""
+    if isinstance(start, (int, np.integer)):
+        start = pd.Timestamp(year=int(start), month=1, day=1)
+    if isinstance(end, (int, np.integer)):
+        end = pd.Timestamp(year=int(end) + 1, month=1, day=1)
+        return start, end, False
+    return start, end, True
+
+
+class TimeSeriesStore:
+    """
+    Rows of ``frame`` sorted by ``timestamp`` with ``killed``/``injured`` measures.
+
+    Build with ``from_accidents_1902_2024``, ``from_train_accident_analysis`` or from any
+    frame that already has those columns. Rows without a valid timestamp are dropped
+    and counted in ``undated_rows``.
+    """
+
+    def __init__(self, frame):
+        frame = frame.copy()
+        frame[TIME_COLUMN] = pd.to_datetime(frame[TIME_COLUMN], errors='coerce').astype('datetime64[ns]')
+        dated = frame[TIME_COLUMN].notna().to_numpy()
+        self.undated_rows = int((~dated).sum())
+        frame = frame[dated].sort_values(TIME_COLUMN, kind='stable', ignore_index=True)
+        self._lock = threading.Lock()
+        self._set_rows(frame)
+        self.rollups = {name: self._rollup(frame, name) for name in ('year', 'month', 'season')}
+
+    @classmethod
+    def from_accidents_1902_2024(cls, df):
+        """Store over the historical dataset (Year/Month/Day, Deaths, Injuries)."""
+        frame = df.copy()
+        frame[TIME_COLUMN] = timestamps_from_parts(df['Year'], df['Month'], df['Day']).to_numpy()
+        frame['killed'], frame['injured'] = df['Deaths'], df['Injuries']
+        return cls(frame)
+
+    @classmethod
+    def from_train_accident_analysis(cls, df):
+        """Store over the EDA dataset (``time`` as day-first text or already parsed, killed, injured)."""
+        return cls(train_accident_rows(df))
+
+    def copy(self):
+        """A store with the same rows whose appends leave this one unchanged."""
+        store = copy.copy(self)
+        # Appends replace the row tuple and each rollup table rather than modifying them
+        store._lock = threading.Lock()
+        store.rollups = dict(self.rollups)
+        return store
+
+    # --- Row storage ---
+
+    @staticmethod
+    def _prefix_sums(frame, offset=None):
+        """Running accidents/killed/injured totals, with a leading zero row unless continuing from ``offset``."""
+        values = np.column_stack([np.ones(len(frame))] + [frame[m].fillna(0).to_numpy(dtype=np.float64)
+                                                          for m in MEASURES])
+        if offset is None:
+            return np.vstack([np.zeros((1, values.shape[1])), np.cumsum(values, axis=0)])
+        return offset + np.cumsum(values, axis=0)
+
+    def _set_rows(self, frame, cumulative=None):
+        """Publish rows, timestamps and prefix sums together so readers never see a mix."""
+        times = frame[TIME_COLUMN].to_numpy().view(np.int64)
+        self._data = (frame, times, self._prefix_sums(frame) if cumulative is None else cumulative)
+
+    @property
+    def frame(self):
+        return self._data[0]
+
+    def __len__(self):
+        return len(self._data[1])
+
+    @property
+    def nbytes(self):
+        frame, times, cumulative = self._data
+        rollups = sum(int(r.memory_usage(deep=True).sum()) for r in self.rollups.values())
+        return int(frame.memory_usage(deep=True).sum()) + times.nbytes + cumulative.nbytes + rollups
+
+    @property
+    def span(self):
+        """(first, last) timestamp stored."""
+        times = self._data[1]
+        return (pd.Timestamp(times[0]), pd.Timestamp(times[-1])) if len(times) else (None, None)
+
+    # --- Range queries ---
+
+    def _positions(self, times, start, end):
+        """Slice bounds of rows with start <= timestamp <= end (ints select whole years)."""
+        start, end, inclusive = _year_bounds(start, end)
+        lo = np.searchsorted(times, _as_ns(start), side='left') if start is not None else 0
+        hi = (np.searchsorted(times, _as_ns(end), side='right' if inclusive else 'left')
+              if end is not None else len(times))
+        return lo, max(lo, hi)
+
+    def range(self, start=None, end=None):
+        """Rows from ``start`` to ``end`` (timestamps, or ints for whole years) as a slice in time order."""
+        frame, times, _ = self._data
+        lo, hi = self._positions(times, start, end)
+        return frame.iloc[lo:hi]
+
+    def totals(self, start=None, end=None):
+        """{'accidents', 'killed', 'injured'} over a range, from prefix sums."""
+        _, times, cumulative = self._data
+        lo, hi = self._positions(times, start, end)
+        accidents, *measures = cumulative[hi] - cumulative[lo]
+        return dict(accidents=int(accidents), **{m: float(v) for m, v in zip(MEASURES, measures)})
+
+    # --- Rollups ---
+
+    @staticmethod
+    def _rollup(frame, granularity):
+        """Accidents, killed and injured per period, indexed in time order."""
+        times = frame[TIME_COLUMN].dt
+        if granularity == 'year':
+            keys = [times.year.rename('year')]
+        elif granularity == 'month':
+            keys = [times.year.rename('year'), times.month.rename('month')]
+        else:
+            season = pd.Categorical.from_codes(MONTH_TO_SEASON[times.month.to_numpy()], categories=SEASONS)
+            keys = [times.year.rename('year'), pd.Series(season, index=frame.index, name='season')]
+        grouped = frame.groupby(keys, observed=True, sort=True)
+        table = grouped[MEASURES].sum()
+        table.insert(0, 'accidents', grouped.size())
+        return table
+
+    def rollup(self, granularity='year', start=None, end=None):
+        """
+        Rollup table for ``granularity`` (year, month, season or decade), optionally
+        limited to the years ``start``..``end``. Season rollups are per (year, season).
+        """
+        if granularity not in GRANULARITIES:
+            raise ValueError(f"Unknown granularity {granularity!r}; expected one of {GRANULARITIES}")
+        table = self.rollups['year' if granularity == 'decade' else granularity]
+        if start is not None or end is not None:
+            # The index is sorted by year first, so a year range is a binary-searched slice
+            years = table.index.get_level_values('year').to_numpy()
+            lo = np.searchsorted(years, start, side='left') if start is not None else 0
+            hi = np.searchsorted(years, end, side='right') if end is not None else len(years)
+            table = table.iloc[lo:hi]
+        if granularity == 'decade':
+            decades = pd.Index(table.index // 10 * 10, name='decade')
+            table = table.groupby(decades).sum()
+            table.index = table.index.astype(str) + 's'
+        return table
+
+    def seasonal_profile(self, start=None, end=None):
+        """Totals per season across the selected years."""
+        return self.rollup('season', start, end).groupby(level='season', observed=False).sum()
+
+    # --- Appends ---
+
+    def append(self, rows):
+        """Add rows (with ``timestamp``, ``killed``, ``injured``) in place; returns the number stored."""
+        rows = rows.copy()
+        rows[TIME_COLUMN] = pd.to_datetime(rows[TIME_COLUMN], errors='coerce').astype('datetime64[ns]')
+        dated = rows[TIME_COLUMN].notna().to_numpy()
+        rows = rows[dated].sort_values(TIME_COLUMN, kind='stable', ignore_index=True)
+        with self._lock:
+            self.undated_rows += int((~dated).sum())
+            if rows.empty:
+                return 0
+            frame, times, cumulative = self._data
+            combined = pd.concat([frame, rows], ignore_index=True)
+            if len(times) and rows[TIME_COLUMN].iloc[0].value < times[-1]:
+                self._set_rows(combined.sort_values(TIME_COLUMN, kind='stable', ignore_index=True))
+            else:
+                # Later than everything stored: the prefix sums simply continue
+                self._set_rows(combined, np.vstack([cumulative, self._prefix_sums(rows, cumulative[-1])]))
+            for name, table in self.rollups.items():
+                self.rollups[name] = table.add(self._rollup(rows, name), fill_value=0).astype(table.dtypes.to_dict())
+        return len(rows)
+
+
+def cached_store(dataset_key, build):
+    """The store returned by ``build()``, built once per dataset in the shared process-wide cache."""
+    return frame_cache.get_or_load((dataset_key, 'timeseries_store'), build)
@@ -0,0 +1,258 @@
+"""Lightweight span tracing for the app's hot paths, exported as OpenTelemetry JSON.
+
+Wrap work in ``with span("name", key=value):`` or decorate a function with
+``@traced("name")``. Each finished span records wall time, CPU time of the calling
+thread and, when memory tracking is on, the tracemalloc peak above the span's
+starting allocation (nested spans fold their peaks into the parent). Spans nest
+per thread/session through a context variable; a root span (one per page rerun)
+writes its whole trace to ``RAILWAY_TRACE_FILE`` as one OTLP/JSON
+``ExportTraceServiceRequest`` per line, which OpenTelemetry collectors' file
+receivers and ``otel-cli`` can read.
+
+Tracing is off unless ``RAILWAY_TRACING=1`` or ``enable()`` is called (the admin
+page does so). While off, ``span`` returns a shared no-op and ``traced`` wrappers
+call straight through after a single flag check. Memory tracking and CPU time are
+process-wide views, so with several concurrent sessions they are approximate.
+"""
+import contextvars
+import functools
+import json
+import os
+import random
+import threading
+import time
+import tracemalloc
+from collections import deque
+
+SERVICE_NAME = "railway-accident-analytics"
+SCOPE_NAME = "core.tracing"
+TRACE_FILE = os.environ.get(
+    "RAILWAY_TRACE_FILE",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "traces", "spans.jsonl"))
+MAX_SPANS = 20_000  # Finished spans kept in memory for the admin page
+SPAN_KIND_INTERNAL = 1
+STATUS_OK, STATUS_ERROR = 1, 2
+
+
+class _Config:
+    enabled = os.environ.get("RAILWAY_TRACING", "") == "1"
+    memory = os.environ.get("RAILWAY_TRACING_MEMORY", "1") == "1"
+    export_path = TRACE_FILE
+
+
+_config = _Config()
+_current = contextvars.ContextVar("railway_span", default=None)
+_lock = threading.Lock()
+_finished = deque(maxlen=MAX_SPANS)
+
+
+class Span:
+    """One timed operation; use through ``span()``."""
+
+    __slots__ = ('name', 'attributes', 'trace_id', 'span_id', 'parent', 'start_ns', 'end_ns', 'wall_ns',
+                 'cpu_ns', 'peak_bytes', 'status', 'error', 'spans', '_start_perf', '_start_cpu', '_thread',
+                 '_memory_start', '_peak_seen', '_token')
+
+    def __init__(self, name, attributes):
+        parent = _current.get()
+        self.name = name
+        self.attributes = attributes
+        self.parent = parent
+        self.trace_id = parent.trace_id if parent is not None else random.getrandbits(128)
+        self.span_id = random.getrandbits(64)
+        self.spans = parent.spans if parent is not None else []  # Every finished span of the trace
+        self.end_ns = self.wall_ns = self.cpu_ns = self.peak_bytes = None
+        self.status, self.error = STATUS_OK, None
+
+    @property
+    def root(self):
+        node = self
+        while node.parent is not None:
+            node = node.parent
+        return node
+
+    @property
+    def page(self):
+        return self.root.attributes.get('page')
+
+    def __enter__(self):
+        self._token = _current.set(self)
+        self._thread = threading.get_ident()
+        if _config.memory and tracemalloc.is_tracing():
+            current, peak = tracemalloc.get_traced_memory()
+            if self.parent is not None and self.parent._memory_start is not None:
+                # Keep the parent's peak so far before this span resets the high-water mark
+                self.parent._peak_seen = max(self.parent._peak_seen, peak)
+            tracemalloc.reset_peak()
+            self._memory_start, self._peak_seen = current, current
+        else:
+            self._memory_start = None
+        self.start_ns = time.time_ns()
+        self._start_cpu = time.thread_time_ns()
+        self._start_perf = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.wall_ns = time.perf_counter_ns() - self._start_perf
+        # Generators can resume on another thread, whose CPU clock is unrelated
+        self.cpu_ns = time.thread_time_ns() - self._start_cpu if threading.get_ident() == self._thread else None
+        self.end_ns = self.start_ns + self.wall_ns
+        if self._memory_start is not None and tracemalloc.is_tracing():
+            peak = max(self._peak_seen, tracemalloc.get_traced_memory()[1])
+            self.peak_bytes = peak - self._memory_start
+            if self.parent is not None and self.parent._memory_start is not None:
+                self.parent._peak_seen = max(self.parent._peak_seen, peak)
+        if isinstance(exc, Exception):  # Streamlit's rerun/stop signals are BaseExceptions, not errors
+            self.status, self.error = STATUS_ERROR, f"{exc_type.__name__}: {exc}"
+        try:
+            _current.reset(self._token)
+        except ValueError:  # Exited in another context (a generator consumed elsewhere)
+            _current.set(self.parent)
+        self._finish()
+        return False
+
+    def _finish(self):
+        self.spans.append(self)
+        with _lock:
+            _finished.append(self)
+        if self.parent is None and _config.export_path:
+            try:
+                export(self.spans, _config.export_path)
+            except OSError:
+                _config.export_path = None  # Keep tracing in memory rather than failing the page
+
+    def set_attribute(self, key, value):
+        self.attributes[key] = value
+
+    def to_dict(self):
+        """Flat summary for tables."""
+        return {
+            'name': self.name, 'page': self.page, 'wall_ms': self.wall_ns / 1e6,
+            'cpu_ms': self.cpu_ns / 1e6 if self.cpu_ns is not None else None,
+            'peak_mb': self.peak_bytes / 2 ** 20 if self.peak_bytes is not None else None,
+            'start': self.start_ns, 'root': self.parent is None, 'error': self.error,
+            'attributes': dict(self.attributes),
+        }
+
+    def to_otlp(self):
+        """This span in OTLP/JSON form."""
+        attributes = dict(self.attributes)
+        if self.cpu_ns is not None:
+            attributes['railway.cpu_time_ns'] = self.cpu_ns
+        if self.peak_bytes is not None:
+            attributes['railway.peak_memory_bytes'] = self.peak_bytes
+        record = {
+            'traceId': f"{self.trace_id:032x}", 'spanId': f"{self.span_id:016x}", 'name': self.name,
+            'kind': SPAN_KIND_INTERNAL, 'startTimeUnixNano': str(self.start_ns), 'endTimeUnixNano': str(self.end_ns),
+            'attributes': [{'key': key, 'value': _otlp_value(value)} for key, value in attributes.items()],
+            'status': {'code': self.status},
+        }
+        if self.parent is not None:
+            record['parentSpanId'] = f"{self.parent.span_id:016x}"
+        if self.error:
+            record['status']['message'] = self.error
+        return record
+
+
+class _NoopSpan:
+    """Shared stand-in returned while tracing is disabled."""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+    def set_attribute(self, key, value):
+        pass
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+def _otlp_value(value):
+    if isinstance(value, bool):
+        return {'boolValue': value}
+    if isinstance(value, int):
+        return {'intValue': str(value)}  # int64 is a JSON string in OTLP
+    if isinstance(value, float):
+        return {'doubleValue': value}
+    return {'stringValue': str(value)}
+
+
+def span(name, **attributes):
+    """Context manager timing the enclosed block (a no-op while tracing is disabled)."""
+    if not _config.enabled:
+        return _NOOP_SPAN
+    return Span(name, attributes)
+
+
+def traced(name=None):
+    """Decorator wrapping each call in a span named ``name`` (default: the qualified function name)."""
+    def decorate(fn):
+        span_name = name or f"{fn.__module__}.{fn.__qualname__}"
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not _config.enabled:
+                return fn(*args, **kwargs)
+            with Span(span_name, {}):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def is_enabled():
+    return _config.enabled
+
+
+def memory_tracking():
+    return _config.memory
+
+
+def enable(memory=True, export_path=TRACE_FILE):
+    """Start recording spans process-wide; ``memory`` also starts tracemalloc (slows allocation-heavy code)."""
+    _config.memory = memory
+    _config.export_path = export_path
+    if memory and not tracemalloc.is_tracing():
+        tracemalloc.start()
+    elif not memory and tracemalloc.is_tracing():
+        tracemalloc.stop()
+    _config.enabled = True
+
+
+def disable():
+    _config.enabled = False
+    if tracemalloc.is_tracing():
+        tracemalloc.stop()
+
+
+def finished_spans():
+    """Spans finished since start-up or the last ``clear()``, oldest first (at most MAX_SPANS)."""
+    with _lock:
+        return list(_finished)
+
+
+def clear():
+    with _lock:
+        _finished.clear()
+
+
+def otlp_request(spans):
+    """An OTLP/JSON ExportTraceServiceRequest for ``spans``."""
+    return {'resourceSpans': [{
+        'resource': {'attributes': [{'key': 'service.name', 'value': {'stringValue': SERVICE_NAME}}]},
+        'scopeSpans': [{'scope': {'name': SCOPE_NAME}, 'spans': [s.to_otlp() for s in spans]}],
+    }]}
+
+
+def export(spans, path=TRACE_FILE):
+    """Append ``spans`` to ``path`` as one JSON line."""
+    line = json.dumps(otlp_request(spans), separators=(',', ':'))
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with _lock, open(path, "a", encoding="utf-8") as f:
+        f.write(line + "\n")
+
+
+if _config.enabled and _config.memory:
+    tracemalloc.start()
@@ -0,0 +1,231 @@
+"""Parallel hyperparameter search, warm-started refits and out-of-core training for the severity model."""
+import copy
+import itertools
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.linear_model import SGDRegressor
+from sklearn.metrics import mean_absolute_error
+from sklearn.model_selection import KFold
+
+from core.streaming import DEFAULT_SAMPLE_ROWS, RunningStats, StreamedUpload, coerce_numeric, fit_from_statistics
+
+# Search space: number of trees, depth and minimum samples per leaf
+PARAM_GRID = {
+    'n_estimators': [50, 100, 200],
+    'max_depth': [None, 8, 16],
+    'min_samples_leaf': [1, 2, 4],
+}
+CV_FOLDS = 5
+# Stop once this many finished candidates in a row fail to beat the best MAE
+EARLY_STOPPING_PATIENCE = 8
+EARLY_STOPPING_MIN_DELTA = 0.01
+
+# Out-of-core training
+OUT_OF_CORE_MODES = ('forest', 'sgd')
+HOLDOUT_EVERY = 5  # Every 5th row of the stream is held out for evaluation (20%)
+OUT_OF_CORE_SAMPLE_ROWS = 20 * DEFAULT_SAMPLE_ROWS  # Training rows kept for the forest
+SGD_EPOCHS = 5
+
+
+def param_candidates(param_grid=PARAM_GRID):
+    """Expand a grid into parameter dicts, cheapest (fewest, shallowest trees) first."""
+    names = list(param_grid)
+    candidates = [dict(zip(names, values)) for values in itertools.product(*param_grid.values())]
+    return sorted(candidates, key=lambda p: (p.get('n_estimators', 100), p.get('max_depth') or np.inf))
+
+
+def cross_val_mae(params, X, y, folds=CV_FOLDS, random_state=42):
+    """Mean K-fold MAE of a single-threaded forest (parallelism comes from the process pool)."""
+    X, y = np.asarray(X), np.asarray(y)
+    errors = []
+    for train_idx, test_idx in KFold(n_splits=folds, shuffle=True, random_state=random_state).split(X):
+        model = RandomForestRegressor(random_state=random_state, n_jobs=1, **params)
+        model.fit(X[train_idx], y[train_idx])
+        errors.append(mean_absolute_error(y[test_idx], model.predict(X[test_idx])))
+    return params, float(np.mean(errors))
+
+
+def search_hyperparameters(X, y, param_grid=PARAM_GRID, folds=CV_FOLDS, max_workers=None,
+                           patience=EARLY_STOPPING_PATIENCE, min_delta=EARLY_STOPPING_MIN_DELTA):
+    """
+    Cross-validated grid search over ``param_grid`` in a process pool.
+
+    Candidates that have not started are cancelled once ``patience`` completed
+    candidates in a row fail to improve the best MAE by ``min_delta``.
+    Returns a dict with ``best_params``, ``best_mae``, ``results`` and ``stopped_early``.
+    """
+    X, y = np.asarray(X), np.asarray(y)
+    max_workers = max_workers or os.cpu_count() or 1
+    best_params, best_mae = None, np.inf
+    results, stale, stopped_early = [], 0, False
+
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        futures = [pool.submit(cross_val_mae, params, X, y, folds) for params in param_candidates(param_grid)]
+        for future in as_completed(futures):
+            if future.cancelled():
+                continue
+            params, mae = future.result()
+            results.append({'params': params, 'mae': mae})
+            if mae < best_mae - min_delta:
+                best_params, best_mae, stale = params, mae, 0
+            else:
+                stale += 1
+                if best_mae > mae:
+                    best_params, best_mae = params, mae
+            if stale >= patience and not stopped_early:
+                stopped_early = True
+                for pending in futures:
+                    pending.cancel()
+
+    return {'best_params': best_params, 'best_mae': best_mae, 'results': results, 'stopped_early': stopped_early}
+
+
+def warm_start_refit(model, X, y, extra_trees=50):
+    """
+    Return a copy of ``model`` grown by ``extra_trees`` trees fitted on ``X``/``y``.
+
+    Existing trees are kept as-is, so refitting after new rows arrive costs only
+    the new trees. The input model is not modified (it may be shared across sessions).
+    """
+    model = copy.deepcopy(model)
+    model.set_params(warm_start=True, n_estimators=len(model.estimators_) + extra_trees)
+    model.fit(X, y)
+    return model
+
+
+class ScaledTargetSGDRegressor:
+    """
+    Incremental linear regressor fitted on a standardized target; predicts in original
+    units, clipped to ``target_range`` (e.g. the observed training range) when given.
+    """
+
+    def __init__(self, target_mean, target_std, target_range=(None, None), **params):
+        self.target_mean = float(target_mean)
+        self.target_std = float(target_std) or 1.0
+        self.target_range = target_range
+        self.regressor = SGDRegressor(**params)
+
+    def partial_fit(self, X, y):
+        self.regressor.partial_fit(X, (np.asarray(y, dtype=np.float64) - self.target_mean) / self.target_std)
+        return self
+
+    def predict(self, X):
+        predictions = self.regressor.predict(X) * self.target_std + self.target_mean
+        return np.clip(predictions, *self.target_range)
+
+
+class StreamingMetrics:
+    """MAE and R² accumulated over chunks of predictions."""
+
+    def __init__(self):
+        self.abs_error = 0.0
+        self.squared_error = 0.0
+        self.target = RunningStats(['y'])
+
+    def update(self, y_true, y_pred):
+        y_true = np.asarray(y_true, dtype=np.float64)
+        errors = y_true - np.asarray(y_pred, dtype=np.float64)
+        self.abs_error += float(np.abs(errors).sum())
+        self.squared_error += float((errors ** 2).sum())
+        self.target.update(pd.DataFrame({'y': y_true}))
+
+    @property
+    def count(self):
+        return int(self.target.count[0])
+
+    @property
+    def mae(self):
+        return self.abs_error / self.count if self.count else float('nan')
+
+    @property
+    def r2(self):
+        total = float(self.target.m2[0])
+        return 1.0 - self.squared_error / total if total > 0 else float('nan')
+
+
+def holdout_mask(start, rows):
+    """Rows held out for evaluation, by position in the stream, so every pass agrees."""
+    return np.arange(start, start + rows) % HOLDOUT_EVERY == 0
+
+
+def train_out_of_core(read_chunks, preprocessor, features, target, prepare=None, mode='forest', params=None,
+                      sample_rows=OUT_OF_CORE_SAMPLE_ROWS, epochs=SGD_EPOCHS, seed=42):
+    """
+    Train the severity model on a dataset streamed in chunks, never holding it in memory.
+
+    ``read_chunks()`` must return a fresh iterator of DataFrame chunks on each call
+    (one call per pass); ``prepare(chunk)`` can add the target. Pass 1 computes the
+    imputer/scaler statistics and category set over every row, plus a reservoir sample
+    of training rows. Then either a random forest is fitted on that sample (``forest``)
+    or an ``SGDRegressor`` is trained with ``partial_fit`` over every training row for
+    ``epochs`` passes (``sgd``). A final pass scores every held-out row (each
+    HOLDOUT_EVERY-th), so MAE and R² are measured against the full data.
+
+    Returns a dict with the fitted ``preprocessor``, ``feature_names`` and ``model``,
+    ``mae``, ``r2`` and row counts.
+    """
+    if mode not in OUT_OF_CORE_MODES:
+        raise ValueError(f"Unknown out-of-core mode {mode!r}; expected one of {OUT_OF_CORE_MODES}")
+    params = dict(params or {})
+    columns = {name: list(cols) for name, _, cols in preprocessor.transformers}
+    counts = {}
+
+    def chunks():
+        position, dropped = 0, 0
+        for chunk in read_chunks():
+            coerce_numeric(chunk, columns['num'])
+            if prepare is not None:
+                chunk = prepare(chunk)
+            # Rows without a target cannot be trained on or scored
+            labelled = chunk[target].notna().to_numpy()
+            dropped += int((~labelled).sum())
+            chunk = chunk[labelled].reset_index(drop=True)
+            yield chunk, holdout_mask(position, len(chunk))
+            position += len(chunk)
+        counts['dropped'] = dropped
+
+    # Pass 1: full-data statistics and a uniform sample of training rows
+    streamed = StreamedUpload(columns['num'], columns['cat'], sample_rows, seed)
+    target_stats = RunningStats([target])
+    for chunk, holdout in chunks():
+        streamed.update(chunk, sample=~holdout)
+        target_stats.update(chunk[~holdout])
+    if streamed.rows == 0:
+        raise ValueError("No labelled rows to train on.")
+    fit_from_statistics(preprocessor, streamed)
+    feature_names = preprocessor.get_feature_names_out()
+
+    def transform(frame):
+        return pd.DataFrame(preprocessor.transform(frame[features]), columns=feature_names)
+
+    if mode == 'forest':
+        model = RandomForestRegressor(n_jobs=-1, **params)
+        model.fit(transform(streamed.sample), streamed.sample[target])
+    else:
+        rng = np.random.default_rng(seed)
+        model = ScaledTargetSGDRegressor(target_stats.mean[0], np.sqrt(target_stats.variance[0]),
+                                         (target_stats.minimum[0], target_stats.maximum[0]), **params)
+        for _ in range(epochs):
+            for chunk, holdout in chunks():
+                train = chunk[~holdout]
+                if len(train):
+                    train = train.take(rng.permutation(len(train)))
+                    model.partial_fit(transform(train), train[target])
+
+    # Final pass: score every held-out row
+    metrics = StreamingMetrics()
+    for chunk, holdout in chunks():
+        test = chunk[holdout]
+        if len(test):
+            metrics.update(test[target], model.predict(transform(test)))
+
+    return {
+        'preprocessor': preprocessor, 'feature_names': feature_names, 'model': model,
+        'mae': metrics.mae, 'r2': metrics.r2, 'rows': streamed.rows, 'holdout_rows': metrics.count,
+        'train_rows': streamed.rows - metrics.count, 'sample_rows': len(streamed.sample),
+        'dropped_rows': counts.get('dropped', 0), 'params': dict(params, mode=mode),
+    }
@@ -1,10 +1,8 @@
+import importlib
 import streamlit as st
 from streamlit_option_menu import option_menu
-from pages import Home_overview
-from pages import Insights_and_Analysis
-from pages import Power_BI_Report
-from pages import Predictive_Model
-from pages import llama_Assitant
+from navigation import PAGES, ICONS
+from core.tracing import span
 
 # Page config
 st.set_page_config(page_title="yash's Railway Accident Analytics platform", layout="wide", initial_sidebar_state="collapsed")
@@ -72,8 +70,8 @@ unsafe_allow_html=True
 )
 
 # Navigation
-menu = ["Home", "Power BI Report", "Insights and Analysis", "Predictive Model", "AI Assistant"]
-icons = ["house", "bar-chart", "graph-up", "cpu", "robot"]
+menu = list(PAGES)
+icons = ICONS
 
 # Horizontal navigation menu
 selected_section = option_menu(
@@ -85,14 +83,6 @@ default_index=0,
 orientation="horizontal"
 )
 
-# Page routing
-if selected_section == "Home":
- Home_overview.show()
-elif selected_section == "Power BI Report":
- Power_BI_Report.show()
-elif selected_section == "Insights and Analysis":
- Insights_and_Analysis.show()
-elif selected_section == "Predictive Model":
- Predictive_Model.show()
-elif selected_section == "AI Assistant":
- llama_Assitant.show()
\ No newline at end of file
+# Page routing (imports are cached in sys.modules after the first visit); each rerun is one trace
+with span("page.rerun", page=selected_section):
+    importlib.import_module(PAGES[selected_section]).show()
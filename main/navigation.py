@@ -0,0 +1,18 @@
+"""Navigation menu entries: label -> page module, in menu order."""
+import os
+
+# Pages are imported on first selection so heavy libraries (scikit-learn, Matplotlib,
+# Seaborn, requests) only load when a page that needs them is opened
+PAGES = {
+    "Home": "pages.Home_overview",
+    "Power BI Report": "pages.Power_BI_Report",
+    "Insights and Analysis": "pages.Insights_and_Analysis",
+    "Predictive Model": "pages.Predictive_Model",
+    "AI Assistant": "pages.llama_Assitant",
+}
+ICONS = ["house", "bar-chart", "graph-up", "cpu", "robot"]
+
+# Opt-in admin pages, hidden unless RAILWAY_ADMIN=1
+if os.environ.get("RAILWAY_ADMIN") == "1":
+    PAGES["Tracing"] = "pages.Tracing_Admin"
+    ICONS.append("speedometer2")
@@ -1,3 +1,4 @@
+import os
 import streamlit as st
 
 
@@ -12,8 +13,9 @@ def show():
 )
     # Instructions to the user
     st.write(" Download the dataset by clicking the button below. ")
-    # Provide the absolute path to the file
-    csv_path = r"C:/Users/yashw/Desktop/6 th sem project ideas/train_Accident_1900_2024_cleaned.xlsx"
+    # Bundled copy of the dataset in main/Assests
+    csv_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                            "Assests", "train_Accident_1900_2024_cleaned.xlsx")
 
     try:
         # Attempt to open 
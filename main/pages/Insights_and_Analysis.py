@@ -1,7 +1,292 @@
+import io
 import streamlit as st
 import pandas as pd
+from core.chart_cache import cached_chart, filters_key  # Selects the Agg backend before pyplot loads
 import matplotlib.pyplot as plt
 import seaborn as sns
+from core.columnar_store import load_dataset
+from core.data_cache import content_hash, frame_cache
+from core.aggregate_cube import CUBE_DIMENSIONS, AggregateCube, cached_cube
+from core.eda_features import cached_features, derive_features
+from core.geo_index import TILE_SIZES_DEG, GeoIndex, cached_geo_index
+from core.incremental import AppendOnlyDataset, append_rows
+from core.streaming import STREAMING_THRESHOLD_BYTES, SchemaError, stream_csv
+from core.timeseries_store import TimeSeriesStore, cached_store, train_accident_rows
+from core.tracing import span, traced
+
+# Columns the EDA reads; everything else in the upload is skipped at parse time
+EDA_COLUMNS = ['time', 'train_name', 'railway_division', 'env', 'cause', 'injured', 'killed']
+EDA_DTYPES = {'railway_division': 'category', 'env': 'category', 'cause': 'category'}
+EDA_MEASURES = ['injured', 'killed']
+EDA_KEY_COLUMNS = ['time', 'train_name']  # Identify an incident across refreshed exports
+EDA_TREND_COLUMNS = ['time', 'killed', 'injured']  # Kept by the loaded dataset's time-indexed store
+
+CHART_BACKENDS = ["Matplotlib (cached images)", "Interactive (client-side)"]
+
+# Long-term trends over the 1902-2024 dataset
+TREND_DATASET_KEY = 'bundled:accidents_1902_2024'
+TREND_GRANULARITIES = {"Year": 'year', "Decade": 'decade', "Month": 'month', "Season": 'season'}
+TREND_METRICS = {"Accidents": 'accidents', "Killed": 'killed', "Injured": 'injured'}
+
+HOTSPOT_TOP_N = 5
+HOTSPOT_RADIUS_KM = (100, 1500, 400)  # Proximity slider min, max, default
+MAP_POINT_METERS = (20_000, 150_000)  # Map marker radius for the smallest and largest cell
+
+
+@traced('eda.load_data')
+def load_eda_data(uploaded_file=None):
+    """
+    Read only the EDA columns from an upload or the bundled dataset, via the shared cache.
+    Returns (dataset_key, df); the key identifies the dataset for downstream memoization.
+    """
+    if uploaded_file is None:
+        dataset_key = 'bundled:train_accident_analysis'
+        loader = lambda: load_dataset('train_accident_analysis', EDA_COLUMNS)
+    else:
+        data = uploaded_file.getvalue()
+        dataset_key = content_hash(data)
+        loader = lambda: pd.read_csv(io.BytesIO(data), usecols=lambda c: c in EDA_COLUMNS, dtype=EDA_DTYPES)
+    return dataset_key, frame_cache.get_or_load((dataset_key, 'eda'), loader)
+
+
+@traced('eda.stream_upload')
+def stream_eda_upload(uploaded_file):
+    """
+    Stream a large upload in chunks, deriving features, cube cells and zone aggregates per chunk.
+    Returns (dataset_key, streamed upload, cube, zone index); both cover every row.
+    """
+    dataset_key = content_hash(uploaded_file.getbuffer())
+
+    def load():
+        parts, zones = [], []
+
+        def on_chunk(chunk):
+            chunk = derive_features(chunk)
+            parts.append(AggregateCube.from_frame(chunk))
+            zones.append(GeoIndex.by_zone_code(chunk))
+
+        uploaded_file.seek(0)
+        streamed = stream_csv(uploaded_file, numeric=EDA_MEASURES, categorical=list(EDA_DTYPES),
+                              required=EDA_COLUMNS, usecols=lambda c: c in EDA_COLUMNS, dtype=EDA_DTYPES,
+                              on_chunk=on_chunk)
+        streamed.aggregates['cube'] = AggregateCube.merge(parts)
+        streamed.aggregates['zones'] = GeoIndex.merge(zones)
+        return streamed
+
+    streamed = frame_cache.get_or_load((dataset_key, 'eda_stream'), load)
+    return dataset_key, streamed, streamed.aggregates['cube'], streamed.aggregates['zones']
+
+
+def cached_trends(dataset_key, features):
+    """Time-indexed store of a loaded dataset's incidents (timestamps already parsed), built once per dataset."""
+    return cached_store(dataset_key,
+                        lambda: TimeSeriesStore.from_train_accident_analysis(features[EDA_TREND_COLUMNS]))
+
+
+def eda_dataset(dataset_key, df, features, cube, zones, trends):
+    """Append-only view of a loaded dataset with the features and aggregates derived from it."""
+    def build():
+        dataset = AppendOnlyDataset(df, dataset_key, key=EDA_KEY_COLUMNS)
+        dataset.aggregates.update(features=features, cube=cube, zones=zones, trends=trends)
+        return dataset
+    return frame_cache.get_or_load((dataset_key, 'eda_refreshable'), build)
+
+
+@traced('eda.refresh')
+def refresh_eda_data(dataset, rows):
+    """
+    Fold new and changed rows into a dataset's features, cube, zone index and time-indexed store.
+    Only the delta is derived and aggregated; returns (refreshed dataset, delta).
+    """
+    delta = dataset.diff(rows)
+    if not delta:
+        return dataset, delta
+    refreshed = dataset.apply(delta)
+    features = dataset.aggregates['features']
+    added = derive_features(delta.added)
+    cube = AggregateCube.merge([dataset.aggregates['cube'], AggregateCube.from_frame(added)])
+    zones = GeoIndex.merge([dataset.aggregates['zones'], GeoIndex.by_zone_code(added)])
+    replaced = features.loc[features.index.intersection(delta.replaced.index)]
+    if len(replaced):
+        features = features.drop(replaced.index)
+        cube = cube.without(AggregateCube.from_frame(replaced))
+        zones = zones.without(GeoIndex.by_zone_code(replaced))
+    features = append_rows(features, added)
+    if len(replaced):
+        # The store only grows, so replaced incidents mean a rebuild
+        trends = TimeSeriesStore.from_train_accident_analysis(features[EDA_TREND_COLUMNS])
+    else:
+        # Other sessions keep reading the store this one was refreshed from
+        trends = dataset.aggregates['trends'].copy()
+        trends.append(train_accident_rows(added[EDA_TREND_COLUMNS]))
+    refreshed.aggregates.update(features=features, cube=cube, zones=zones, trends=trends)
+    return refreshed, delta
+
+
+def show_refresh(dataset_key, df, features, cube, zones, trends):
+    """Incremental refresh controls; returns this session's refreshed version of the dataset, or None."""
+    refreshed = st.session_state.setdefault('eda_refreshed', {})
+    with st.expander("Refresh With New Rows (incremental)"):
+        st.caption("Upload the latest export or only the new rows. Rows already loaded are skipped and a row with "
+                   "the time and train of a loaded one replaces it; only those rows are re-derived.")
+        refresh_file = st.file_uploader("Upload refreshed accident data CSV", type=["csv"], key="eda_refresh_file")
+        if refresh_file is not None and st.button("Apply Refresh"):
+            current = refreshed.get(dataset_key)
+            if current is None:
+                current = eda_dataset(dataset_key, df, features, cube, zones, trends)
+            try:
+                rows = pd.read_csv(refresh_file, usecols=lambda c: c in EDA_COLUMNS, dtype=EDA_DTYPES)
+                updated, delta = refresh_eda_data(current, rows)
+            except (SchemaError, ValueError) as e:
+                st.error(f"Error applying refresh: {e}")
+            else:
+                if delta:
+                    refreshed[dataset_key] = updated
+                st.success(f"Refresh: {delta.summary()}.")
+        current = refreshed.get(dataset_key)
+        if current is not None:
+            st.caption(f"Showing {len(current):,} rows after {current.refreshes} refresh(es).")
+            if st.button("Discard Refreshes"):
+                del refreshed[dataset_key]
+                st.rerun()
+    return refreshed.get(dataset_key)
+
+
+def bar_chart_png(cache_key, counts, xlabel, ylabel, title, palette):
+    """Cached PNG of a Seaborn bar chart of ``counts``."""
+    def draw(fig):
+        ax = fig.subplots()
+        sns.barplot(x=counts.index, y=counts.values, ax=ax, palette=palette)
+        ax.set_xlabel(xlabel, fontsize=10)
+        ax.set_ylabel(ylabel, fontsize=10)
+        ax.set_title(title, fontsize=12)
+        plt.xticks(rotation=45, ha='right', fontsize=8)  # Smaller x-axis labels
+        plt.yticks(fontsize=8)  # Smaller y-axis labels
+        fig.tight_layout()  # Adjust layout to prevent labels from overlapping
+    return cached_chart(cache_key, draw)
+
+
+def casualties_chart_png(cache_key, region_casualties):
+    """Cached PNG of the grouped injured/killed bar chart by region."""
+    def draw(fig_casualties):
+        ax_casualties = fig_casualties.subplots()
+        region_casualties.plot(kind='bar', ax=ax_casualties, colormap='coolwarm')
+        ax_casualties.set_xlabel("Region", fontsize=10)
+        ax_casualties.set_ylabel("Number of People", fontsize=10)
+        ax_casualties.set_title("Casualties (Injured and Killed) by Region", fontsize=12)
+        plt.xticks(rotation=45, ha='right', fontsize=8)
+        plt.yticks(fontsize=8)
+        fig_casualties.tight_layout()
+    return cached_chart(cache_key, draw)
+
+
+def show_hotspots(index, key, place_label):
+    """Top-N hotspots, a map of the precomputed heatmap tiles and a proximity search over a geo index."""
+    if index.table.empty:
+        st.info(f"No accidents could be matched to a {place_label.lower()}.")
+        return
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        n = st.number_input("Top hotspots", 1, len(index.table), min(HOTSPOT_TOP_N, len(index.table)),
+                            key=f"{key}_top_n")
+    with col2:
+        metric = TREND_METRICS[st.radio("Measure", list(TREND_METRICS), horizontal=True, key=f"{key}_metric")]
+    with col3:
+        tile_size = st.select_slider("Heatmap cell (degrees)", TILE_SIZES_DEG, key=f"{key}_tile")
+
+    hotspots = index.hotspots(n, metric)
+    top = hotspots.iloc[0]
+    st.write(f"<p class='answer'><b>Finding:</b> The {place_label.lower()} with the most {metric} is "
+             f"<b>{top['name']}</b> ({top[metric]:,.0f}).</p>", unsafe_allow_html=True)
+    st.dataframe(hotspots.set_index('name')[['accidents', 'killed', 'injured']])
+
+    tiles = index.heatmap(tile_size)
+    tiles = tiles[tiles[metric] > 0]
+    low, high = MAP_POINT_METERS
+    st.map(tiles.assign(size=low + (high - low) * tiles[metric] / tiles[metric].max()),
+           latitude='lat', longitude='lon', size='size')
+    if not index.unlocated.empty:
+        st.caption(f"{int(index.unlocated.sum()):,} accidents with an unknown or unmatched "
+                   f"{place_label.lower()} are not shown.")
+
+    col1, col2 = st.columns(2)
+    names = index.centroids.names(index.level)
+    with col1:
+        place = st.selectbox(f"Accidents near {place_label.lower()}", names.tolist(), key=f"{key}_place")
+    with col2:
+        low, high, default = HOTSPOT_RADIUS_KM
+        radius = st.slider("Within (km)", low, high, default, step=50, key=f"{key}_radius")
+    nearby = index.near_place(place, radius)
+    st.dataframe(nearby.set_index('name')[['accidents', 'killed', 'injured', 'distance_km']].round(1))
+
+
+def trend_store():
+    """Time-indexed store of the 1902-2024 accidents, built once per process."""
+    return cached_store(TREND_DATASET_KEY,
+                        lambda: TimeSeriesStore.from_accidents_1902_2024(load_dataset('accidents_1902_2024')))
+
+
+@traced('eda.trends')
+def show_trends(store, key):
+    """Year, decade, month and season trends answered from precomputed rollups and prefix sums."""
+    first, last = store.span
+    if first is None:
+        st.info("No dated accidents to chart.")
+        return
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        if first.year < last.year:
+            start, end = st.slider("Years", first.year, last.year, (first.year, last.year), key=f"{key}_years")
+        else:
+            start = end = first.year
+    with col2:
+        granularity = TREND_GRANULARITIES[st.radio("Granularity", list(TREND_GRANULARITIES), horizontal=True,
+                                                   key=f"{key}_granularity")]
+    with col3:
+        metric = TREND_METRICS[st.radio("Measure", list(TREND_METRICS), horizontal=True, key=f"{key}_metric")]
+
+    totals = store.totals(start, end)
+    st.write(f"<p class='answer'>From <b>{start}</b> to <b>{end}</b>: <b>{totals['accidents']:,}</b> accidents, "
+             f"<b>{totals['killed']:,.0f}</b> killed and <b>{totals['injured']:,.0f}</b> injured.</p>",
+             unsafe_allow_html=True)
+
+    if granularity == 'season':
+        st.bar_chart(store.seasonal_profile(start, end)[metric])
+        return
+    table = store.rollup(granularity, start, end)
+    if granularity == 'month':
+        table.index = [f"{year}-{month:02d}" for year, month in table.index]
+    st.bar_chart(table[metric])
+
+
+def show_long_term_trends():
+    """Trends of the 1902-2024 accidents."""
+    st.write("### Long-term Trends")
+    try:
+        store = trend_store()
+    except (FileNotFoundError, ImportError):
+        st.info("The 1902-2024 accident dataset is not available.")
+        return
+    show_trends(store, "trend")
+
+
+def state_index():
+    """State index of the 1902-2024 accidents, built once per process."""
+    return cached_geo_index(TREND_DATASET_KEY, 'state',
+                            lambda: GeoIndex.by_state(load_dataset('accidents_1902_2024')))
+
+
+@traced('eda.state_hotspots')
+def show_state_hotspots():
+    """State hotspots and proximity queries over 1902-2024, answered from precomputed aggregates."""
+    st.write("### State Hotspots (1902-2024)")
+    try:
+        index = state_index()
+    except (FileNotFoundError, ImportError):
+        st.info("The 1902-2024 accident dataset is not available.")
+        return
+    show_hotspots(index, "state_hotspots", "State")
+
 
 def show():
     st.markdown(
@@ -24,39 +309,50 @@ def show():
         """, unsafe_allow_html=True)
 
     # File Upload
-    uploaded_file = st.file_uploader("Upload CSV File", type=["csv"])
-    if uploaded_file is not None:
-        df = pd.read_csv(uploaded_file)
-        st.write("### Dataset Preview")
-        st.write(df.head())
-
-        # Data Preprocessing
-        df['time'] = pd.to_datetime(df['time'], errors='coerce')
-        df.dropna(subset=['time'], inplace=True)  # Remove rows with invalid dates
-        df['hour'] = df['time'].dt.hour
-        df['daytime'] = pd.cut(df['hour'], [0, 6, 12, 18, 24],
-                               labels=["Night", "Morning", "Afternoon", "Evening"])
-
-        seasons = ["Winter" if i.month in [12, 1, 2, 3] else "Summer" if i.month in range(4, 7)
-                   else "Monsoon" if i.month in range(7, 10) else "Autumn" for i in df["time"]]
-        df["season"] = seasons
-
-        TRAIN_TYPES = ["Express", "Passenger", "Freight", "Mail", "others"]
-        df['train_type'] = df['train_name'].apply(
-            lambda x: next((t for t in TRAIN_TYPES if t in x), "Unknown"))
-
-        region_map = {"n": "North", "nc": "North", "ne": "North", "nef": "North", "nw": "North",
-                      "s": "South", "sc": "South", "se": "South", "sw": "South",
-                      "e": "East", "ec": "East", "eco": "East", "c": "Central", "w": "West"}
-        df['region'] = df['railway_division'].map(region_map).fillna("Unknown")
-
-        # Remove "Unknown" and "Others" categories
-        df = df[df['daytime'] != 'Unknown']
-        df = df[df['season'] != 'Unknown']
-        df = df[df['region'] != 'Unknown']
-        df = df[df['train_type'] != 'Unknown']
-        df = df[df['env'] != 'Unknown']
-        df = df[df['cause'] != 'unknown']  # Remove unknown causes as well
+    source = st.radio("Data source", ["Upload CSV", "Bundled dataset"], horizontal=True)
+    uploaded_file = None
+    if source == "Upload CSV":
+        uploaded_file = st.file_uploader("Upload CSV File", type=["csv"])
+    if source == "Bundled dataset" or uploaded_file is not None:
+        if uploaded_file is not None and st.checkbox("Stream the upload in chunks (for very large files)",
+                                                     value=uploaded_file.size > STREAMING_THRESHOLD_BYTES):
+            dataset_key, streamed, cube, zones = stream_eda_upload(uploaded_file)
+            st.write("### Dataset Preview")
+            st.caption(f"Streamed {streamed.rows:,} rows in {streamed.chunks} chunks; the analysis covers every row, "
+                       f"the preview is a uniform sample of {len(streamed.sample):,}.")
+            st.write(streamed.sample.head())
+        else:
+            dataset_key, df = load_eda_data(uploaded_file)
+            st.write("### Dataset Preview")
+            st.write(df.head())
+
+            # Data Preprocessing (vectorized, memoized per dataset)
+            with span('eda.preprocess'):
+                features = cached_features(dataset_key, df)
+                cube = cached_cube(dataset_key, features)
+                zones = cached_geo_index(dataset_key, 'zone', lambda: GeoIndex.by_zone_code(features))
+                trends = cached_trends(dataset_key, features)
+
+            # Refreshed rows are folded into the derived results, so charts reflect them without a full rebuild
+            refreshed = show_refresh(dataset_key, df, features, cube, zones, trends)
+            if refreshed is not None:
+                dataset_key = refreshed.dataset_key
+                cube, zones = refreshed.aggregates['cube'], refreshed.aggregates['zones']
+                trends = refreshed.aggregates['trends']
+
+            st.write("### Incidents Over Time")
+            show_trends(trends, "eda_trend")
+
+        # Drill-down filters, answered from the aggregate cube
+        with st.expander("Filter / Drill Down"):
+            filter_cols = st.columns(3)
+            filters = {}
+            for i, dim in enumerate(CUBE_DIMENSIONS):
+                with filter_cols[i % 3]:
+                    filters[dim] = st.multiselect(dim.replace('_', ' ').title(), cube.values(dim), key=f"eda_filter_{dim}")
+        backend = st.radio("Chart backend", CHART_BACKENDS, horizontal=True)
+        client_side = backend == CHART_BACKENDS[1]
+        chart_filters = filters_key(filters)
 
         # Questions & Analysis
         questions = [
@@ -69,21 +365,20 @@ def show():
 
         for question, col in questions:
             st.write(f"<p class='question'>{question}</p>", unsafe_allow_html=True)
+            with span('eda.chart', chart=col, client_side=client_side):
+                counts = cube.counts(col, filters)
+                if counts.empty:
+                    st.info("No accidents match the selected filters.")
+                    continue
 
-            # Reduced figure size
-            fig, ax = plt.subplots(figsize=(8, 4))  # Even smaller plots
-            sns.barplot(x=df[col].value_counts().index, y=df[col].value_counts().values, ax=ax, palette='viridis')
-            ax.set_xlabel(col.replace('_', ' ').title(), fontsize=10)
-            ax.set_ylabel("Accident Count", fontsize=10)
-            ax.set_title(question, fontsize=12)
-            plt.xticks(rotation=45, ha='right', fontsize=8)  # Smaller x-axis labels
-            plt.yticks(fontsize=8)  # Smaller y-axis labels
-            plt.tight_layout()  # Adjust layout to prevent labels from overlapping
-            st.pyplot(fig)
+                if client_side:
+                    st.bar_chart(counts)
+                else:
+                    st.image(bar_chart_png((dataset_key, question, 'viridis', chart_filters), counts,
+                                           col.replace('_', ' ').title(), "Accident Count", question, 'viridis'))
 
             # Answer Section with descriptive findings
-            most_common = df[col].value_counts().idxmax()
-            count = df[col].value_counts().max()
+            most_common, count = cube.top(col, filters)
             st.write(
                 f"<p class='answer'><b>Finding:</b> Most accidents occur during the <b>{most_common}</b> with <b>{count}</b> occurrences.</p>",
                 unsafe_allow_html=True)
@@ -103,34 +398,39 @@ def show():
 
         # --- Additional Analysis: Casualties by Region ---
         st.write(f"<p class='question'>What are the casualties (injured and killed) by region?</p>", unsafe_allow_html=True)
-        region_casualties = df.groupby('region')[['injured', 'killed']].sum()
-        st.write(region_casualties)
+        with span('eda.chart', chart='region_casualties', client_side=client_side):
+            region_casualties = cube.casualties('region', filters)
+            st.write(region_casualties)
 
-        # Reduced size
-        fig_casualties, ax_casualties = plt.subplots(figsize=(8, 4)) # Even smaller plots
-        region_casualties.plot(kind='bar', ax=ax_casualties, colormap='coolwarm')
-        ax_casualties.set_xlabel("Region", fontsize=10)
-        ax_casualties.set_ylabel("Number of People", fontsize=10)
-        ax_casualties.set_title("Casualties (Injured and Killed) by Region", fontsize=12)
-        plt.xticks(rotation=45, ha='right', fontsize=8)
-        plt.yticks(fontsize=8)
-        plt.tight_layout()
-        st.pyplot(fig_casualties)
+            if region_casualties.empty:
+                st.info("No accidents match the selected filters.")
+            else:
+                if client_side:
+                    st.bar_chart(region_casualties, stack=False)
+                else:
+                    st.image(casualties_chart_png((dataset_key, 'region_casualties', 'coolwarm', chart_filters),
+                                                  region_casualties))
+
+        # --- Additional Analysis: Zone Hotspots ---
+        st.write(f"<p class='question'>Which railway zones are accident hotspots?</p>", unsafe_allow_html=True)
+        st.caption("Zone totals cover the whole dataset; the drill-down filters do not apply.")
+        with span('eda.chart', chart='zone_hotspots'):
+            show_hotspots(zones, "zone_hotspots", "Railway zone")
 
         # --- Additional Analysis: Causes of Accidents ---
         st.write(f"<p class='question'>What are the main causes of accidents?</p>", unsafe_allow_html=True)
-        cause_counts = df['cause'].value_counts()
-        # Reduced size
-        fig_cause, ax_cause = plt.subplots(figsize=(8, 4))  # Even smaller plots
-        sns.barplot(x=cause_counts.index, y=cause_counts.values, ax=ax_cause, palette='magma')
-        ax_cause.set_xlabel("Cause", fontsize=10)
-        ax_cause.set_ylabel("Number of Accidents", fontsize=10)
-        ax_cause.set_title("Accident Counts by Cause", fontsize=12)
-        plt.xticks(rotation=45, ha='right', fontsize=8)
-        plt.yticks(fontsize=8)
-        plt.tight_layout()
-        st.pyplot(fig_cause)
-        st.write(f"<p class='answer'>The most frequent cause of accidents is: <b>{cause_counts.idxmax()}</b> with <b>{cause_counts.max()}</b> occurrences.</p>", unsafe_allow_html=True)
+        with span('eda.chart', chart='cause', client_side=client_side):
+            cause_counts = cube.counts('cause', filters)
+            if cause_counts.empty:
+                st.info("No accidents match the selected filters.")
+            elif client_side:
+                st.bar_chart(cause_counts)
+            else:
+                st.image(bar_chart_png((dataset_key, 'cause_counts', 'magma', chart_filters), cause_counts,
+                                       "Cause", "Number of Accidents", "Accident Counts by Cause", 'magma'))
+        if not cause_counts.empty:
+            top_cause, top_cause_count = cube.top('cause', filters)
+            st.write(f"<p class='answer'>The most frequent cause of accidents is: <b>{top_cause}</b> with <b>{top_cause_count}</b> occurrences.</p>", unsafe_allow_html=True)
 
         # Conclusion
         st.write("### Conclusion")
@@ -145,6 +445,9 @@ def show():
     else:
         st.info("Upload  railway accdeint data to perform Exploaratory Data Analysis.")
 
+    show_long_term_trends()
+    show_state_hotspots()
+
 
 if __name__ == "__main__":
     st.write("This should be run as a module and not a script")
@@ -1,6 +1,6 @@
+import io
 import streamlit as st
 import pandas as pd
-import math
 from sklearn.model_selection import train_test_split
 from sklearn.ensemble import RandomForestRegressor
 from sklearn.preprocessing import OneHotEncoder, StandardScaler
@@ -8,40 +8,98 @@ from sklearn.compose import ColumnTransformer
 from sklearn.pipeline import Pipeline
 from sklearn.impute import SimpleImputer
 from sklearn.metrics import mean_absolute_error, r2_score
+from core import model_registry
+from core.columnar_store import load_dataset
+from core.data_cache import content_hash, frame_cache
+from core.training import HOLDOUT_EVERY, PARAM_GRID, search_hyperparameters, train_out_of_core, warm_start_refit
+from core.fast_path import CompiledSeverityModel, cached_compiled_model
+from core.incremental import AppendOnlyDataset, refit_reasons
+from core.estimates import (RESOURCE_TABLES, classify_severity, estimate_ambulances,
+                            estimate_structural_damage_cost)
+from core.scoring import iter_csv_chunks, missing_columns, read_incident_file, score_frame
+from core.shared_snapshot import shared_artifact
+from core.streaming import (DEFAULT_CHUNK_ROWS, STREAMING_THRESHOLD_BYTES, SchemaError, fit_from_statistics,
+                            frame_statistics, stream_csv)
+from core.tracing import span, traced
 
 # --- Constants ---
 FEATURES = ['Standard Accident Type', 'Deaths', 'Injuries', 'Rescue Time (hrs)']
+CATEGORICAL_FEATURES = ['Standard Accident Type']
+NUMERICAL_FEATURES = ['Deaths', 'Injuries', 'Rescue Time (hrs)']
 TARGET_SEVERITY = 'Severity'
+MODEL_COLUMNS = FEATURES + [TARGET_SEVERITY]
 
-# Severity classification thresholds
-CRITICAL_THRESHOLD = 75
-MID_LEVEL_THRESHOLD = 50
-LOW_LEVEL_THRESHOLD = 25
+# Hyperparameters; part of the model registry key so changing them forces a retrain
+MODEL_PARAMS = {'random_state': 42}
+TEST_SIZE = 0.2
+TRAINING_N_JOBS = -1  # Use every core; does not change the fitted model
+WARM_START_TREES = 50  # Trees added per refit when new incident rows are appended
 
+# Training over a streamed upload: on its sample in memory, or out-of-core over every row
+TRAINING_MODES = {
+    "In memory (uniform sample)": None,
+    "Out-of-core: forest on a reservoir sample, scored on every held-out row": 'forest',
+    "Out-of-core: incremental SGD over every row": 'sgd',
+}
 
-@st.cache_data
+# Session state entries that make up a persisted severity model artifact
+ARTIFACT_STATE_KEYS = ('preprocessor', 'feature_names', 'severity_model', 'severity_mae', 'severity_r2',
+                       'severity_params')
+
+
+@traced('predictive.load_data')
 def load_data(uploaded_file):
-    """Load CSV data and store original dataframe in session state."""
+    """Load the model's columns from a CSV upload through the shared cross-session cache."""
     try:
-        df = pd.read_csv(uploaded_file)
-        st.session_state.original_df = df.copy()
+        data = uploaded_file.getvalue()
+        df = frame_cache.get_or_load(
+            (content_hash(data), 'predictive'),
+            lambda: pd.read_csv(io.BytesIO(data), usecols=lambda c: c in MODEL_COLUMNS,
+                                dtype={'Standard Accident Type': 'category'}))
+        # Read-only shared frame; no per-session copy
+        st.session_state.original_df = df
         return df
     except Exception as e:
         st.error(f"Error loading data: {e}")
         return None
 
 
-def preprocess_data(df):
-    """Calculate severity, encode categorical features, and scale numericals."""
-    df = df.copy()
+@traced('predictive.stream_upload')
+def stream_upload(uploaded_file):
+    """Stream a large CSV upload in chunks: full-data statistics plus a bounded uniform sample."""
+    try:
+        def load():
+            uploaded_file.seek(0)
+            return stream_csv(uploaded_file, numeric=NUMERICAL_FEATURES, categorical=CATEGORICAL_FEATURES,
+                              required=FEATURES, usecols=lambda c: c in MODEL_COLUMNS)
+        # Hash the upload buffer in place rather than copying it with getvalue()
+        streamed = frame_cache.get_or_load((content_hash(uploaded_file.getbuffer()), 'predictive_stream'), load)
+        st.session_state.original_df = streamed.sample
+        return streamed
+    except Exception as e:
+        st.error(f"Error loading data: {e}")
+        return None
+
 
-    # Calculate severity if not present
+def with_severity(df):
+    """Return a shallow copy of df with the severity target, calculated if not present."""
+    # Copy-on-write: adding the column never touches the caller's (possibly shared) frame
+    df = df.copy(deep=False)
     if TARGET_SEVERITY not in df.columns:
         df[TARGET_SEVERITY] = df['Deaths'] + df['Injuries']
+    return df
+
+
+@traced('predictive.load_bundled_data')
+def load_bundled_data():
+    """Load the bundled preprocessed dataset from the memory-mapped columnar store."""
+    df = frame_cache.get_or_load(('bundled', 'preprocessed'), lambda: load_dataset('preprocessed', MODEL_COLUMNS))
+    st.session_state.original_df = df
+    return df
 
-    categorical_features = ['Standard Accident Type']
-    numerical_features = ['Deaths', 'Injuries', 'Rescue Time (hrs)']
 
+def build_preprocessor():
+    """Unfitted transformer: mean-impute and scale numericals, mode-impute and one-hot encode the type."""
     numeric_transformer = Pipeline([
         ('imputer', SimpleImputer(strategy='mean')),
         ('scaler', StandardScaler())
@@ -52,13 +110,31 @@ def preprocess_data(df):
         ('onehot', OneHotEncoder(handle_unknown='ignore'))
     ])
 
-    preprocessor = ColumnTransformer([
-        ('num', numeric_transformer, numerical_features),
-        ('cat', categorical_transformer, categorical_features)
+    return ColumnTransformer([
+        ('num', numeric_transformer, NUMERICAL_FEATURES),
+        ('cat', categorical_transformer, CATEGORICAL_FEATURES)
     ])
 
+
+@traced('predictive.preprocess_data')
+def preprocess_data(df, streamed=None, preprocessor=None):
+    """
+    Calculate severity, encode categorical features, and scale numericals.
+    With ``streamed`` (a streamed upload), df is its sample and the imputer/scaler
+    statistics and category set come from every row of the upload. An already fitted
+    ``preprocessor`` (the one a refreshed dataset's model was trained with) only transforms.
+    """
+    df = with_severity(df)
+
     X = df[FEATURES]
-    X_processed = preprocessor.fit_transform(X)
+    if preprocessor is not None:
+        X_processed = preprocessor.transform(X)
+    elif streamed is not None:
+        preprocessor = build_preprocessor()
+        X_processed = fit_from_statistics(preprocessor, streamed).transform(X)
+    else:
+        preprocessor = build_preprocessor()
+        X_processed = preprocessor.fit_transform(X)
 
     st.session_state.preprocessor = preprocessor
     st.session_state.feature_names = preprocessor.get_feature_names_out()
@@ -66,11 +142,13 @@ def preprocess_data(df):
     return pd.DataFrame(X_processed, columns=st.session_state.feature_names), df[TARGET_SEVERITY]
 
 
-def train_severity_model(X, y):
-    """Train Random Forest regression model and store metrics."""
-    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
+@traced('predictive.train_severity_model')
+def train_severity_model(X, y, params=None):
+    """Train Random Forest regression model on all cores and store metrics."""
+    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=TEST_SIZE, random_state=42)
 
-    model = RandomForestRegressor(random_state=42)
+    params = dict(MODEL_PARAMS, **(params or {}))
+    model = RandomForestRegressor(n_jobs=TRAINING_N_JOBS, **params)
     model.fit(X_train, y_train)
 
     y_pred = model.predict(X_test)
@@ -80,55 +158,176 @@ def train_severity_model(X, y):
     st.session_state.severity_model = model
     st.session_state.severity_mae = mae
     st.session_state.severity_r2 = r2
+    st.session_state.severity_params = params
 
 
-def classify_severity(score):
-    """Classify severity score into descriptive levels."""
-    if score >= CRITICAL_THRESHOLD:
-        return "Critical"
-    elif score >= MID_LEVEL_THRESHOLD:
-        return "Mid-Level"
-    elif score >= LOW_LEVEL_THRESHOLD:
-        return "Low-Level"
-    else:
-        return "Very Low"
+@traced('predictive.train_severity_model_out_of_core')
+def train_severity_model_out_of_core(uploaded_file, mode):
+    """Train on every row of a large upload, streamed in chunks, and store the model and metrics."""
+    def read_chunks():
+        uploaded_file.seek(0)
+        return pd.read_csv(uploaded_file, chunksize=DEFAULT_CHUNK_ROWS, usecols=lambda c: c in MODEL_COLUMNS)
 
+    result = train_out_of_core(read_chunks, build_preprocessor(), FEATURES, TARGET_SEVERITY,
+                               prepare=with_severity, mode=mode, params=MODEL_PARAMS)
+    st.session_state.preprocessor = result['preprocessor']
+    st.session_state.feature_names = result['feature_names']
+    st.session_state.severity_model = result['model']
+    st.session_state.severity_mae = result['mae']
+    st.session_state.severity_r2 = result['r2']
+    st.session_state.severity_params = result['params']
+    return result
 
-def estimate_ambulances(deaths, injuries, rescue_time):
-    """
-    Estimate ambulances needed:
-    ceil((Deaths * 0.3) + (Injuries * 0.5) + (Rescue Time (hrs) * 0.8))
-    """
-    ambulances = math.ceil((deaths * 0.3) + (injuries * 0.5) + (rescue_time * 0.8))
-    if ambulances == 0 and (deaths > 0 or injuries > 0 or rescue_time > 0):
-        ambulances = 1
-    return ambulances
 
+def out_of_core_model_key(uploaded_file, mode):
+    """Registry key for an out-of-core model: upload content hash plus training settings."""
+    params = dict(MODEL_PARAMS, features=FEATURES, out_of_core=mode, holdout_every=HOLDOUT_EVERY)
+    return model_registry.key_for_hash(content_hash(uploaded_file.getbuffer()), params)
 
-def estimate_structural_damage_cost(accident_type, deaths, injuries):
-    """
-    Estimate structural damage cost (INR) based on accident type and severity.
-    """
-    base_costs = {
-        'Bombing': 100_000_000,
-        'Fire': 70_000_000,
-        'Derailment': 50_000_000,
-        'Collision': 30_000_000,
-        'Other': 20_000_000
-    }
-    base_cost = base_costs.get(accident_type, base_costs['Other'])
-    severity_score = deaths + injuries
-
-    if severity_score >= 100:
-        multiplier = 2.0
-    elif 50 <= severity_score < 100:
-        multiplier = 1.5
-    elif 25 <= severity_score < 50:
-        multiplier = 1.2
+
+def tune_severity_model(X, y):
+    """Pick forest hyperparameters by cross-validated search, then train with them."""
+    search = search_hyperparameters(X, y)
+    train_severity_model(X, y, search['best_params'])
+    return search
+
+
+def refit_with_new_rows(df, new_rows):
+    """Grow the trained forest with extra trees instead of rebuilding it for appended rows."""
+    df, new_rows = with_severity(df), with_severity(new_rows)
+
+    # Hold out part of the new rows, which no tree has seen, to report updated metrics
+    if len(new_rows) >= 5:
+        new_train, new_test = train_test_split(new_rows, test_size=TEST_SIZE, random_state=42)
     else:
-        multiplier = 1.0
+        new_train, new_test = new_rows, new_rows.iloc[:0]
+
+    def transform(frame):
+        return pd.DataFrame(st.session_state.preprocessor.transform(frame[FEATURES]),
+                            columns=st.session_state.feature_names)
+
+    base_key = st.session_state.severity_model_key
+    forest = st.session_state.severity_model
+    if isinstance(forest, CompiledSeverityModel):
+        # Served compiled from the shared snapshot; growing it needs the fitted trees
+        artifact = model_registry.load(base_key)
+        if artifact is None:
+            raise LookupError("The trained forest is no longer in the model registry; retrain the model first.")
+        forest = artifact['severity_model']
+    train = pd.concat([df, new_train], ignore_index=True)
+    model = warm_start_refit(forest, transform(train), train[TARGET_SEVERITY], WARM_START_TREES)
+
+    if len(new_test):
+        y_pred = model.predict(transform(new_test))
+        st.session_state.severity_mae = mean_absolute_error(new_test[TARGET_SEVERITY], y_pred)
+        if len(new_test) > 1:
+            st.session_state.severity_r2 = r2_score(new_test[TARGET_SEVERITY], y_pred)
+
+    combined = pd.concat([df, new_rows], ignore_index=True)
+    st.session_state.severity_model = model
+    st.session_state.original_df = combined
+    # Keyed by its lineage: a warm-started forest is not what a full fit on the combined rows would give
+    persist_severity_model(severity_model_key(combined, warm_start_from=base_key))
+    return len(new_rows)
+
+
+def refreshable_dataset(base_key, df):
+    """The session's refreshed copy of the training data, or a new append-only one with its statistics."""
+    refreshed = st.session_state.get('refreshed_data', {}).get(base_key)
+    if refreshed is not None:
+        return refreshed
+    frame = with_severity(df)[MODEL_COLUMNS]
+    dataset = AppendOnlyDataset(frame, base_key)
+    dataset.aggregates.update(statistics=frame_statistics(frame, NUMERICAL_FEATURES, CATEGORICAL_FEATURES),
+                              preprocessor=st.session_state.preprocessor)
+    return dataset
+
+
+@traced('predictive.refresh')
+def refresh_dataset(dataset, new_rows):
+    """Fold rows not seen before into the data and its preprocessing statistics; returns (dataset, delta)."""
+    delta = dataset.diff(with_severity(new_rows))
+    if not delta:
+        return dataset, delta
+    refreshed = dataset.apply(delta)
+    refreshed.aggregates['statistics'] = dataset.aggregates['statistics'].extended(delta.added)
+    return refreshed, delta
+
+
+@traced('predictive.refit_refreshed')
+def refit_refreshed(dataset):
+    """Retrain on a refreshed dataset, with preprocessing fitted from its incrementally updated statistics."""
+    preprocessor = fit_from_statistics(build_preprocessor(), dataset.aggregates['statistics'])
+    st.session_state.preprocessor = preprocessor
+    st.session_state.feature_names = preprocessor.get_feature_names_out()
+    X = pd.DataFrame(preprocessor.transform(dataset.frame[FEATURES]), columns=st.session_state.feature_names)
+    train_severity_model(X, dataset.frame[TARGET_SEVERITY], st.session_state.get('severity_params'))
+    dataset.aggregates['preprocessor'] = preprocessor
+    # Keyed by the hyperparameters used, so a refit with tuned ones never stands in for a plain run
+    persist_severity_model(severity_model_key(dataset.frame, params=st.session_state.severity_params))
 
-    return base_cost * multiplier
+
+def severity_model_key(df, tuned=False, warm_start_from=None, params=None):
+    """
+    Registry key for the model trained on this dataset with the current hyperparameters;
+    ``warm_start_from`` is the key of the model grown by WARM_START_TREES trees to get it,
+    and ``params`` the forest's hyperparameters when they are not just MODEL_PARAMS (e.g. tuned ones).
+    """
+    columns = [c for c in FEATURES + [TARGET_SEVERITY] if c in df.columns]
+    model_params = dict(MODEL_PARAMS, **(params or {}))
+    key_params = dict(MODEL_PARAMS, test_size=TEST_SIZE, features=FEATURES)
+    if model_params != MODEL_PARAMS:
+        key_params['model_params'] = model_params
+    if tuned:
+        key_params['search_grid'] = PARAM_GRID
+    if warm_start_from is not None:
+        key_params['warm_start'] = {'base_key': warm_start_from, 'extra_trees': WARM_START_TREES}
+    return model_registry.artifact_key(df[columns], key_params)
+
+
+def restore_severity_model(key):
+    """Load a persisted artifact into session state; return False if none exists for the key."""
+    # Worker processes share the supervisor's snapshot of the model instead of each loading the forest
+    artifact = shared_artifact(key) or model_registry.load(key)
+    if artifact is None:
+        return False
+    for name in ARTIFACT_STATE_KEYS:
+        st.session_state[name] = artifact.get(name)
+    st.session_state.severity_model_key = key
+    return True
+
+
+def persist_severity_model(key):
+    """Save the session's fitted preprocessor and model so other sessions can reuse them."""
+    model_registry.save(key, {name: st.session_state[name] for name in ARTIFACT_STATE_KEYS})
+    st.session_state.severity_model_key = key
+
+
+def is_forest(model):
+    """True for random forests, including one served compiled from a shared snapshot."""
+    return hasattr(model, 'estimators_') or isinstance(model, CompiledSeverityModel)
+
+
+def compiled_severity_model():
+    """NumPy fast path for the session's model, compiled once per persisted artifact."""
+    return cached_compiled_model(st.session_state.severity_model_key,
+                                 st.session_state.preprocessor, st.session_state.severity_model)
+
+
+@traced('predictive.predict_single')
+def predict_single(accident_type, deaths, injuries, rescue_time):
+    """Severity for one incident: compiled fast path for forests, the sklearn pipeline otherwise."""
+    model = st.session_state.severity_model
+    if is_forest(model):
+        return compiled_severity_model().predict_one(accident_type, deaths, injuries, rescue_time)
+    input_df = pd.DataFrame({
+        'Standard Accident Type': [accident_type],
+        'Deaths': [deaths],
+        'Injuries': [injuries],
+        'Rescue Time (hrs)': [rescue_time]
+    })
+    X_input = st.session_state.preprocessor.transform(input_df)
+    return float(model.predict(pd.DataFrame(X_input, columns=st.session_state.feature_names))[0])
 
 
 def show():
@@ -143,23 +342,122 @@ def show():
         unsafe_allow_html=True
     )
 
-    uploaded_file = st.file_uploader("Upload your accident data CSV file", type=["csv"])
-
-    if uploaded_file is not None:
-        df = load_data(uploaded_file)
+    source = st.radio("Data source", ["Upload CSV", "Bundled dataset"], horizontal=True)
+    uploaded_file = None
+    if source == "Upload CSV":
+        uploaded_file = st.file_uploader("Upload your accident data CSV file", type=["csv"])
+
+    if source == "Bundled dataset" or uploaded_file is not None:
+        streamed = None
+        if uploaded_file is None:
+            df = load_bundled_data()
+        elif st.checkbox("Stream the upload in chunks (for very large files)",
+                         value=uploaded_file.size > STREAMING_THRESHOLD_BYTES):
+            streamed = stream_upload(uploaded_file)
+            df = streamed.sample if streamed is not None else None
+        else:
+            df = load_data(uploaded_file)
         if df is not None:
             st.subheader("Raw Data Preview")
+            if streamed is not None:
+                st.caption(f"Streamed {streamed.rows:,} rows in {streamed.chunks} chunks. Previews and training use a "
+                           f"uniform sample of {len(df):,} rows; preprocessing statistics cover every row.")
+                st.dataframe(streamed.numeric.summary())
             st.dataframe(df.head())
 
-            X_processed, y = preprocess_data(df)
+            # Rows appended by refreshes in this session stay with the upload they were added to
+            upload_key = severity_model_key(df)
+            refreshed = st.session_state.get('refreshed_data', {}).get(upload_key) if streamed is None else None
+            if refreshed is not None:
+                df = refreshed.frame
+                st.session_state.original_df = df
+                st.caption(f"Includes rows from {refreshed.refreshes} refresh(es): {len(df):,} rows in total.")
+                X_processed, y = preprocess_data(df, preprocessor=refreshed.aggregates['preprocessor'])
+            else:
+                X_processed, y = preprocess_data(df, streamed)
 
             st.subheader("Preprocessed Feature Sample")
             st.dataframe(X_processed.head())
 
+            # Restore a persisted model once per upload; later refits in this session take precedence
+            if st.session_state.get('model_source_key') != upload_key:
+                st.session_state.model_source_key = upload_key
+                if restore_severity_model(upload_key):
+                    st.info("Loaded the persisted severity model for this dataset.")
+
+            out_of_core = None
+            if streamed is not None:
+                out_of_core = TRAINING_MODES[st.radio("Training mode", list(TRAINING_MODES))]
+            tune = out_of_core is None and st.checkbox(
+                "Tune hyperparameters with cross-validated search (trees, depth, min samples)")
             if st.button("Train Severity Prediction Model"):
-                train_severity_model(X_processed, y)
+                if out_of_core:
+                    model_key = out_of_core_model_key(uploaded_file, out_of_core)
+                    if not restore_severity_model(model_key):
+                        with st.spinner(f"Training over all {streamed.rows:,} rows in chunks..."):
+                            result = train_severity_model_out_of_core(uploaded_file, out_of_core)
+                        detail = (f" (forest fitted on a {result['sample_rows']:,}-row sample)"
+                                  if out_of_core == 'forest' else "")
+                        st.write(f"Trained on {result['train_rows']:,} rows{detail}; "
+                                 f"scored on {result['holdout_rows']:,} held-out rows.")
+                        persist_severity_model(model_key)
+                else:
+                    # Only fit when no artifact exists for this data + hyperparameter hash
+                    model_key = severity_model_key(df, tuned=tune)
+                    if not restore_severity_model(model_key):
+                        if tune:
+                            with st.spinner("Searching hyperparameters across all cores..."):
+                                search = tune_severity_model(X_processed, y)
+                            st.write(f"Best parameters: {search['best_params']} (CV MAE {search['best_mae']:.2f}, "
+                                     f"{len(search['results'])} candidates evaluated"
+                                     f"{', stopped early' if search['stopped_early'] else ''})")
+                        else:
+                            train_severity_model(X_processed, y)
+                        persist_severity_model(model_key)
                 st.success(f"Severity Model Trained! MAE: {st.session_state.severity_mae:.2f}, R²: {st.session_state.severity_r2:.2f}")
 
+            # Refreshes fold only unseen rows into the data and preprocessing statistics. While the model's
+            # preprocessing still fits the data, a warm start grows the forest; otherwise a full refit is flagged.
+            # Incremental models are retrained out-of-core instead
+            if streamed is None and is_forest(st.session_state.get('severity_model')):
+                with st.expander("Append New Incident Rows (incremental refresh)"):
+                    st.caption("Upload new incident rows or the latest full export; rows already loaded are skipped.")
+                    new_file = st.file_uploader("Upload new incident rows CSV", type=["csv"], key="appended_rows")
+                    if new_file is not None and st.button("Refit With New Rows"):
+                        dataset = refreshable_dataset(upload_key, df)
+                        try:
+                            updated, delta = refresh_dataset(dataset, pd.read_csv(new_file))
+                        except (SchemaError, ValueError) as e:
+                            st.error(f"Error applying new rows: {e}")
+                        else:
+                            if not delta:
+                                st.info(f"No new rows: {delta.summary()}.")
+                            else:
+                                st.session_state.setdefault('refreshed_data', {})[upload_key] = updated
+                                if refit_reasons(updated.aggregates['preprocessor'], updated.aggregates['statistics']):
+                                    st.session_state.original_df = updated.frame
+                                    st.success(f"Added {delta.summary()}.")
+                                else:
+                                    try:
+                                        refit_with_new_rows(dataset.frame, delta.added)
+                                    except LookupError as e:
+                                        st.error(str(e))
+                                    else:
+                                        st.success(f"Added {WARM_START_TREES} trees for {delta.summary()}. "
+                                                   f"MAE: {st.session_state.severity_mae:.2f}, "
+                                                   f"R²: {st.session_state.severity_r2:.2f}")
+
+                    refreshed = st.session_state.get('refreshed_data', {}).get(upload_key)
+                    reasons = refit_reasons(refreshed.aggregates['preprocessor'],
+                                            refreshed.aggregates['statistics']) if refreshed is not None else []
+                    if reasons:
+                        st.warning("The model needs a full refit: " + "; ".join(reasons) + ".")
+                        if st.button("Refit Severity Model"):
+                            with st.spinner(f"Retraining on {len(refreshed):,} rows..."):
+                                refit_refreshed(refreshed)
+                            st.success(f"Severity model refit. MAE: {st.session_state.severity_mae:.2f}, "
+                                       f"R²: {st.session_state.severity_r2:.2f}")
+
     if ('severity_model' in st.session_state and
         'preprocessor' in st.session_state and
         'feature_names' in st.session_state and
@@ -169,6 +467,9 @@ def show():
         st.header("Make Predictions")
 
         accident_types = list(st.session_state.original_df['Standard Accident Type'].unique())
+        # A streamed upload's sample can miss rare types the preprocessor knows about
+        known_types = st.session_state.preprocessor.named_transformers_['cat'].named_steps['onehot'].categories_[0]
+        accident_types += [t for t in known_types if t not in accident_types]
         col1, col2, col3, col4 = st.columns(4)
 
         with col1:
@@ -181,19 +482,8 @@ def show():
             rescue_time = st.number_input("Rescue Time (hrs)", min_value=0, step=1)
 
         if st.button("Predict Accident Severity and Outcomes"):
-            input_df = pd.DataFrame({
-                'Standard Accident Type': [accident_type],
-                'Deaths': [deaths],
-                'Injuries': [injuries],
-                'Rescue Time (hrs)': [rescue_time]
-            })
-
-            # Preprocess input
-            X_input = st.session_state.preprocessor.transform(input_df)
-            X_input_df = pd.DataFrame(X_input, columns=st.session_state.feature_names)
-
-            # Predict severity
-            severity_pred = st.session_state.severity_model.predict(X_input_df)[0]
+            # Predict severity (compiled preprocessor + flattened forest, no DataFrame round trip)
+            severity_pred = predict_single(accident_type, deaths, injuries, rescue_time)
             severity_level = classify_severity(severity_pred)
 
             # Estimate ambulances
@@ -239,34 +529,48 @@ def show():
 
             # Ambulance estimation formula
             st.markdown("**Ambulance Estimation Formula:**")
-            st.latex(r"""\text{Estimated Ambulances} = \left\lceil 
-            (\text{Deaths} \times 0.3) + (\text{Injuries} \times 0.5) + (\text{Rescue Time (hrs)} \times 0.8)
-            \right\rceil""")
+            st.latex(RESOURCE_TABLES.ambulance_formula_latex())
 
             # Structural damage cost formula
-            st.markdown("**Structural Damage Cost:**")
-            st.markdown("""
-            **Base Cost by Accident Type:**
-
-            - Bombing: ₹1,00,00,000  
-            - Fire: ₹70,00,000  
-            - Derailment: ₹50,00,000  
-            - Collision: ₹30,00,000  
-            - Other: ₹20,00,000  
-            """)
+            st.markdown(f"**Structural Damage Cost** (resource tables v{RESOURCE_TABLES.version}):")
+            st.markdown("**Base Cost by Accident Type:**\n\n" + "  \n".join(RESOURCE_TABLES.base_cost_lines()))
 
             st.markdown("**Severity Multiplier:**")
 
-            st.markdown("""
-            - ≥ 100: ×2.0  
-            - 50–99: ×1.5  
-            - 25–49: ×1.2  
-            - < 25: ×1.0  
-            """)
+            st.markdown("  \n".join(RESOURCE_TABLES.multiplier_lines()))
 
             st.markdown("**Total Cost:**")
             st.latex(r"""\text{Estimated Cost} = \text{Base Cost} \times \text{Multiplier}""")
 
+        # Batch predictions for whole incident files
+        st.markdown("---")
+        st.header("Batch Predictions")
+        batch_file = st.file_uploader("Upload incidents to score (CSV or Parquet)", type=["csv", "parquet"],
+                                      key="batch_incidents")
+        if batch_file is not None:
+            try:
+                incidents = read_incident_file(batch_file)
+            except Exception as e:
+                st.error(f"Error loading incidents: {e}")
+                incidents = None
+
+            if incidents is not None:
+                missing = missing_columns(incidents, st.session_state.preprocessor)
+                if missing:
+                    st.error(f"Incident file is missing required columns: {', '.join(missing)}")
+                else:
+                    with span('predictive.score_batch', rows=len(incidents)):
+                        scored = score_frame(incidents, st.session_state.preprocessor,
+                                             st.session_state.feature_names, st.session_state.severity_model)
+                    st.success(f"Scored {len(scored):,} incidents.")
+                    st.dataframe(scored.head(100))
+                    st.download_button(
+                        label="Download Scored Incidents (CSV)",
+                        data=b"".join(iter_csv_chunks(scored)),
+                        file_name="scored_incidents.csv",
+                        mime="text/csv",
+                    )
+
     else:
         st.info("Upload data and train the severity model to enable predictions.")
 
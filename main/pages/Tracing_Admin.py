@@ -0,0 +1,105 @@
+import json
+import numpy as np
+import pandas as pd
+import streamlit as st
+from core import tracing
+
+# --- Constants ---
+# Rerun latency histogram bin edges (ms)
+LATENCY_BINS_MS = [0, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, np.inf]
+SLOWEST_SPANS = 25
+ROOT_SPAN = "page.rerun"
+
+
+def bin_labels(edges):
+    """'<10 ms', '10–25 ms', ..., '≥10000 ms' for histogram edges."""
+    labels = [f"{low:g}–{high:g} ms" for low, high in zip(edges[1:-2], edges[2:-1])]
+    return [f"<{edges[1]:g} ms"] + labels + [f"≥{edges[-2]:g} ms"]
+
+
+def spans_frame(spans):
+    """One row per finished span, newest last."""
+    df = pd.DataFrame([s.to_dict() for s in spans])
+    df['started'] = pd.to_datetime(df['start'], unit='ns')
+    df['attributes'] = df['attributes'].map(lambda a: ", ".join(f"{k}={v}" for k, v in a.items() if k != 'page'))
+    return df
+
+
+def latency_summary(reruns):
+    """Count and percentiles of rerun wall time per page."""
+    grouped = reruns.groupby('page')['wall_ms']
+    return pd.DataFrame({
+        'reruns': grouped.count(), 'p50 ms': grouped.quantile(0.5), 'p90 ms': grouped.quantile(0.9),
+        'p99 ms': grouped.quantile(0.99), 'max ms': grouped.max(),
+    }).sort_values('p90 ms', ascending=False)
+
+
+def latency_histogram(reruns):
+    """Rerun counts per latency bin (rows) and page (columns)."""
+    bins = pd.cut(reruns['wall_ms'], LATENCY_BINS_MS, labels=bin_labels(LATENCY_BINS_MS), right=False)
+    return pd.crosstab(bins, reruns['page']).reindex(bin_labels(LATENCY_BINS_MS), fill_value=0)
+
+
+def operation_summary(df):
+    """Per span name: calls, total/mean/p99 wall time, CPU time and the largest memory peak."""
+    grouped = df.groupby('name')
+    return pd.DataFrame({
+        'calls': grouped.size(), 'total ms': grouped['wall_ms'].sum(), 'mean ms': grouped['wall_ms'].mean(),
+        'p99 ms': grouped['wall_ms'].quantile(0.99), 'mean cpu ms': grouped['cpu_ms'].mean(),
+        'max peak MB': grouped['peak_mb'].max(),
+    }).sort_values('total ms', ascending=False)
+
+
+def show():
+    st.markdown(
+       """
+        <div style="text-align: center; color: #60A5FA;">
+            <h1>⏱️ Tracing</h1>
+        </div>
+        """,
+        unsafe_allow_html=True
+    )
+    st.write("Process-wide span tracing of page reruns and hot paths. Recording applies to every session.")
+
+    col1, col2 = st.columns(2)
+    with col1:
+        enabled = st.checkbox("Record spans", value=tracing.is_enabled())
+    with col2:
+        memory = st.checkbox("Track peak memory (tracemalloc; slows allocation-heavy code)",
+                             value=tracing.memory_tracking())
+    if enabled and (not tracing.is_enabled() or memory != tracing.memory_tracking()):
+        tracing.enable(memory=memory)
+    elif not enabled and tracing.is_enabled():
+        tracing.disable()
+    st.caption(f"Finished traces are appended to `{tracing.TRACE_FILE}` as OpenTelemetry (OTLP/JSON) lines.")
+
+    spans = tracing.finished_spans()
+    if not spans:
+        st.info("No spans recorded yet. Enable recording and use the other pages.")
+        return
+    df = spans_frame(spans)
+
+    reruns = df[df['root'] & (df['name'] == ROOT_SPAN)]
+    st.header("Rerun Latency by Page")
+    if reruns.empty:
+        st.info("No page reruns recorded yet.")
+    else:
+        st.dataframe(latency_summary(reruns).style.format("{:.1f}", subset=['p50 ms', 'p90 ms', 'p99 ms', 'max ms']))
+        st.bar_chart(latency_histogram(reruns), x_label="Rerun wall time", y_label="Reruns")
+
+    st.header("Slowest Spans")
+    slowest = df.nlargest(SLOWEST_SPANS, 'wall_ms')
+    st.dataframe(slowest[['name', 'page', 'wall_ms', 'cpu_ms', 'peak_mb', 'started', 'attributes', 'error']],
+                 hide_index=True)
+
+    st.header("By Operation")
+    st.dataframe(operation_summary(df).round(2))
+
+    col1, col2 = st.columns(2)
+    with col1:
+        st.download_button("Download Recorded Spans (OTLP JSON)", json.dumps(tracing.otlp_request(spans)),
+                           file_name="spans.json", mime="application/json")
+    with col2:
+        if st.button("Clear Recorded Spans"):
+            tracing.clear()
+            st.rerun()
@@ -1,69 +1,168 @@
+import os
+import uuid
+from collections import deque
 import pandas as pd
 import streamlit as st
 import requests
+from core.assistant_pipeline import AssistantPipeline
+from core.columnar_store import load_dataset
+from core.data_cache import frame_cache
+from core.geo_index import GeoIndex, cached_geo_index
+from core.llm_client import DEFAULT_API_URL, ChatClient, ChatError
+from core.query_engine import answer, answer_geo, cached_group_index
+from core.retrieval import cached_index
+from core.timeseries_store import TimeSeriesStore, cached_store
+from core.tracing import span
 
-def show():
-    # ✅ API Setup (For general safety queries only)
-    GROQ_API_URL = "https://api.groq.com/openai/v1/chat/completions"
-    GROQ_API_KEY = ""  # Replace with your actual API key
+# ✅ API Setup (For general safety queries only)
+GROQ_API_URL = DEFAULT_API_URL  # Override with the GROQ_API_URL environment variable (e.g. a local mock)
+GROQ_API_KEY = os.environ.get("GROQ_API_KEY", "")  # Replace with your actual API key
+
+DATASET_KEY = 'bundled:accidents_1902_2024'
+CONTEXT_TOP_K = 8
+CONTEXT_TOKEN_BUDGET = 600
+HISTORY_SIZE = 10  # Exchanges kept per session
+
+DATA_SUMMARY = "The available data on Indian railway accidents spans from 1902 to 2024. The model MUST base its answers primarily on this dataset, but can use outside information if required. Do not hallucinate data, instead respond that the data does not exist."
+
+
+# ✅ Load Railway Accident Data (once per process, shared by all sessions)
+def load_data():
+    try:
+        return frame_cache.get_or_load((DATASET_KEY, 'assistant'), lambda: load_dataset('accidents_1902_2024'))
+    except (FileNotFoundError, ImportError):
+        return None
 
-    # ✅ Load Railway Accident Data
-    @st.cache_data
-    def load_data():
-        try:
-            df = pd.read_csv("C:/Users/yashw/Desktop/6 th sem project ideas/Indian_Railways_Accidents_Dataset_1902_2024.csv")
-            return df
-        except FileNotFoundError:
-            st.error("⚠️ Railway accident dataset not found!")
-            return None
 
+def get_index():
     df = load_data()
+    return cached_index(DATASET_KEY, df) if df is not None else None
 
-    # ✅ Query Functions for Dataset
-    def get_accident_stats():
-        """Returns general statistics from the dataset."""
-        return df.describe().to_string() if df is not None else "No data available."
 
-    def get_accidents_by_cause(cause):
-        """Returns accidents related to a specific cause."""
-        if df is not None:
-            filtered_data = df[df["Cause"].str.contains(cause, case=False, na=False)]
-            return filtered_data.to_string(index=False) if not filtered_data.empty else "No records found."
-        return "No data available."
+def get_group_index():
+    df = load_data()
+    return cached_group_index(DATASET_KEY, df) if df is not None else None
+
+
+def get_trend_store():
+    df = load_data()
+    return cached_store(DATASET_KEY, lambda: TimeSeriesStore.from_accidents_1902_2024(df)) if df is not None else None
+
+
+def get_geo_index():
+    df = load_data()
+    return cached_geo_index(DATASET_KEY, 'state', lambda: GeoIndex.by_state(df)) if df is not None else None
+
+
+# ✅ Query Functions for Dataset
+def get_accident_stats():
+    """Returns general statistics from the dataset."""
+    df = load_data()
+    return df.describe().to_string() if df is not None else "No data available."
+
+
+def records_text(rows):
+    """Render indexed rows compactly, or a not-found message."""
+    return "\n".join(get_index().format_rows(rows)) if len(rows) else "No records found."
+
+
+def get_accidents_by_cause(cause):
+    """Returns accidents related to a specific cause (secondary index lookup)."""
+    index = get_index()
+    return records_text(index.rows_for_cause(cause)) if index is not None else "No data available."
 
-    def get_accidents_by_state(state):
-        """Returns accidents that occurred in a specific state."""
-        if df is not None:
-            filtered_data = df[df["State"].str.contains(state, case=False, na=False)]
-            return filtered_data.to_string(index=False) if not filtered_data.empty else "No records found."
-        return "No data available."
 
-    def get_accidents_by_year(year):
-        """Returns accidents that occurred in a specific year."""
-        if df is not None:
-            filtered_data = df[df["Year"] == int(year)]
-            return filtered_data.to_string(index=False) if not filtered_data.empty else "No records found."
+def get_accidents_by_state(state):
+    """Returns accidents that occurred in a specific state (secondary index lookup)."""
+    index = get_index()
+    return records_text(index.rows_for_state(state)) if index is not None else "No data available."
+
+
+def get_accidents_by_year(year):
+    """Returns accidents that occurred in a specific year (binary-searched range of the time-indexed store)."""
+    index, store = get_index(), get_trend_store()
+    if index is None or store is None:
         return "No data available."
+    records = store.range(int(year), int(year))
+    return "\n".join(index.format_records(records)) if len(records) else "No records found."
+
+
+# ✅ Pipeline stages
+def retrieve_context(prompt):
+    """Most relevant records for the prompt, within a token budget."""
+    index = get_index()
+    return index.context(prompt, CONTEXT_TOP_K, CONTEXT_TOKEN_BUDGET) if index is not None else ""
+
+
+def route_query(prompt):
+    """Structured answer for hotspot, proximity and aggregate questions, or None to use the LLM."""
+    geo_index = get_geo_index()
+    structured = answer_geo(prompt, geo_index) if geo_index is not None else None
+    if structured is not None:
+        return structured
+    group_index = get_group_index()
+    return answer(prompt, group_index) if group_index is not None else None
+
+
+def build_prompt(prompt, context, statistics=""):
+    # 🔹 Include a summary of the available data in the prompt
+    enhanced_prompt = f"{prompt}. {DATA_SUMMARY}"  # Augment the prompt
+
+    # 🔹 Ground the answer in the most relevant records only
+    if context:
+        enhanced_prompt += f"\n\nRelevant records from the dataset:\n{context}"
+    if statistics:
+        enhanced_prompt += f"\n\nStatistics computed from the dataset (use these exact figures):\n{statistics}"
+    return enhanced_prompt
+
+
+@st.cache_resource
+def get_chat_client():
+    """One pooled keep-alive chat client shared by all sessions."""
+    return ChatClient(GROQ_API_KEY, api_url=GROQ_API_URL)
 
-    # ✅ AI Chat Function (Updated Model)
-    def chat_with_ai(prompt):
-        # 🔹 Include a summary of the available data in the prompt
-        data_summary = f"The available data on Indian railway accidents spans from 1902 to 2024. The model MUST base its answers primarily on this dataset, but can use outside information if required. Do not hallucinate data, instead respond that the data does not exist."
-        enhanced_prompt = f"{prompt}. {data_summary}"  # Augment the prompt
-
-        headers = {"Authorization": f"Bearer {GROQ_API_KEY}", "Content-Type": "application/json"}
-        data = {
-            "model": "llama3-8b-8192",
-            "messages": [{"role": "user", "content": enhanced_prompt}],
-            "max_tokens": 750  # Increased token limit
-        }
-        response = requests.post(GROQ_API_URL, json=data, headers=headers)
+
+# ✅ AI Chat Function (Updated Model)
+def chat_with_ai(prompt, context="", client=None):
+    # 🔹 Stream tokens as they arrive; repeated questions are served from the disk cache
+    # 🔹 Traced from the request to the last token, so the span covers time to full answer
+    with span('assistant.chat_with_ai', prompt_chars=len(prompt)):
         try:
-            response_json = response.json()
-            return response_json["choices"][0]["message"]["content"] if "choices" in response_json else f"⚠️ API Error: {response_json}"
-        except Exception as e:
-            return f"⚠️ Error: {str(e)}"
+            yield from (client or get_chat_client()).stream(prompt, context)
+        except ChatError as e:
+            yield f"⚠️ {str(e)}"
+        except (requests.RequestException, ValueError) as e:
+            yield f"⚠️ Error: {str(e)}"
+
+
+@st.cache_resource
+def get_pipeline():
+    """Background asyncio pipeline shared by all sessions; cancels each session's stale queries."""
+    # Resolve the client here: pipeline stages run in worker threads without a script context
+    client = get_chat_client()
+    return AssistantPipeline(retrieve_context, route_query, build_prompt,
+                             lambda prompt, context: chat_with_ai(prompt, context, client))
+
+
+def show_structured_answer(query, structured):
+    parsed, result, summary = structured
+    st.write("### Answer:")
+    st.markdown(summary)
+    if isinstance(result, pd.DataFrame):
+        st.dataframe(result)
+    elif isinstance(result, pd.Series):
+        if parsed.group_by in ('year', 'decade'):
+            st.bar_chart(result)
+        else:
+            st.dataframe(result)
+    if st.checkbox("Add an AI narrative for this answer"):
+        tabular = isinstance(result, (pd.Series, pd.DataFrame))
+        statistics = result.to_string() if tabular else f"{parsed.describe()}: {result}"
+        return st.write_stream(chat_with_ai(build_prompt(query, "", statistics), statistics))
+    return summary
+
 
+def show():
     # ✅ Streamlit UI
     st.markdown(
        """
@@ -75,10 +174,34 @@ def show():
     )
     st.write("Ask any descriptive details about Indian railway accidents and safety measures!")
 
+    if load_data() is None:
+        st.error("⚠️ Railway accident dataset not found!")
+
+    if 'assistant_session' not in st.session_state:
+        st.session_state.assistant_session = uuid.uuid4().hex
+        st.session_state.chat_history = deque(maxlen=HISTORY_SIZE)
+
     # Chat input
     query = st.text_input("Enter your query:", "")
 
     if query:
-        ai_response = chat_with_ai(query)
-        st.write("### AI Response:")
-        st.write(ai_response)
+        # 🔹 Submitting cancels this session's previous query if it is still running
+        run = get_pipeline().submit(st.session_state.assistant_session, query)
+        structured = run.wait_routed()
+        if structured is not None:
+            response = show_structured_answer(query, structured)
+        else:
+            st.write("### AI Response:")
+            response = st.write_stream(run.iter_text())
+
+        history = st.session_state.chat_history
+        if not history or history[-1][0] != query:
+            history.append((query, response if isinstance(response, str) else "".join(map(str, response))))
+
+    # Earlier exchanges, newest first, excluding the one shown above
+    previous = list(st.session_state.chat_history)[:-1] if query else list(st.session_state.chat_history)
+    if previous:
+        with st.expander("Previous questions"):
+            for past_query, past_response in reversed(previous):
+                st.markdown(f"**Q:** {past_query}")
+                st.markdown(past_response)
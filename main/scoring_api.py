@@ -0,0 +1,308 @@
+"""Headless HTTP/JSON scoring service for the severity model.
+
+A dependency-free ASGI application that serves the artifact persisted by the
+Predictive Model page (see ``core.model_registry``). Run it next to the
+Streamlit app with any ASGI server, e.g.::
+
+    uvicorn scoring_api:app --port 8600
+
+Routes:
+    POST /score    one incident object, a list of them, or {"incidents": [...]}
+    GET  /metrics  request counts, batch sizes and p50/p99 latency (ms)
+    GET  /health   model key and readiness
+
+Requests arriving within ``RAILWAY_BATCH_WAIT_MS`` of each other are merged and
+scored in a single ``predict`` call on a thread pool of ``RAILWAY_SCORING_WORKERS``.
+To run several server processes on one shared copy of the model, start them with
+``tools/serve_workers.py --app scoring``.
+"""
+import asyncio
+import json
+import os
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from core import model_registry
+from core.scoring import OUTPUT_COLUMNS, missing_columns, score_frame
+from core.shared_snapshot import attached_snapshot, shared_artifact
+
+MAX_BATCH_SIZE = int(os.environ.get("RAILWAY_MAX_BATCH", "512"))
+BATCH_WAIT_MS = float(os.environ.get("RAILWAY_BATCH_WAIT_MS", "5"))
+SCORING_WORKERS = int(os.environ.get("RAILWAY_SCORING_WORKERS", str(min(4, os.cpu_count() or 1))))
+LATENCY_WINDOW = 10_000
+
+
+class ScoringError(ValueError):
+    """Raised for incident payloads the model cannot score."""
+
+
+class ModelUnavailableError(RuntimeError):
+    """Raised when no trained model can be loaded."""
+
+
+def load_artifact(key=None):
+    """Load the artifact named by ``key``/``RAILWAY_MODEL_KEY``, else the shared snapshot's, else the newest one."""
+    snapshot = attached_snapshot()
+    key = (key or os.environ.get("RAILWAY_MODEL_KEY") or (snapshot.model_key if snapshot is not None else None)
+           or model_registry.latest_key())
+    artifact = (shared_artifact(key) or model_registry.load(key)) if key else None
+    if artifact is None:
+        raise ModelUnavailableError("No trained severity model found; train one on the Predictive Model page first.")
+    return key, artifact
+
+
+def validate_records(artifact, records):
+    """
+    Check one request's incidents and coerce numeric fields to floats, so a bad request
+    fails on its own instead of inside a batch shared with other requests.
+    """
+    preprocessor = artifact['preprocessor']
+    required = list(preprocessor.feature_names_in_)
+    numeric = set(preprocessor.transformers_[0][2])
+    cleaned = []
+    for i, record in enumerate(records):
+        missing = [c for c in required if record.get(c) is None]
+        if missing:
+            raise ScoringError(f"Incident {i}: missing required fields: {', '.join(missing)}")
+        record = dict(record)
+        for col in required:
+            value = record[col]
+            if col in numeric:
+                try:
+                    if isinstance(value, bool):
+                        raise TypeError
+                    record[col] = float(value)
+                except (TypeError, ValueError):
+                    raise ScoringError(f"Incident {i}: {col} must be a number, got {value!r}") from None
+            elif not isinstance(value, str):
+                raise ScoringError(f"Incident {i}: {col} must be a string, got {value!r}")
+        cleaned.append(record)
+    return cleaned
+
+
+def score_records(artifact, records):
+    """Score a list of incident dicts and return one result dict per record."""
+    df = pd.DataFrame.from_records(records)
+    missing = missing_columns(df, artifact['preprocessor'])
+    if missing:
+        raise ScoringError(f"Missing required fields: {', '.join(missing)}")
+    scored = score_frame(df, artifact['preprocessor'], artifact['feature_names'], artifact['severity_model'])
+    outputs = scored[OUTPUT_COLUMNS].to_numpy(dtype=object)
+    return [
+        {'severity': float(row[0]), 'level': row[1], 'ambulances': int(row[2]), 'damage_cost': float(row[3])}
+        for row in outputs
+    ]
+
+
+class LatencyTracker:
+    """Sliding window of request latencies with percentile summaries."""
+
+    def __init__(self, window=LATENCY_WINDOW):
+        self.latencies_ms = deque(maxlen=window)
+        self.requests = 0
+        self.errors = 0
+        self.batches = 0
+        self.batched_records = 0
+
+    def observe(self, seconds):
+        self.requests += 1
+        self.latencies_ms.append(seconds * 1000.0)
+
+    def snapshot(self):
+        latencies = np.fromiter(self.latencies_ms, dtype=float)
+        p50, p99 = np.percentile(latencies, [50, 99]) if latencies.size else (0.0, 0.0)
+        return {
+            'requests': self.requests,
+            'errors': self.errors,
+            'batches': self.batches,
+            'mean_batch_size': self.batched_records / self.batches if self.batches else 0.0,
+            'latency_ms': {'p50': round(float(p50), 3), 'p99': round(float(p99), 3), 'window': int(latencies.size)},
+        }
+
+
+class MicroBatcher:
+    """Merge concurrently submitted record lists into single scoring calls."""
+
+    def __init__(self, score_fn, metrics, max_batch_size=MAX_BATCH_SIZE, wait_ms=BATCH_WAIT_MS,
+                 workers=SCORING_WORKERS):
+        self.score_fn = score_fn
+        self.metrics = metrics
+        self.max_batch_size = max_batch_size
+        self.wait = wait_ms / 1000.0
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="scoring")
+        self.queue = None
+        self.collector = None
+        self.in_flight = set()
+
+    async def submit(self, records):
+        if self.collector is None:
+            self.queue = asyncio.Queue()
+            self.collector = asyncio.create_task(self._collect())
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((records, future))
+        return await future
+
+    async def _collect(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            pending = [await self.queue.get()]
+            size = len(pending[0][0])
+            deadline = loop.time() + self.wait
+            while size < self.max_batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self.queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                pending.append(item)
+                size += len(item[0])
+            # Score without blocking collection of the next batch
+            task = asyncio.create_task(self._run_batch(pending))
+            self.in_flight.add(task)
+            task.add_done_callback(self.in_flight.discard)
+
+    async def _run_batch(self, pending):
+        records = [record for batch, _ in pending for record in batch]
+        self.metrics.batches += 1
+        self.metrics.batched_records += len(records)
+        loop = asyncio.get_running_loop()
+        try:
+            results = await loop.run_in_executor(self.executor, self.score_fn, records)
+        except Exception as e:
+            if len(pending) == 1:
+                self._settle(pending[0][1], exception=e)
+                return
+            # Score each request on its own so one bad request only fails itself
+            for batch, future in pending:
+                try:
+                    self._settle(future, await loop.run_in_executor(self.executor, self.score_fn, batch))
+                except Exception as request_error:
+                    self._settle(future, exception=request_error)
+            return
+        offset = 0
+        for batch, future in pending:
+            self._settle(future, results[offset:offset + len(batch)])
+            offset += len(batch)
+
+    @staticmethod
+    def _settle(future, result=None, exception=None):
+        if future.done():
+            return
+        if exception is not None:
+            future.set_exception(exception)
+        else:
+            future.set_result(result)
+
+
+def parse_incidents(body):
+    """Return (records, is_single) from a JSON request body."""
+    try:
+        payload = json.loads(body or b"null")
+    except json.JSONDecodeError as e:
+        raise ScoringError(f"Invalid JSON: {e}") from e
+    if isinstance(payload, dict) and 'incidents' in payload:
+        payload = payload['incidents']
+    if isinstance(payload, dict):
+        return [payload], True
+    if isinstance(payload, list) and payload and all(isinstance(item, dict) for item in payload):
+        return payload, False
+    raise ScoringError("Expected an incident object, a non-empty list of incidents, or {\"incidents\": [...]}.")
+
+
+class ScoringApp:
+    """ASGI application exposing /score, /metrics and /health."""
+
+    def __init__(self, model_key=None):
+        self.model_key = model_key
+        self.artifact = None
+        self.metrics = LatencyTracker()
+        self.batcher = MicroBatcher(self._score, self.metrics)
+
+    def _score(self, records):
+        return score_records(self.artifact, records)
+
+    def _ensure_model(self):
+        if self.artifact is None:
+            self.model_key, self.artifact = load_artifact(self.model_key)
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            await self._lifespan(receive, send)
+            return
+        if scope['type'] != 'http':
+            return
+
+        method, path = scope['method'], scope['path'].rstrip('/') or '/'
+        if path == '/metrics' and method == 'GET':
+            await self._respond(send, 200, self.metrics.snapshot())
+        elif path == '/health' and method == 'GET':
+            await self._respond(send, 200, {'model_key': self.model_key, 'ready': self.artifact is not None})
+        elif path == '/score' and method == 'POST':
+            await self._handle_score(receive, send)
+        else:
+            await self._respond(send, 404, {'error': 'Not found'})
+
+    async def _handle_score(self, receive, send):
+        start = time.perf_counter()
+        try:
+            self._ensure_model()
+            records, single = parse_incidents(await self._read_body(receive))
+            results = await self.batcher.submit(validate_records(self.artifact, records))
+            status, body = 200, results[0] if single else {'results': results}
+        except ScoringError as e:
+            self.metrics.errors += 1
+            status, body = 422, {'error': str(e)}
+        except ModelUnavailableError as e:
+            self.metrics.errors += 1
+            status, body = 503, {'error': str(e)}
+        except Exception as e:
+            self.metrics.errors += 1
+            status, body = 500, {'error': f"Scoring failed: {type(e).__name__}: {e}"}
+        self.metrics.observe(time.perf_counter() - start)
+        await self._respond(send, status, body)
+
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                try:
+                    self._ensure_model()
+                except ModelUnavailableError:
+                    pass  # Serve /health and retry loading on the first /score call
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                self.batcher.executor.shutdown(wait=False)
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    @staticmethod
+    async def _read_body(receive):
+        chunks = []
+        while True:
+            message = await receive()
+            chunks.append(message.get('body', b''))
+            if not message.get('more_body'):
+                return b"".join(chunks)
+
+    @staticmethod
+    async def _respond(send, status, payload):
+        body = json.dumps(payload).encode('utf-8')
+        await send({'type': 'http.response.start', 'status': status,
+                    'headers': [(b'content-type', b'application/json'), (b'content-length', str(len(body)).encode())]})
+        await send({'type': 'http.response.body', 'body': body})
+
+
+app = ScoringApp()
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    uvicorn.run(app, host=os.environ.get("RAILWAY_SCORING_HOST", "127.0.0.1"),
+                port=int(os.environ.get("RAILWAY_SCORING_PORT", "8600")))
@@ -0,0 +1,37 @@
+"""Shared fixtures; tests run from ``main/`` like the app, importing ``core`` and ``pages`` directly."""
+import os
+import sys
+
+import pytest
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, APP_DIR)
+
+
+@pytest.fixture
+def registry(tmp_path, monkeypatch):
+    """An empty model registry in a temporary directory."""
+    from core import model_registry
+    from core.data_cache import SharedCache
+    monkeypatch.setattr(model_registry, "REGISTRY_DIR", str(tmp_path))
+    monkeypatch.setattr(model_registry, "_loaded", SharedCache(model_registry.DEFAULT_MAX_MB * 1024 * 1024))
+    return model_registry
+
+
+@pytest.fixture(scope="session")
+def bundled_model():
+    """(frame, preprocessor, feature_names, forest) fitted on the bundled preprocessed dataset."""
+    import pandas as pd
+    from sklearn.ensemble import RandomForestRegressor
+
+    from core.columnar_store import load_dataset
+    from pages import Predictive_Model as predictive
+
+    df = predictive.with_severity(load_dataset('preprocessed', predictive.MODEL_COLUMNS))
+    preprocessor = predictive.build_preprocessor()
+    X = preprocessor.fit_transform(df[predictive.FEATURES])
+    feature_names = list(preprocessor.get_feature_names_out())
+    X = pd.DataFrame(X, columns=feature_names)
+    model = RandomForestRegressor(n_estimators=20, random_state=0, n_jobs=1)
+    model.fit(X, df[predictive.TARGET_SEVERITY])
+    return df, preprocessor, feature_names, model
@@ -0,0 +1,36 @@
+import pandas as pd
+
+from core import aggregate_cube
+from core.aggregate_cube import CUBE_DIMENSIONS, AggregateCube
+from core.columnar_store import load_dataset
+from core.eda_features import derive_features
+from pages.Insights_and_Analysis import EDA_COLUMNS
+
+
+def features():
+    return derive_features(load_dataset('train_accident_analysis', EDA_COLUMNS))
+
+
+def test_counts_match_the_rows_they_aggregate():
+    df = features()
+    cube = AggregateCube.from_frame(df)
+    for dim in CUBE_DIMENSIONS:
+        expected = df[dim].value_counts()
+        expected = expected[expected > 0]
+        pd.testing.assert_series_equal(cube.counts(dim).sort_index(), expected.sort_index(),
+                                       check_names=False, check_index_type=False)
+
+
+def test_query_memo_stays_within_the_budget_counted_in_nbytes(monkeypatch):
+    monkeypatch.setattr(aggregate_cube, "QUERY_MEMO_MIN_BYTES", 0)
+    df = features()
+    cube = AggregateCube.from_frame(df)
+    cells_bytes = int(cube.cells.memory_usage(deep=True).sum())
+    for cause in cube.values('cause'):
+        for region in cube.values('region'):
+            for dim in CUBE_DIMENSIONS:
+                cube.counts(dim, {'cause': [cause], 'region': [region]})
+                cube.casualties(dim, {'cause': [cause], 'region': [region]})
+    assert 0 < cube._memo_bytes <= cube._memo_budget
+    assert len(cube._queries) < 2 * len(CUBE_DIMENSIONS) * len(cube.values('cause')) * len(cube.values('region'))
+    assert cube.nbytes == cells_bytes + cube._memo_budget
@@ -0,0 +1,57 @@
+import threading
+
+from core.assistant_pipeline import AssistantPipeline
+
+
+def make_pipeline(stream):
+    return AssistantPipeline(retrieve=lambda query: "context", route=lambda query: None,
+                             build_prompt=lambda query, context: query, stream=stream, debounce=0)
+
+
+def test_finished_runs_are_forgotten():
+    pipeline = make_pipeline(lambda prompt, context: iter(["answer"]))
+    runs = [pipeline.submit(f"session-{i}", "How safe are trains?") for i in range(20)]
+    for run in runs:
+        assert list(run.iter_text()) == ["answer"]
+        run.future.result(timeout=5)
+    assert pipeline._runs == {}
+
+
+def test_identical_query_in_flight_is_joined():
+    release = threading.Event()
+
+    def stream(prompt, context):
+        release.wait(5)
+        yield prompt
+
+    pipeline = make_pipeline(stream)
+    first = pipeline.submit("session", "How safe are trains?")
+    assert first.future is not None
+    assert pipeline.submit("session", "how  safe are trains?") is first
+    newer = pipeline.submit("session", "Which state has the most accidents?")
+    assert newer is not first and first.cancelled.is_set()
+    release.set()
+    assert list(newer.iter_text()) == ["Which state has the most accidents?"]
+    newer.future.result(timeout=5)
+    assert pipeline._runs == {}
+
+
+def test_consumer_attaching_mid_stream_gets_the_full_text():
+    release = threading.Event()
+
+    def stream(prompt, context):
+        yield "Derailments "
+        release.wait(5)
+        yield "are the most common."
+
+    pipeline = make_pipeline(stream)
+    run = pipeline.submit("session", "What is the most common accident?")
+    first = run.iter_text()
+    assert next(first) == "Derailments "
+    # A script rerun for the same question joins the run in flight
+    again = pipeline.submit("session", "What is the most common accident?")
+    assert again is run
+    release.set()
+    assert "".join(again.iter_text()) == "Derailments are the most common."
+    assert "".join(first) == "are the most common."
+    run.future.result(timeout=5)
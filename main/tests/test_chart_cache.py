@@ -0,0 +1,25 @@
+import matplotlib
+import matplotlib.pyplot as plt
+import pytest
+
+from core.chart_cache import render_png
+
+
+def test_figures_are_closed_after_rendering():
+    before = plt.get_fignums()
+    png = render_png(lambda fig: fig.subplots().bar(['Derailment', 'Collision'], [3, 1]))
+    assert png.startswith(b'\x89PNG')
+    assert plt.get_fignums() == before
+    assert matplotlib.get_backend().lower() == 'agg'
+
+
+def test_figures_are_closed_when_drawing_fails():
+    before = plt.get_fignums()
+
+    def draw(fig):
+        fig.subplots()
+        raise ValueError("no data to plot")
+
+    with pytest.raises(ValueError):
+        render_png(draw)
+    assert plt.get_fignums() == before
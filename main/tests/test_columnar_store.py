@@ -0,0 +1,18 @@
+import os
+
+from core import columnar_store
+
+
+def test_rebuilds_replace_the_file_without_leftover_temp_files(tmp_path, monkeypatch):
+    monkeypatch.setattr(columnar_store, "COLUMNAR_DIR", str(tmp_path))
+    first = columnar_store.ingest('preprocessed')
+    second = columnar_store.ingest('preprocessed')
+    assert first == second == os.path.join(str(tmp_path), "preprocessed.arrow")
+    assert os.listdir(tmp_path) == ["preprocessed.arrow"]
+
+
+def test_columnar_load_matches_the_source(tmp_path, monkeypatch):
+    monkeypatch.setattr(columnar_store, "COLUMNAR_DIR", str(tmp_path))
+    loaded = columnar_store.load_dataset('preprocessed')
+    source = columnar_store.optimize_dtypes(columnar_store.read_source('preprocessed'))
+    assert loaded.equals(source)
@@ -0,0 +1,62 @@
+import numpy as np
+import pandas as pd
+
+from core.data_cache import SharedCache, sizeof
+
+
+def block(kb):
+    return np.zeros(kb * 1024, dtype=np.uint8)
+
+
+def test_least_recently_used_entries_are_evicted_past_the_byte_bound():
+    cache = SharedCache(3 * 1024)
+    for key in 'abc':
+        cache.put(key, block(1))
+    cache.get('a')
+    cache.put('d', block(1))
+    assert cache.get('b') is None
+    assert all(cache.get(key) is not None for key in 'acd')
+    assert cache.stats()['bytes'] == 3 * 1024
+    assert cache.stats()['evictions'] == 1
+    # Larger than the whole budget: returned but never cached
+    assert len(cache.put('e', block(4))) == 4 * 1024
+    assert cache.get('e') is None
+
+
+def test_resize_evicts_down_to_the_new_bound():
+    cache = SharedCache(4 * 1024)
+    for key in 'abcd':
+        cache.put(key, block(1))
+    cache.resize(2 * 1024)
+    assert [key for key in 'abcd' if cache.get(key) is not None] == ['c', 'd']
+    assert cache.stats()['bytes'] == 2 * 1024
+
+
+def test_hits_and_misses_are_counted():
+    cache = SharedCache(1024)
+    loads = []
+    for _ in range(3):
+        cache.get_or_load('key', lambda: loads.append(1) or block(0))
+    assert len(loads) == 1
+    stats = cache.stats()
+    assert (stats['hits'], stats['misses']) == (2, 1)
+    assert stats['hit_rate'] == 2 / 3
+
+
+def test_cached_frames_are_isolated_from_callers():
+    cache = SharedCache(1024 * 1024)
+    frame = cache.put('frame', pd.DataFrame({'Deaths': [1, 2, 3]}))
+    frame.loc[0, 'Deaths'] = 100
+    frame['Injuries'] = 0
+    assert list(cache.get('frame').columns) == ['Deaths']
+    assert cache.get('frame')['Deaths'].tolist() == [1, 2, 3]
+
+
+def test_values_without_nbytes_count_toward_the_bound():
+    rows = {f'accident-{i}': f'{i:0>100}' for i in range(100)}
+    assert sizeof(rows) > 100 * 100
+    cache = SharedCache(sizeof(rows) * 2)
+    for key in 'abc':
+        cache.put(key, rows)
+    assert cache.get('a') is None
+    assert cache.stats()['entries'] == 2
@@ -0,0 +1,28 @@
+import numpy as np
+import pandas as pd
+
+from core import fast_path
+from core.fast_path import CompiledSeverityModel
+from pages import Predictive_Model as predictive
+
+
+def test_predict_matches_sklearn_exactly(bundled_model, monkeypatch):
+    df, preprocessor, feature_names, model = bundled_model
+    X = pd.DataFrame(preprocessor.transform(df[predictive.FEATURES]), columns=feature_names)
+    compiled = CompiledSeverityModel(preprocessor, model)
+    expected = model.predict(X)
+    np.testing.assert_array_equal(compiled.predict(X), expected)
+    # Past the all-trees batch size the forest is walked tree by tree
+    monkeypatch.setattr(fast_path, "BATCH_ALL_TREES_ROWS", 0)
+    np.testing.assert_array_equal(compiled.predict(X), expected)
+
+
+def test_predict_one_matches_sklearn_exactly(bundled_model):
+    df, preprocessor, feature_names, model = bundled_model
+    compiled = CompiledSeverityModel(preprocessor, model)
+    rows = df[predictive.FEATURES].head(50)
+    rows = pd.concat([rows, pd.DataFrame([[np.nan, np.nan, 3, np.nan], ["Not a type", 1, 0, 2]],
+                                         columns=predictive.FEATURES)], ignore_index=True)
+    expected = model.predict(pd.DataFrame(preprocessor.transform(rows), columns=feature_names))
+    for row, value in zip(rows.itertuples(index=False), expected):
+        assert compiled.predict_one(*row) == value
@@ -0,0 +1,49 @@
+import pandas as pd
+
+from core.incremental import AppendOnlyDataset
+
+
+def incidents():
+    return pd.DataFrame({
+        'time': ['01-01-2020 10:00', '02-01-2020 11:00', '02-01-2020 11:00', '03-01-2020 12:00'],
+        'train_name': ['Mail', 'Express', 'Express', 'Goods'],
+        'killed': [1, 0, 0, 2],
+    })
+
+
+def test_full_export_with_a_new_tail_adds_only_the_tail():
+    df = incidents()
+    dataset = AppendOnlyDataset(df, "test")
+    tail = pd.DataFrame({'time': ['04-01-2020 09:00'], 'train_name': ['Local'], 'killed': [3]})
+    delta = dataset.diff(pd.concat([df, tail], ignore_index=True))
+    assert (delta.new, delta.unchanged, delta.changed) == (1, 4, 0)
+    assert delta.added['train_name'].tolist() == ['Local']
+    assert len(dataset.apply(delta)) == 5
+
+
+def test_identical_rows_are_compared_as_multisets():
+    df = incidents()
+    dataset = AppendOnlyDataset(df, "test")
+    # Three copies of a row stored twice, in another order, with numbers as floats: one new incident
+    upload = pd.concat([df.iloc[[1]]] * 3 + [df.iloc[[3, 0]]], ignore_index=True).astype({'killed': float})
+    delta = dataset.diff(upload)
+    assert (delta.new, delta.unchanged) == (1, 4)
+    assert delta.added['train_name'].tolist() == ['Express']
+    assert not dataset.diff(df.iloc[::-1])
+
+
+def test_keyed_rows_with_new_content_replace_the_stored_version():
+    df = incidents()
+    dataset = AppendOnlyDataset(df, "test", key=['time', 'train_name'])
+    upload = df.copy()
+    upload.loc[3, 'killed'] = 5
+    delta = dataset.diff(upload)
+    assert (delta.new, delta.changed, delta.unchanged) == (0, 1, 3)
+    assert delta.replaced.index.tolist() == [3]
+    refreshed = dataset.apply(delta)
+    assert len(refreshed) == 4
+    assert refreshed.frame.loc[refreshed.frame['train_name'] == 'Goods', 'killed'].tolist() == [5]
+    assert dataset.frame.loc[3, 'killed'] == 2
+    # Re-sending the stored version alongside the new one keeps both
+    delta = dataset.diff(pd.concat([df, upload.iloc[[3]]], ignore_index=True))
+    assert (delta.new, len(delta.replaced)) == (1, 0)
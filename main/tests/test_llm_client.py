@@ -0,0 +1,97 @@
+import json
+import os
+import time
+
+from core.llm_client import ChatClient, CompletionCache
+
+
+class FakeResponse:
+    status_code = 200
+    headers = {"Content-Type": "text/event-stream"}
+
+    def __init__(self, lines):
+        self.lines = lines
+
+    def iter_lines(self, decode_unicode=False):
+        return iter(self.lines)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+class FakeSession:
+    """Serves queued SSE bodies, one per request."""
+
+    def __init__(self, *bodies):
+        self.bodies = list(bodies)
+        self.requests = 0
+
+    def post(self, *args, **kwargs):
+        self.requests += 1
+        return FakeResponse(self.bodies.pop(0))
+
+
+def sse(*deltas, done=True):
+    lines = [f"data: {json.dumps({'choices': [{'delta': {'content': d}}]})}" for d in deltas]
+    return lines + (["data: [DONE]"] if done else [])
+
+
+def age(cache, key, seconds):
+    """Backdate an entry's stored creation time."""
+    path = cache._path(key)
+    with open(path, encoding="utf-8") as f:
+        entry = json.load(f)
+    entry["created"] -= seconds
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(entry, f)
+
+
+def test_round_trip_and_expiry_use_the_stored_creation_time(tmp_path):
+    cache = CompletionCache(str(tmp_path), ttl=60)
+    key = cache.key("m", "  What   Caused it? ", "ctx", 750)
+    assert key == cache.key("m", "what caused it?", "ctx", 750)
+    cache.put(key, "answer")
+    assert cache.get(key) == "answer"
+    age(cache, key, 120)
+    os.utime(cache._path(key))  # A fresh mtime must not keep an expired entry alive
+    assert cache.prune() == 1
+    assert cache.get(key) is None
+
+
+def test_writes_sweep_entries_that_are_never_read_again(tmp_path):
+    cache = CompletionCache(str(tmp_path), ttl=60, prune_every=0)
+    cache.put("old", "stale")
+    age(cache, "old", 120)
+    cache.put("new", "fresh")
+    assert sorted(os.listdir(tmp_path)) == ["new.json"]
+
+
+def test_prune_interval_limits_sweeps(tmp_path):
+    cache = CompletionCache(str(tmp_path), ttl=60, prune_every=3600)
+    cache.put("a", "x")  # First write sweeps
+    age(cache, "a", 120)
+    cache.put("b", "y")
+    assert os.path.exists(cache._path("a"))
+    cache._next_prune = time.monotonic()
+    cache.put("c", "z")
+    assert not os.path.exists(cache._path("a"))
+
+
+def test_streams_cut_off_before_done_are_not_cached(tmp_path):
+    session = FakeSession(sse("Derailments ", "are", done=False), sse("Derailments ", "are common."))
+    client = ChatClient("key", cache=CompletionCache(str(tmp_path)), session=session)
+    assert client.complete("Most common accident?") == "Derailments are"
+    assert client.complete("Most common accident?") == "Derailments are common."
+    assert client.complete("Most common accident?") == "Derailments are common."
+    assert session.requests == 2
+
+
+def test_max_tokens_is_part_of_the_cache_key(tmp_path):
+    cache = CompletionCache(str(tmp_path))
+    session = FakeSession(sse("Short."), sse("A longer answer."))
+    assert ChatClient("key", max_tokens=10, cache=cache, session=session).complete("Why?") == "Short."
+    assert ChatClient("key", max_tokens=750, cache=cache, session=session).complete("Why?") == "A longer answer."
+    assert session.requests == 2
@@ -0,0 +1,35 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+
+def test_artifact_key_depends_on_content_and_params(registry):
+    df = pd.DataFrame({'a': [1, 2, 3], 'b': ['x', 'y', 'z']})
+    key = registry.artifact_key(df, {'random_state': 42})
+    assert registry.artifact_key(df.copy(), {'random_state': 42}) == key
+    assert registry.artifact_key(df.assign(a=[1, 2, 4]), {'random_state': 42}) != key
+    assert registry.artifact_key(df, {'random_state': 7}) != key
+
+
+def test_save_then_load_round_trips_and_tracks_latest(registry):
+    assert registry.latest_key() is None
+    assert registry.load("missing") is None
+    registry.save("k1", {'weights': np.arange(10.0)})
+    registry._loaded.clear()
+    loaded = registry.load("k1")
+    np.testing.assert_array_equal(loaded['weights'], np.arange(10.0))
+    assert registry.latest_key() == "k1"
+    assert [name for name in os.listdir(registry.REGISTRY_DIR) if name.endswith(".tmp")] == []
+
+
+def test_loaded_artifacts_are_bounded_by_size(registry):
+    for key in ("k1", "k2"):
+        registry.save(key, {'weights': np.zeros(1024)})
+    size = os.path.getsize(registry.artifact_path("k1"))
+    registry._loaded.resize(size)
+    stats = registry._loaded.stats()
+    assert (stats['entries'], stats['bytes']) == (1, size)
+    # Evicted artifacts are mapped back in from disk
+    np.testing.assert_array_equal(registry.load("k1")['weights'], np.zeros(1024))
+    assert registry._loaded.stats()['entries'] == 1
@@ -0,0 +1,38 @@
+import pytest
+
+from core.fast_path import CompiledSeverityModel
+from pages import Predictive_Model as predictive
+
+
+def test_warm_started_model_is_keyed_apart_from_a_full_fit(bundled_model):
+    df = bundled_model[0]
+    full = predictive.severity_model_key(df)
+    grown = predictive.severity_model_key(df, warm_start_from="base")
+    assert grown != full
+    assert grown != predictive.severity_model_key(df, warm_start_from="other-base")
+
+
+def test_refit_of_a_shared_model_missing_from_the_registry_raises_lookup_error(registry, bundled_model):
+    df, preprocessor, feature_names, model = bundled_model
+    state = predictive.st.session_state
+    state.preprocessor, state.feature_names = preprocessor, feature_names
+    state.severity_model = CompiledSeverityModel(preprocessor, model)
+    state.severity_model_key = "not-in-registry"
+    with pytest.raises(LookupError):
+        predictive.refit_with_new_rows(df, df.head(10))
+
+
+def test_refit_with_tuned_params_is_keyed_by_them(registry, bundled_model):
+    df, preprocessor, feature_names, _ = bundled_model
+    state = predictive.st.session_state
+    state.preprocessor, state.feature_names = preprocessor, feature_names
+    state.refreshed_data = {}
+    dataset = predictive.refreshable_dataset("base", df)
+    state.severity_params = dict(predictive.MODEL_PARAMS, n_estimators=10, max_depth=4)
+    predictive.refit_refreshed(dataset)
+    assert state.severity_model.n_estimators == 10
+    assert state.severity_model_key == predictive.severity_model_key(dataset.frame, params=state.severity_params)
+    assert state.severity_model_key != predictive.severity_model_key(dataset.frame)
+    assert registry.load(predictive.severity_model_key(dataset.frame)) is None
+    # Default hyperparameters keep the key of a plain training run
+    assert predictive.severity_model_key(df, params=dict(predictive.MODEL_PARAMS)) == predictive.severity_model_key(df)
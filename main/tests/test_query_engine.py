@@ -0,0 +1,68 @@
+import pytest
+
+from core.columnar_store import load_dataset
+from core.geo_index import GeoIndex
+from core.query_engine import GroupByIndex, answer, answer_geo, parse_question
+
+
+@pytest.fixture(scope="module")
+def index():
+    return GroupByIndex(load_dataset('accidents_1902_2024'))
+
+
+@pytest.mark.parametrize("question", [
+    "What was the cause of the 1981 Bihar train disaster?",
+    "Describe accidents in Bihar",
+    "How many people died in the Coromandel Express accident?",
+    "How many accidents happened in 1981 and 1995?",
+    "How many accidents in Bihar and Assam?",
+])
+def test_narrative_and_partly_parsed_questions_go_to_the_llm(index, question):
+    assert parse_question(question, index) is None
+    assert answer(question, index) is None
+
+
+def test_type_verbs_filter_on_the_accident_type(index):
+    query = parse_question("How many trains derailed in India?", index)
+    assert query.filters == {'Standard Accident Type': 'Derailment'}
+    query = parse_question("How many trains collided in 2010?", index)
+    assert query.filters == {'Standard Accident Type': 'Collision'}
+    assert query.year_range == (2010, 2010)
+
+
+def test_bare_years_and_entities_are_used(index):
+    query, result, _ = answer("How many accidents in Bihar in 1981?", index)
+    assert query.filters == {'State': 'Bihar'}
+    assert query.year_range == (1981, 1981)
+    df = load_dataset('accidents_1902_2024')
+    assert result == ((df['State'] == 'Bihar') & (df['Year'] == 1981)).sum()
+
+
+@pytest.fixture(scope="module")
+def geo_index():
+    return GeoIndex.by_state(load_dataset('accidents_1902_2024'))
+
+
+def test_hotspot_questions_rank_places(geo_index):
+    query, result, _ = answer_geo("What are the top 3 accident hotspots by deaths?", geo_index)
+    assert (query.top_n, query.by) == (3, 'killed')
+    df = load_dataset('accidents_1902_2024')
+    expected = df.groupby('State', observed=True)['Deaths'].sum().sort_values(ascending=False, kind='stable')
+    assert list(result.index) == list(expected.index[:3])
+
+
+def test_proximity_questions_use_the_radius(geo_index):
+    query, result, _ = answer_geo("How many accidents within 200 km of Delhi?", geo_index)
+    assert (query.place, query.radius_km) == ('Delhi', 200)
+    assert result.index[0] == 'Delhi'
+    assert (result['distance_km'] <= 200).all()
+
+
+@pytest.mark.parametrize("question", [
+    "How many accidents near Howrah station?",
+    "Accident hotspots in the 1990s",
+    "Derailment hotspots",
+    "Which state had the most accidents?",
+])
+def test_other_questions_are_not_place_questions(geo_index, question):
+    assert answer_geo(question, geo_index) is None
@@ -0,0 +1,27 @@
+import math
+import re
+
+import numpy as np
+
+from core.resource_tables import ResourceTables
+
+
+def test_displayed_ambulance_formula_gives_the_estimates():
+    tables = ResourceTables.load()
+    latex = tables.ambulance_formula_latex()
+    weights = [int(w) for w in re.findall(r"(\d+)\\,\\text", latex)]
+    scale = int(re.search(r"\}\{(\d+)\}", latex).group(1))
+    incidents = [(1, 1, 14), (0, 0, 0), (12, 40, 6), (3, 0, 1)]
+    for incident in incidents:
+        shown = math.ceil(sum(w * v for w, v in zip(weights, incident)) / scale)
+        assert tables.ambulances(*incident) == shown
+    np.testing.assert_array_equal(tables.ambulances_batch(*np.array(incidents).T),
+                                  [tables.ambulances(*incident) for incident in incidents])
+
+
+def test_formula_follows_the_configured_weights():
+    config = ResourceTables.load().config
+    config = dict(config, ambulances=dict(config['ambulances'], weights={'deaths': 0.4, 'injuries': 0.5,
+                                                                        'rescue_time': 1.1}))
+    latex = ResourceTables(config).ambulance_formula_latex()
+    assert r"4\,\text{Deaths} + 5\,\text{Injuries} + 11\,\text{Rescue Time (hrs)}" in latex
@@ -0,0 +1,67 @@
+import asyncio
+import json
+
+import pytest
+
+import scoring_api
+
+COMPLETE = {'Standard Accident Type': 'Derailment', 'Deaths': 3, 'Injuries': 10, 'Rescue Time (hrs)': 4}
+
+
+@pytest.fixture
+def app(bundled_model):
+    _, preprocessor, feature_names, model = bundled_model
+    app = scoring_api.ScoringApp(model_key="test")
+    app.artifact = {'preprocessor': preprocessor, 'feature_names': feature_names, 'severity_model': model}
+    app.batcher.wait = 0.05  # Long enough for concurrent requests to share a batch
+    return app
+
+
+async def post(app, payload):
+    """(status, body) of POST /score with a JSON payload."""
+    sent = []
+
+    async def receive():
+        return {'type': 'http.request', 'body': json.dumps(payload).encode(), 'more_body': False}
+
+    async def send(message):
+        sent.append(message)
+
+    await app({'type': 'http', 'method': 'POST', 'path': '/score'}, receive, send)
+    return sent[0]['status'], json.loads(sent[1]['body'])
+
+
+async def post_together(app, *payloads):
+    return await asyncio.gather(*(post(app, payload) for payload in payloads))
+
+
+def test_missing_field_fails_alone_or_co_batched(app):
+    incomplete = {k: v for k, v in COMPLETE.items() if k != 'Deaths'}
+    (ok_status, _), (bad_status, bad) = asyncio.run(post_together(app, COMPLETE, incomplete))
+    assert ok_status == 200
+    assert bad_status == 422 and "Deaths" in bad['error']
+    status, _ = asyncio.run(post(app, [COMPLETE, incomplete]))
+    assert status == 422
+
+
+def test_bad_value_is_a_client_error_and_others_still_score(app):
+    (bad_status, bad), (ok_status, ok) = asyncio.run(post_together(app, dict(COMPLETE, Deaths="abc"), COMPLETE))
+    assert bad_status == 422 and "Deaths" in bad['error']
+    assert ok_status == 200 and ok['severity'] >= 0
+    assert app.metrics.snapshot()['errors'] == 1
+
+
+def test_batch_failure_is_rescored_per_request(app, monkeypatch):
+    score = scoring_api.score_records
+
+    def flaky(artifact, records):
+        if any(r['Deaths'] == 13 for r in records):
+            raise MemoryError("boom")
+        return score(artifact, records)
+
+    monkeypatch.setattr(scoring_api, "score_records", flaky)
+    (ok_status, _), (bad_status, bad) = asyncio.run(post_together(app, COMPLETE, dict(COMPLETE, Deaths=13)))
+    assert ok_status == 200
+    assert bad_status == 500 and "MemoryError" in bad['error']
+    snapshot = app.metrics.snapshot()
+    assert snapshot['errors'] == 1 and snapshot['latency_ms']['window'] == 2
@@ -0,0 +1,41 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from core import shared_snapshot
+from core.columnar_store import DATASETS, load_dataset
+from core.eda_features import derive_features
+from core.shared_snapshot import SNAPSHOT_ENV, Snapshot, publish
+from pages import Insights_and_Analysis as insights
+from pages import Predictive_Model as predictive
+
+
+@pytest.fixture(scope="module")
+def snapshot(tmp_path_factory):
+    return Snapshot(publish(str(tmp_path_factory.mktemp("snapshot")), {name: load_dataset(name) for name in DATASETS}))
+
+
+@pytest.mark.parametrize("name", list(DATASETS))
+def test_in_place_writes_copy_instead_of_touching_the_mapping(snapshot, name):
+    expected = load_dataset(name)
+    df = snapshot.frame(name)
+    # Copied, as the comparison expects in-memory arrays rather than memory maps
+    pd.testing.assert_frame_equal(df.copy(), expected, check_dtype=False, check_categorical=False)
+    for col in df.columns:
+        df.loc[0, col] = df[col].iloc[1]
+    df.fillna({col: df[col].iloc[1] for col in df.columns}, inplace=True)
+    for col in df.select_dtypes('number').columns:
+        df[col] *= 2
+    # The mapped data, and so every other frame over it, is unchanged
+    pd.testing.assert_frame_equal(snapshot.frame(name).copy(), expected, check_dtype=False, check_categorical=False)
+
+
+def test_page_transforms_match_on_shared_frames(snapshot, monkeypatch):
+    eda = derive_features(load_dataset('train_accident_analysis', insights.EDA_COLUMNS))
+    model_input = predictive.preprocess_data(load_dataset('preprocessed', predictive.MODEL_COLUMNS))[0]
+    monkeypatch.setenv(SNAPSHOT_ENV, snapshot.path)
+    monkeypatch.setattr(shared_snapshot, "_attached", None)
+    pd.testing.assert_frame_equal(derive_features(load_dataset('train_accident_analysis', insights.EDA_COLUMNS)),
+                                  eda, check_dtype=False, check_categorical=False)
+    shared_input = predictive.preprocess_data(load_dataset('preprocessed', predictive.MODEL_COLUMNS))[0]
+    np.testing.assert_array_equal(np.asarray(shared_input), np.asarray(model_input))
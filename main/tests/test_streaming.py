@@ -0,0 +1,39 @@
+import numpy as np
+
+from core.columnar_store import load_dataset
+from core.streaming import fit_from_statistics, stream_csv
+from pages import Predictive_Model as predictive
+
+
+def upload(tmp_path):
+    """The bundled preprocessed dataset with some values missing, written as a CSV upload."""
+    df = load_dataset('preprocessed', predictive.FEATURES).copy()
+    rng = np.random.default_rng(0)
+    for col in predictive.FEATURES:
+        df.loc[rng.random(len(df)) < 0.1, col] = np.nan
+    path = tmp_path / "upload.csv"
+    df.to_csv(path, index=False)
+    return df, path
+
+
+def test_running_statistics_match_the_full_data(tmp_path):
+    df, path = upload(tmp_path)
+    streamed = stream_csv(path, numeric=predictive.NUMERICAL_FEATURES,
+                          categorical=predictive.CATEGORICAL_FEATURES, chunk_rows=37, sample_rows=20)
+    stats = streamed.numeric
+    full = df[predictive.NUMERICAL_FEATURES]
+    np.testing.assert_allclose(stats.mean, full.mean())
+    np.testing.assert_allclose(stats.variance, full.var(ddof=0))
+    np.testing.assert_array_equal(stats.missing, full.isna().sum())
+
+
+def test_fit_from_statistics_matches_a_full_fit(tmp_path):
+    df, path = upload(tmp_path)
+    # Chunks and a sample much smaller than the data: only the statistics see every row
+    streamed = stream_csv(path, numeric=predictive.NUMERICAL_FEATURES,
+                          categorical=predictive.CATEGORICAL_FEATURES, chunk_rows=37, sample_rows=20)
+    from_statistics = fit_from_statistics(predictive.build_preprocessor(), streamed)
+    full = predictive.build_preprocessor().fit(df[predictive.FEATURES])
+    assert list(from_statistics.get_feature_names_out()) == list(full.get_feature_names_out())
+    np.testing.assert_allclose(from_statistics.transform(df[predictive.FEATURES]),
+                               full.transform(df[predictive.FEATURES]), atol=1e-12)
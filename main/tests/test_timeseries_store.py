@@ -0,0 +1,63 @@
+import pandas as pd
+
+from core.columnar_store import load_dataset
+from core.eda_features import derive_features
+from core.incremental import AppendOnlyDataset
+from core.timeseries_store import TimeSeriesStore
+from pages import Insights_and_Analysis as insights
+from pages import llama_Assitant as assistant
+
+
+def assert_same_store(store, expected):
+    assert len(store) == len(expected)
+    for granularity in ('year', 'month', 'season'):
+        pd.testing.assert_frame_equal(store.rollup(granularity), expected.rollup(granularity), check_dtype=False)
+    assert store.totals() == expected.totals()
+
+
+def test_year_ranges_match_a_scan():
+    df = load_dataset('accidents_1902_2024')
+    store = TimeSeriesStore.from_accidents_1902_2024(df)
+    for start, end in [(1981, 1981), (1990, 1999), (2010, 2024)]:
+        rows = df[df['Year'].between(start, end)]
+        assert len(store.range(start, end)) == len(rows)
+        totals = store.totals(start, end)
+        assert totals['accidents'] == len(rows)
+        assert totals['killed'] == rows['Deaths'].sum()
+
+
+def test_appends_match_a_full_build():
+    df = load_dataset('accidents_1902_2024')
+    full = TimeSeriesStore.from_accidents_1902_2024(df)
+    early, late = df[df['Year'] < 2000], df[df['Year'] >= 2000]
+    # In order (later rows continue the prefix sums) and out of order (merged by a sort)
+    for first, second in [(early, late), (late, early)]:
+        store = TimeSeriesStore.from_accidents_1902_2024(first)
+        before = store.totals()
+        copy = store.copy()
+        copy.append(TimeSeriesStore.from_accidents_1902_2024(second).frame)
+        assert_same_store(copy, full)
+        assert store.totals() == before
+
+
+def test_eda_refresh_appends_to_the_trend_store():
+    df = load_dataset('train_accident_analysis', insights.EDA_COLUMNS)
+    old, new = df.iloc[:-40], df.iloc[-40:]
+    features = derive_features(old)
+    trends = TimeSeriesStore.from_train_accident_analysis(features[insights.EDA_TREND_COLUMNS])
+    dataset = AppendOnlyDataset(old, "test", key=insights.EDA_KEY_COLUMNS)
+    dataset.aggregates.update(features=features, cube=insights.AggregateCube.from_frame(features),
+                              zones=insights.GeoIndex.by_zone_code(features), trends=trends)
+    before = trends.totals()
+    refreshed, delta = insights.refresh_eda_data(dataset, df)
+    assert len(delta.added) == len(new)
+    expected = TimeSeriesStore.from_train_accident_analysis(derive_features(df)[insights.EDA_TREND_COLUMNS])
+    assert_same_store(refreshed.aggregates['trends'], expected)
+    assert trends.totals() == before
+
+
+def test_assistant_year_lookup_uses_the_store():
+    df = load_dataset('accidents_1902_2024')
+    lines = assistant.get_accidents_by_year(1998).splitlines()
+    assert len(lines) == (df['Year'] == 1998).sum()
+    assert assistant.get_accidents_by_year(1850) == "No records found."
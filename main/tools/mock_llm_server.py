@@ -0,0 +1,86 @@
+"""Local mock of an OpenAI-compatible chat completions endpoint.
+
+    python tools/mock_llm_server.py --port 8700 [--delay-ms 20] [--fail-first 1]
+    GROQ_API_URL=http://127.0.0.1:8700/v1/chat/completions streamlit run main.py
+
+Replies echo the start of the prompt word by word, streamed as server-sent
+events when the request sets ``"stream": true``. ``--fail-first N`` answers the
+first N requests with HTTP 503 to exercise client retries.
+"""
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+def make_handler(delay_ms=0, fail_first=0):
+    state = {"requests": 0}
+    lock = threading.Lock()
+
+    class MockChatHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"  # keep-alive, like the real API
+
+        def log_message(self, format, *args):
+            pass
+
+        def do_POST(self):
+            body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+            with lock:
+                state["requests"] += 1
+                failing = state["requests"] <= fail_first
+            if failing:
+                self._send_json(503, {"error": {"message": "mock overload"}})
+                return
+
+            prompt = body.get("messages", [{}])[-1].get("content", "")
+            words = ["Mock", "answer:"] + prompt.split()[:20]
+            if body.get("stream"):
+                self._stream(words, body.get("model"))
+            else:
+                self._send_json(200, {"choices": [{"message": {"role": "assistant", "content": " ".join(words)}}]})
+
+        def _stream(self, words, model):
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.send_header("Transfer-Encoding", "chunked")
+            self.end_headers()
+            for i, word in enumerate(words):
+                chunk = {"model": model, "choices": [{"delta": {"content": word if i == 0 else " " + word}}]}
+                self._write_chunk(f"data: {json.dumps(chunk)}\n\n")
+                time.sleep(delay_ms / 1000.0)
+            self._write_chunk("data: [DONE]\n\n")
+            self.wfile.write(b"0\r\n\r\n")
+
+        def _write_chunk(self, text):
+            data = text.encode("utf-8")
+            self.wfile.write(f"{len(data):X}\r\n".encode() + data + b"\r\n")
+            self.wfile.flush()
+
+        def _send_json(self, status, payload):
+            data = json.dumps(payload).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+    return MockChatHandler
+
+
+def serve(port=8700, delay_ms=0, fail_first=0):
+    """Start the mock server in a daemon thread and return it (call ``shutdown()`` to stop)."""
+    server = ThreadingHTTPServer(("127.0.0.1", port), make_handler(delay_ms, fail_first))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=8700)
+    parser.add_argument("--delay-ms", type=float, default=0)
+    parser.add_argument("--fail-first", type=int, default=0)
+    args = parser.parse_args()
+    server = ThreadingHTTPServer(("127.0.0.1", args.port), make_handler(args.delay_ms, args.fail_first))
+    print(f"Mock chat completions at http://127.0.0.1:{args.port}/v1/chat/completions")
+    server.serve_forever()
@@ -0,0 +1,124 @@
+"""Import-time and first-render profile of the Streamlit app.
+
+Each measurement runs in a fresh interpreter, so numbers reflect a cold process:
+
+    python tools/profile_startup.py                 # report
+    python tools/profile_startup.py --budget-ms 1500 --json profile.json
+
+Reports the cold start (what ``main.py`` imports before routing), each page's
+import cost and first ``show()`` render in bare mode, and the slowest modules
+from ``python -X importtime``. Exits non-zero if the cold start exceeds the budget.
+"""
+import argparse
+import ast
+import json
+import os
+import subprocess
+import sys
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, APP_DIR)
+
+from navigation import PAGES  # noqa: E402
+
+
+def main_imports():
+    """Modules ``main.py`` imports at top level, i.e. before it routes to a page."""
+    with open(os.path.join(APP_DIR, "main.py")) as f:
+        tree = ast.parse(f.read())
+    names = []
+    for node in tree.body:
+        if isinstance(node, ast.Import):
+            names.extend(alias.name for alias in node.names)
+        elif isinstance(node, ast.ImportFrom) and node.level == 0:
+            names.append(node.module)
+    return list(dict.fromkeys(names))
+
+
+COLD_START_IMPORTS = main_imports()
+
+MEASURE_SNIPPET = """
+import json, logging, sys, time
+logging.disable(logging.WARNING)
+sys.path.insert(0, {app_dir!r})
+t0 = time.perf_counter()
+for name in {imports!r}:
+    __import__(name)
+t1 = time.perf_counter()
+render_ms = None
+if {module!r}:
+    import importlib
+    page = importlib.import_module({module!r})
+    t2 = time.perf_counter()
+    page.show()
+    render_ms = (time.perf_counter() - t2) * 1000
+    # Page cost excludes the cold start imports measured separately
+    t0, t1 = t1, t2
+print(json.dumps({{"import_ms": (t1 - t0) * 1000, "render_ms": render_ms}}))
+"""
+
+
+def run_measurement(imports, module=None):
+    """Run one cold interpreter; return (timings, {module: cumulative import ms})."""
+    code = MEASURE_SNIPPET.format(app_dir=APP_DIR, imports=imports, module=module)
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", code], cwd=APP_DIR,
+                            capture_output=True, text=True, check=True)
+    timings = json.loads(result.stdout.strip().splitlines()[-1])
+    return timings, parse_importtime(result.stderr)
+
+
+def parse_importtime(stderr):
+    """Top-level packages from ``-X importtime`` output as {name: cumulative ms}."""
+    cumulative = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line or "cumulative" in line:
+            continue
+        _, cumulative_us, name = (part.strip() for part in line[len("import time:"):].split("|"))
+        root = name.split(".")[0]
+        # Nested imports are indented; the root entry carries the full cumulative cost
+        if name == root:
+            cumulative[root] = max(cumulative.get(root, 0), int(cumulative_us) / 1000)
+    return cumulative
+
+
+def slowest(modules, exclude=(), top=5):
+    """The ``top`` slowest (name, ms) pairs, skipping modules in ``exclude``."""
+    ranked = sorted(modules.items(), key=lambda item: item[1], reverse=True)
+    return [(name, ms) for name, ms in ranked if name not in exclude][:top]
+
+
+def build_report():
+    cold, cold_modules = run_measurement(COLD_START_IMPORTS)
+    pages = {}
+    for label, module in PAGES.items():
+        timings, modules = run_measurement(COLD_START_IMPORTS, module)
+        # Only what the page adds on top of the cold start
+        pages[label] = dict(timings, slowest_imports=slowest(modules, exclude=cold_modules))
+    return {"cold_start_ms": cold["import_ms"], "cold_start_slowest_imports": slowest(cold_modules), "pages": pages}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--budget-ms", type=float, default=None, help="fail if cold start exceeds this")
+    parser.add_argument("--json", dest="json_path", help="also write the report to this file")
+    args = parser.parse_args()
+
+    report = build_report()
+    print(f"Cold start (before routing): {report['cold_start_ms']:.0f} ms")
+    for name, ms in report["cold_start_slowest_imports"]:
+        print(f"    {name:<28}{ms:>8.0f} ms")
+    print(f"\n{'Page':<24}{'import':>10}{'first render':>14}   slowest imports")
+    for label, page in report["pages"].items():
+        slowest = ", ".join(f"{name} {ms:.0f}" for name, ms in page["slowest_imports"][:3])
+        print(f"{label:<24}{page['import_ms']:>8.0f}ms{page['render_ms']:>12.0f}ms   {slowest}")
+
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump(report, f, indent=2)
+    if args.budget_ms is not None and report["cold_start_ms"] > args.budget_ms:
+        print(f"\nCold start exceeds the {args.budget_ms:.0f} ms budget.")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+"""Run several app processes on one shared copy of the datasets and the severity model.
+
+The supervisor loads the bundled datasets and the fitted severity model once,
+publishes them as a read-only snapshot (see ``core.shared_snapshot``) and starts
+worker processes that memory-map it. It restarts workers that exit and reports
+their memory. Put a load balancer in front of the worker ports (with sticky
+sessions for Streamlit, whose sessions live in one process):
+
+    python tools/serve_workers.py --workers 4                        # Streamlit on ports 8501-8504
+    python tools/serve_workers.py --workers 4 --app scoring --port 8600
+    python tools/serve_workers.py --workers 4 --model-key <key> --report-every 60
+
+Memory is reported per worker as RSS, PSS (shared pages divided among the processes
+mapping them) and private bytes. Snapshot pages count towards the RSS of every worker
+that touched them but only once towards the total PSS, so each added worker costs
+its private memory.
+"""
+import argparse
+import logging
+import os
+import shutil
+import signal
+import subprocess
+import sys
+import threading
+import time
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, APP_DIR)
+logging.disable(logging.WARNING)
+
+from core import model_registry  # noqa: E402
+from core.columnar_store import DATASETS, load_dataset  # noqa: E402
+from core.shared_snapshot import SNAPSHOT_ENV, Snapshot, publish  # noqa: E402
+
+SNAPSHOT_DIR = os.path.join(APP_DIR, "shared_snapshot")
+DEFAULT_PORTS = {'streamlit': 8501, 'scoring': 8600}
+RESTART_DELAY_S = 5  # Minimum time between starts of one worker, so a crashing worker does not spin
+STOP_TIMEOUT_S = 10
+
+_stopping = threading.Event()
+
+
+def worker_command(app, port):
+    """(command, extra environment) starting one ``app`` worker on ``port``."""
+    if app == 'streamlit':
+        return ([sys.executable, "-m", "streamlit", "run", "main.py", "--server.port", str(port),
+                 "--server.headless", "true"], {})
+    return [sys.executable, "scoring_api.py"], {"RAILWAY_SCORING_PORT": str(port)}
+
+
+def process_memory(pid):
+    """{'rss', 'pss', 'private'} bytes of a process from /proc (Linux), or None when unavailable."""
+    memory = {'rss': 0, 'pss': 0, 'private': 0}
+    fields = {'Rss:': 'rss', 'Pss:': 'pss', 'Private_Clean:': 'private', 'Private_Dirty:': 'private'}
+    try:
+        with open(f"/proc/{pid}/smaps_rollup", encoding="ascii") as f:
+            for line in f:
+                name, value, *_ = line.split()
+                if name in fields:
+                    memory[fields[name]] += int(value) * 1024
+    except (OSError, ValueError):
+        return None
+    return memory
+
+
+def memory_report(workers):
+    """One line per worker plus the total; PSS adds up to the memory the workers actually use."""
+    lines = [f"{'port':>6} {'pid':>8} {'RSS MB':>9} {'PSS MB':>9} {'private MB':>11}"]
+    total = 0
+    for port, (process, _) in sorted(workers.items()):
+        memory = process_memory(process.pid)
+        if memory is None:
+            lines.append(f"{port:>6} {process.pid:>8}  (memory not available)")
+            continue
+        total += memory['pss']
+        lines.append(f"{port:>6} {process.pid:>8} {memory['rss'] / 2 ** 20:>9.1f} {memory['pss'] / 2 ** 20:>9.1f} "
+                     f"{memory['private'] / 2 ** 20:>11.1f}")
+    lines.append(f"total PSS {total / 2 ** 20:.1f} MB")
+    return "\n".join(lines)
+
+
+def publish_snapshot(directory, model_key):
+    """Load every bundled dataset and the model once and publish them; returns the snapshot path."""
+    key = model_key or os.environ.get("RAILWAY_MODEL_KEY") or model_registry.latest_key()
+    artifact = model_registry.load(key) if key else None
+    if artifact is None:
+        print("No trained severity model found; workers share the datasets only.")
+        key = None
+    frames = {name: load_dataset(name) for name in DATASETS}
+    return publish(directory, frames, key, artifact)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--app", choices=list(DEFAULT_PORTS), default='streamlit')
+    parser.add_argument("--port", type=int, help="first worker port (default: 8501 for streamlit, 8600 for scoring)")
+    parser.add_argument("--model-key", help="registry key of the model to share (default: RAILWAY_MODEL_KEY or newest)")
+    parser.add_argument("--snapshot-dir", default=SNAPSHOT_DIR)
+    parser.add_argument("--report-every", type=float, default=60, help="seconds between memory reports (0: never)")
+    args = parser.parse_args()
+
+    path = publish_snapshot(args.snapshot_dir, args.model_key)
+    snapshot = Snapshot(path)
+    print(f"Published {path} ({snapshot.nbytes / 2 ** 20:.1f} MB): datasets {', '.join(snapshot.datasets)}; "
+          f"model {snapshot.model_key or 'none'}")
+
+    env = dict(os.environ, **{SNAPSHOT_ENV: path})
+    first_port = args.port or DEFAULT_PORTS[args.app]
+
+    def start(port):
+        command, extra = worker_command(args.app, port)
+        return subprocess.Popen(command, cwd=APP_DIR, env=dict(env, **extra)), time.monotonic()
+
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(sig, lambda *_: _stopping.set())
+
+    workers = {port: start(port) for port in range(first_port, first_port + args.workers)}
+    print(f"Started {args.workers} {args.app} workers on ports {first_port}-{first_port + args.workers - 1}.")
+    next_report = time.monotonic() + args.report_every
+    try:
+        while not _stopping.wait(1):
+            for port, (process, started) in list(workers.items()):
+                if process.poll() is not None and time.monotonic() - started >= RESTART_DELAY_S:
+                    print(f"Worker on port {port} exited with code {process.returncode}; restarting.")
+                    workers[port] = start(port)
+            if args.report_every and time.monotonic() >= next_report:
+                print(memory_report(workers), flush=True)
+                next_report = time.monotonic() + args.report_every
+    finally:
+        for process, _ in workers.values():
+            process.terminate()
+        for process, _ in workers.values():
+            try:
+                process.wait(timeout=STOP_TIMEOUT_S)
+            except subprocess.TimeoutExpired:
+                process.kill()
+        shutil.rmtree(path, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""Train the severity model out-of-core on an incident archive too large for memory.
+
+Streams the CSV in chunks (see ``core.training.train_out_of_core``) and saves the
+artifact to the model registry, where the Predictive Model page and the scoring API
+pick it up:
+
+    python tools/train_archive.py archive.csv                     # forest on a reservoir sample
+    python tools/train_archive.py archive.csv --mode sgd --epochs 3
+"""
+import argparse
+import hashlib
+import logging
+import os
+import sys
+import time
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, APP_DIR)
+logging.disable(logging.WARNING)
+
+import pandas as pd  # noqa: E402
+
+from core import model_registry  # noqa: E402
+from core.streaming import DEFAULT_CHUNK_ROWS  # noqa: E402
+from core.training import (HOLDOUT_EVERY, OUT_OF_CORE_MODES, OUT_OF_CORE_SAMPLE_ROWS, SGD_EPOCHS,  # noqa: E402
+                           train_out_of_core)
+from pages.Predictive_Model import (FEATURES, MODEL_COLUMNS, MODEL_PARAMS, TARGET_SEVERITY,  # noqa: E402
+                                    build_preprocessor, with_severity)
+
+HASH_BLOCK_BYTES = 16 * 1024 * 1024
+
+
+def file_hash(path):
+    """SHA-256 of a file, read in blocks."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(HASH_BLOCK_BYTES), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("csv", help="incident archive with the Predictive Model columns")
+    parser.add_argument("--mode", choices=OUT_OF_CORE_MODES, default="forest")
+    parser.add_argument("--chunk-rows", type=int, default=DEFAULT_CHUNK_ROWS)
+    parser.add_argument("--sample-rows", type=int, default=OUT_OF_CORE_SAMPLE_ROWS, help="forest training sample")
+    parser.add_argument("--epochs", type=int, default=SGD_EPOCHS, help="SGD passes over the training rows")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    result = train_out_of_core(
+        lambda: pd.read_csv(args.csv, chunksize=args.chunk_rows, usecols=lambda c: c in MODEL_COLUMNS),
+        build_preprocessor(), FEATURES, TARGET_SEVERITY, prepare=with_severity, mode=args.mode,
+        params=MODEL_PARAMS, sample_rows=args.sample_rows, epochs=args.epochs)
+
+    # Same artifact layout and key scheme as out-of-core training on the Predictive Model page
+    params = dict(MODEL_PARAMS, features=FEATURES, out_of_core=args.mode, holdout_every=HOLDOUT_EVERY)
+    key = model_registry.key_for_hash(file_hash(args.csv), params)
+    model_registry.save(key, {
+        'preprocessor': result['preprocessor'], 'feature_names': result['feature_names'],
+        'severity_model': result['model'], 'severity_mae': result['mae'], 'severity_r2': result['r2'],
+        'severity_params': result['params'],
+    })
+    print(f"Trained {args.mode} on {result['train_rows']:,} rows, scored {result['holdout_rows']:,} held out "
+          f"({result['dropped_rows']:,} unlabelled rows skipped) in {time.perf_counter() - started:.1f} s")
+    print(f"MAE {result['mae']:.3f}  R² {result['r2']:.4f}")
+    print(f"Saved artifact {key} to {model_registry.artifact_path(key)}")
+
+
+if __name__ == "__main__":
+    main()